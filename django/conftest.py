@@ -32,6 +32,20 @@ from thunderstore.repository.models import (
 from thunderstore.webhooks.models import WebhookType
 
 
+@pytest.fixture(autouse=True)
+def run_on_commit_immediately(request, mocker):
+    """
+    The transactions of non-transactional tests are never committed, so
+    their on_commit callbacks are run right away instead.
+    """
+    marker = request.node.get_closest_marker("django_db")
+    if marker and not marker.kwargs.get("transaction", False):
+        mocker.patch(
+            "django.db.transaction.on_commit",
+            side_effect=lambda func, using=None: func(),
+        )
+
+
 @pytest.fixture()
 def user(django_user_model):
     return django_user_model.objects.create_user(
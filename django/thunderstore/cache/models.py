@@ -35,3 +35,7 @@ class DatabaseCache(TimestampMixin, models.Model):
             key=key,
             defaults=dict(content=pickle.dumps(content), expires_on=expiry),
         )[0]
+
+    @classmethod
+    def delete_expired(cls):
+        return cls.objects.filter(expires_on__lte=timezone.now()).delete()
@@ -0,0 +1,60 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:39
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import TextField, Value
+
+
+def forwards(apps, schema_editor):
+    PackageListing = apps.get_model("community", "PackageListing")
+    Package = apps.get_model("repository", "Package")
+
+    is_postgres = schema_editor.connection.vendor == "postgresql"
+    packages = Package.objects.filter(
+        pk__in=PackageListing.objects.values("package_id")
+    ).values_list("pk", "name", "owner__name", "latest__description")
+    for package_id, name, owner, description in packages.iterator():
+        description = description or ""
+        fields = {
+            "search_document": "\n".join((name, owner, description)).lower(),
+        }
+        if is_postgres:
+            fields["search_vector"] = (
+                SearchVector(
+                    Value(name, output_field=TextField()), weight="A", config="simple"
+                )
+                + SearchVector(
+                    Value(owner, output_field=TextField()), weight="B", config="simple"
+                )
+                + SearchVector(
+                    Value(description, output_field=TextField()),
+                    weight="C",
+                    config="simple",
+                )
+            )
+        PackageListing.objects.filter(package_id=package_id).update(**fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0011_add_community_site_is_listed_flag"),
+        ("repository", "0031_add_download_event_pruning"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="packagelisting",
+            name="search_document",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="packagelisting",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
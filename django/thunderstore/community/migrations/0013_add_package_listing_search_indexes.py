@@ -0,0 +1,41 @@
+# Generated by Django 3.1.14 on 2026-10-18 20:05
+
+from django.db import migrations
+
+INDEXES = {
+    "community_packagelisting_search_document_trgm": ("search_document gin_trgm_ops"),
+    "community_packagelisting_search_vector": "search_vector",
+}
+
+
+def forwards(apps, schema_editor):
+    # Trigram and full text search indexes are only supported on PostgreSQL
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, expression in INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+            f"ON community_packagelisting USING gin ({expression});"
+        )
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in INDEXES.keys():
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+
+
+class Migration(migrations.Migration):
+    # The indexes are created concurrently to avoid locking the listings table
+    atomic = False
+
+    dependencies = [
+        ("community", "0012_add_package_listing_search_document"),
+        # Installs pg_trgm, which the trigram index depends on
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
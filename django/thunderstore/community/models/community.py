@@ -1,7 +1,9 @@
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import QuerySet
+from django.utils.functional import cached_property
 
+from thunderstore.core.cache import CacheTagType, get_cache_tag
 from thunderstore.core.mixins import TimestampMixin
 
 
@@ -26,6 +28,10 @@ class Community(TimestampMixin, models.Model):
                 raise ValidationError("Field 'identifier' is read only")
         return super().save(*args, **kwargs)
 
+    @cached_property
+    def cache_tag(self):
+        return get_cache_tag(CacheTagType.community, self.pk)
+
     def __str__(self):
         return self.name
 
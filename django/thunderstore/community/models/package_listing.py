@@ -1,10 +1,44 @@
-from django.db import models
-from django.db.models import Q, signals
+import re
+from typing import Iterable
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+from django.db import connections, models
+from django.db.models import F, FloatField, Q, TextField, Value, signals
 from django.urls import reverse
 from django.utils.functional import cached_property
 
-from thunderstore.core.cache import CacheBustCondition, invalidate_cache
+from thunderstore.core.cache import (
+    CacheBustCondition,
+    CacheTagType,
+    get_cache_tag,
+    invalidate_cache,
+)
 from thunderstore.core.mixins import TimestampMixin
+from thunderstore.core.transactions import on_commit_batched
+from thunderstore.repository.models.package_change import PackageChange
+
+
+def get_search_document(name: str, owner: str, description: str) -> str:
+    return "\n".join((name, owner, description or "")).lower()
+
+
+def get_search_vector(name: str, owner: str, description: str) -> SearchVector:
+    return (
+        SearchVector(Value(name, output_field=TextField()), weight="A", config="simple")
+        + SearchVector(
+            Value(owner, output_field=TextField()), weight="B", config="simple"
+        )
+        + SearchVector(
+            Value(description or "", output_field=TextField()),
+            weight="C",
+            config="simple",
+        )
+    )
 
 
 class PackageListingQueryset(models.QuerySet):
@@ -13,6 +47,31 @@ class PackageListingQueryset(models.QuerySet):
             ~Q(package__versions__is_active=True)
         )
 
+    def search(self, query: str):
+        """
+        Filters the listings to ones whose search document contains every
+        whitespace separated term of the query, annotated with a search_rank.
+
+        On Postgres the substring filters are served by a trigram index and
+        the rank is computed from the weighted search vector, while other
+        databases fall back to an unindexed LIKE and a constant rank.
+        """
+        queryset = self
+        for term in query.lower().split():
+            queryset = queryset.filter(search_document__contains=term)
+
+        words = re.findall(r"\w+", query.lower())
+        if words and connections[self.db].vendor == "postgresql":
+            search_query = SearchQuery(
+                " | ".join(f"{word}:*" for word in words),
+                config="simple",
+                search_type="raw",
+            )
+            return queryset.annotate(
+                search_rank=SearchRank(F("search_vector"), search_query)
+            )
+        return queryset.annotate(search_rank=Value(0, output_field=FloatField()))
+
 
 # TODO: Add a db constraint that ensures a package listing and it's categories
 #       belong to the same community. This might require actually specifying
@@ -39,6 +98,12 @@ class PackageListing(TimestampMixin, models.Model):
     )
     has_nsfw_content = models.BooleanField(default=False)
 
+    # Denormalized from the package name, owner name and latest description.
+    # The trigram and full text GIN indexes are Postgres only, and thus
+    # created in the migrations instead of being declared here
+    search_document = models.TextField(blank=True, default="", editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     def __str__(self):
         return self.package.name
 
@@ -64,14 +129,67 @@ class PackageListing(TimestampMixin, models.Model):
             },
         )
 
+    def get_cache_tags(self):
+        return [
+            get_cache_tag(CacheTagType.package, self.package_id),
+            get_cache_tag(CacheTagType.community, self.community_id),
+        ]
+
+    @classmethod
+    def update_search_documents(cls, package_ids: Iterable[int]):
+        from thunderstore.repository.models import Package
+
+        packages = Package.objects.filter(pk__in=package_ids).values_list(
+            "pk", "name", "owner__name", "latest__description"
+        )
+        is_postgres = connections[cls.objects.db].vendor == "postgresql"
+        for package_id, name, owner, description in packages:
+            fields = {"search_document": get_search_document(name, owner, description)}
+            if is_postgres:
+                fields["search_vector"] = get_search_vector(name, owner, description)
+            cls.objects.filter(package_id=package_id).update(**fields)
+
     @staticmethod
     def post_save(sender, instance, created, **kwargs):
-        invalidate_cache(CacheBustCondition.any_package_updated)
+        if created:
+            PackageListing.update_search_documents([instance.package_id])
+        on_commit_batched(PackageChange.record_by_ids, [instance.package_id])
+        invalidate_cache(
+            CacheBustCondition.any_package_updated,
+            tags=instance.get_cache_tags(),
+        )
 
     @staticmethod
     def post_delete(sender, instance, **kwargs):
-        invalidate_cache(CacheBustCondition.any_package_updated)
+        on_commit_batched(PackageChange.record_by_ids, [instance.package_id])
+        PackageChange.record_removal(instance.package, instance.community)
+        invalidate_cache(
+            CacheBustCondition.any_package_updated,
+            tags=instance.get_cache_tags(),
+        )
+
+    @staticmethod
+    def post_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+        if reverse:
+            # A reverse clear doesn't provide the affected listings, so they're
+            # recorded before the category is cleared
+            if action == "pre_clear":
+                listings = instance.packages.all()
+            elif action in ("post_add", "post_remove"):
+                listings = PackageListing.objects.filter(pk__in=pk_set)
+            else:
+                return
+            on_commit_batched(
+                PackageChange.record_by_ids,
+                listings.values_list("package_id", flat=True),
+            )
+        elif action in ("post_add", "post_remove", "post_clear"):
+            on_commit_batched(PackageChange.record_by_ids, [instance.package_id])
 
 
 signals.post_save.connect(PackageListing.post_save, sender=PackageListing)
 signals.post_delete.connect(PackageListing.post_delete, sender=PackageListing)
+signals.m2m_changed.connect(
+    PackageListing.post_categories_changed,
+    sender=PackageListing.categories.through,
+)
@@ -1,28 +1,111 @@
+import gzip
 import hashlib
+import io
+import pickle
+import threading
 import time
+import uuid
 import warnings
-from typing import Any, Callable
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 from urllib.parse import quote
 
+import brotli
 from django.conf import settings
 from django.core.cache import cache
-from django.db import connection
-from django.http import HttpResponse
+from django.db import connections
+from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 
 from thunderstore.cache.models import DatabaseCache
-from thunderstore.core.transactions import atomic_lock
-from thunderstore.core.utils import ChoiceEnum
+from thunderstore.core.locks import DEFAULT_LOCK_TIMEOUT, get_lock_backend
+from thunderstore.core.utils import ChoiceEnum, capture_exception
 
 DEFAULT_CACHE_EXPIRY = 60 * 5
+CACHE_REFRESH_LOCK_TIMEOUT = 60 * 5
+
+GZIP_COMPRESS_LEVEL = 9
+BROTLI_QUALITY = 9
+
+CacheTags = Optional[Union[str, Iterable[str]]]
 
 
-# TODO: Support parameters in cache bust conditions (e.g. specific package update)
 class CacheBustCondition(ChoiceEnum):
     background_update_only = "manual_update_only"
     any_package_updated = "any_package_updated"
     dynamic_html_updated = "dynamic_html_updated"
 
 
+class CacheTagType(ChoiceEnum):
+    package = "package"
+    owner = "owner"
+    community = "community"
+
+
+def get_cache_tag(tag_type: str, identifier: Any) -> str:
+    if tag_type not in CacheTagType.options():
+        raise ValueError(f"Invalid cache tag type: {tag_type}")
+    return f"{tag_type}:{identifier}"
+
+
+def _normalize_cache_tags(tags: CacheTags) -> List[str]:
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = [tags]
+    return sorted(set(str(tag) for tag in tags))
+
+
+def _get_generation_key(namespace: str) -> str:
+    return f"cache.generation.{quote(namespace)}"
+
+
+def _new_generation() -> str:
+    # Generations are never reused, so an evicted generation key can't
+    # resurrect entries which were stored under an older generation
+    return uuid.uuid4().hex
+
+
+def get_cache_generations(namespaces: Iterable[str]) -> Dict[str, str]:
+    """
+    Returns the current generation of each namespace. Cache keys fold in the
+    generations of the namespaces they belong to, which makes bumping a
+    generation invalidate every entry in the namespace in O(1).
+    """
+    keys = {_get_generation_key(namespace): namespace for namespace in namespaces}
+    stored = cache.get_many(keys.keys())
+    generations = {}
+    for key, namespace in keys.items():
+        generation = stored.get(key)
+        if generation is None:
+            cache.add(key, _new_generation(), timeout=None)
+            generation = cache.get(key)
+        generations[namespace] = generation
+    return generations
+
+
+def bump_cache_generations(namespaces: Iterable[str]) -> None:
+    cache.set_many(
+        {_get_generation_key(namespace): _new_generation() for namespace in namespaces},
+        timeout=None,
+    )
+
+
+def _get_cache_namespaces(cache_bust_condition, tags: CacheTags) -> List[str]:
+    namespaces = [f"condition:{cache_bust_condition}"]
+    tags = _normalize_cache_tags(tags)
+    if tags:
+        namespaces += [f"tag:{tag}" for tag in tags]
+    else:
+        namespaces.append(f"condition:{cache_bust_condition}:untagged")
+    return namespaces
+
+
+def get_unversioned_cache_key(key: str) -> str:
+    return key.partition("@")[0]
+
+
 def try_regenerate_cache(
     key: str,
     old_key: str,
@@ -30,8 +113,10 @@ def try_regenerate_cache(
     timeout: int,
     version=None,
 ) -> Any:
-    with atomic_lock(f"cache.regenerate.{key}", shared=False, wait=False) as acquired:
-        if not acquired:
+    with get_lock_backend().lock(
+        f"cache.regenerate.{key}", timeout=DEFAULT_LOCK_TIMEOUT
+    ) as lock:
+        if not lock.acquired:
             return None
         generated = generator()
         if generated is None:
@@ -41,46 +126,109 @@ def try_regenerate_cache(
                 "Attempted to set 'None' to cache, replacing with empty string",
             )
             generated = ""
+        if not lock.is_held():
+            # The lock expired mid-generation and may have been taken over by
+            # another worker, whose result must not be overwritten
+            return generated
         cache.set(key, generated, timeout=timeout, version=version)
         # TODO: Cache fallback could technically be stored forever?
         cache.set(
             old_key,
             generated,
-            timeout=max(timeout * 2, DEFAULT_CACHE_EXPIRY),
+            timeout=None if timeout is None else max(timeout * 2, DEFAULT_CACHE_EXPIRY),
             version=version,
         )
         return generated
 
 
 def regenerate_cache(key: str, generator: Callable, timeout: int, version=None):
-    if connection.in_atomic_block:
-        if settings.DEBUG:
-            raise RuntimeError("cache regenerated during transaction, unable to lock")
-        else:
-            warnings.warn("cache regenerated during transaction, unable to lock")
+    # The fallback outlives generation bumps so that stale content can be
+    # served while another thread regenerates the entry
+    old_key = f"old.{get_unversioned_cache_key(key)}"
+    generated = try_regenerate_cache(
+        key=key,
+        old_key=old_key,
+        generator=generator,
+        timeout=timeout,
+        version=version,
+    )
+    if generated is None:
+        # Lock was taken by another thread, check fallback version
+        generated = cache.get(old_key, version=version)
+    if generated is None:
+        # Finally fall back to generating it on this thread
         generated = generator()
         cache.set(key, generated, timeout=timeout, version=version)
+    return generated
+
+
+def run_in_background(task: Callable[[], None]) -> None:
+    if not settings.CACHE_BACKGROUND_REFRESH:
+        task()
+        return
+
+    def run():
+        try:
+            task()
+        except Exception as e:
+            capture_exception(e)
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def _get_stale_cache_key(key: str) -> str:
+    return f"stale.{get_unversioned_cache_key(key)}"
+
+
+def _set_stale_while_revalidate(key: str, value: Any, expiry, stale_expiry: int):
+    fresh_until = None if expiry is None else time.time() + expiry
+    timeout = stale_expiry if expiry is None else max(expiry, stale_expiry)
+    cache.set(_get_stale_cache_key(key), (key, fresh_until, value), timeout=timeout)
+
+
+def _refresh_stale_cache(key: str, generator: Callable, expiry, stale_expiry: int):
+    lock_key = f"refresh.{key}"
+    if not cache.add(lock_key, True, timeout=CACHE_REFRESH_LOCK_TIMEOUT):
+        # Another caller is already refreshing this entry
+        return
+
+    def refresh():
+        try:
+            _set_stale_while_revalidate(key, generator(), expiry, stale_expiry)
+        finally:
+            cache.delete(lock_key)
+
+    run_in_background(refresh)
+
+
+def stale_while_revalidate(key: str, generator: Callable, expiry, stale_expiry: int):
+    """
+    Returns the cached value even if it has expired or been invalidated, as
+    long as the entry is younger than stale_expiry. Stale values are refreshed
+    by a single background task, only missing values block the caller.
+    """
+    entry = cache.get(_get_stale_cache_key(key))
+    if entry is None:
+        generated = regenerate_cache(key=key, generator=generator, timeout=expiry)
+        _set_stale_while_revalidate(key, generated, expiry, stale_expiry)
         return generated
-    else:
-        old_key = f"old.{key}"
-        generated = try_regenerate_cache(
-            key=key,
-            old_key=old_key,
-            generator=generator,
-            timeout=timeout,
-            version=version,
-        )
-        if generated is None:
-            # Lock was taken by another thread, check fallback version
-            generated = cache.get(old_key, version=version)
-        if generated is None:
-            # Finally fall back to generating it on this thread
-            generated = generator()
-            cache.set(key, generated, timeout=timeout, version=version)
-        return generated
+
+    entry_key, fresh_until, value = entry
+    if entry_key != key or (fresh_until is not None and fresh_until < time.time()):
+        _refresh_stale_cache(key, generator, expiry, stale_expiry)
+    return value
 
 
-def cache_get_or_set(key, default, default_args=(), default_kwargs=None, expiry=None):
+def cache_get_or_set(
+    key,
+    default,
+    default_args=(),
+    default_kwargs=None,
+    expiry=None,
+    stale_expiry=None,
+):
     if default_kwargs is None:
         default_kwargs = {}
 
@@ -89,6 +237,14 @@ def cache_get_or_set(key, default, default_args=(), default_kwargs=None, expiry=
             time.sleep(settings.DEBUG_SIMULATED_LAG)
         return default(*default_args, **default_kwargs)
 
+    if stale_expiry is not None:
+        return stale_while_revalidate(
+            key=key,
+            generator=call_default,
+            expiry=expiry,
+            stale_expiry=stale_expiry,
+        )
+
     result = cache.get(key, version=None)
     if result is None:
         result = regenerate_cache(key=key, generator=call_default, timeout=expiry)
@@ -96,21 +252,73 @@ def cache_get_or_set(key, default, default_args=(), default_kwargs=None, expiry=
     return result
 
 
-def invalidate_cache(cache_bust_condition):
+def invalidate_cache(cache_bust_condition, tags: CacheTags = None):
+    """
+    Invalidate cache entries stored under the given cache bust condition.
+
+    If tags are given, only entries which declared at least one of the tags
+    are invalidated, in addition to entries which declared no tags at all.
+    Otherwise every entry of the condition is invalidated.
+
+    Invalidated entries are not deleted, they're simply no longer addressed
+    and age out through their expiry or the cache backend's eviction policy.
+    """
     if cache_bust_condition == CacheBustCondition.background_update_only:
         raise AttributeError("Invalid cache bust condition")
-    if hasattr(cache, "delete_pattern"):
-        cache.delete_pattern(f"cache.{cache_bust_condition}.*")
+    tags = _normalize_cache_tags(tags)
+    if tags:
+        namespaces = [f"tag:{tag}" for tag in tags]
+        namespaces.append(f"condition:{cache_bust_condition}:untagged")
+    else:
+        namespaces = [f"condition:{cache_bust_condition}"]
+    bump_cache_generations(namespaces)
 
 
-def get_cache_key(cache_bust_condition, cache_type, key, vary_on):
+def get_cache_key(cache_bust_condition, cache_type, key, vary_on, tags=None):
     if cache_bust_condition not in CacheBustCondition.options():
         raise ValueError(f"Invalid cache bust condition: {cache_bust_condition}")
     vary = "None"
     if vary_on:
         vary_args = ":".join(quote(str(var)) for var in vary_on)
         vary = hashlib.md5(vary_args.encode()).hexdigest()
-    return f"cache.{cache_bust_condition}.{cache_type}.{key}.{vary}"
+    base_key = f"cache.{cache_bust_condition}.{cache_type}.{key}.{vary}"
+    if cache_bust_condition == CacheBustCondition.background_update_only:
+        # Background updated caches are never invalidated, and losing their
+        # generation to eviction would leave them missing until the next update
+        if tags:
+            raise ValueError("Background updated caches can't be tagged")
+        return base_key
+    generations = get_cache_generations(
+        _get_cache_namespaces(cache_bust_condition, tags)
+    )
+    generation_args = ":".join(
+        f"{quote(namespace)}={generation}"
+        for namespace, generation in generations.items()
+    )
+    generation = hashlib.md5(generation_args.encode()).hexdigest()
+    return f"{base_key}@{generation}"
+
+
+def get_accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """
+    Parses an Accept-Encoding header into a mapping of content codings to
+    their quality values. Codings without a quality value default to 1.
+    """
+    encodings = {}
+    for entry in accept_encoding.split(","):
+        coding, *params = [x.strip() for x in entry.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[coding.lower()] = quality
+    return encodings
 
 
 def get_view_cache_name(cls):
@@ -124,6 +332,10 @@ def get_view_cache_name(cls):
 class ManualCacheMixin(object):
     cache_until = None
     cache_expiry = DEFAULT_CACHE_EXPIRY
+    cache_stale_expiry = None
+
+    def get_cache_tags(self, *args, **kwargs) -> CacheTags:
+        return None
 
     def dispatch(self, *args, **kwargs):
         def get_default(*a, **kw):
@@ -138,14 +350,257 @@ class ManualCacheMixin(object):
                 cache_type="view",
                 key=get_view_cache_name(type(self)),
                 vary_on=args + tuple(kwargs.values()) + (self.request.community_site,),
+                tags=self.get_cache_tags(*args, **kwargs),
             ),
             default=get_default,
             default_args=args,
             default_kwargs=kwargs,
             expiry=self.cache_expiry,
+            stale_expiry=self.cache_stale_expiry,
         )
 
 
+class CachedResponse:
+    """
+    A rendered response stored in compressed form. Clients accepting brotli
+    or gzip are served the compressed bytes as is, other clients get the
+    content decompressed on the fly. Responses cached without brotli content
+    are only served as gzip.
+
+    The content hash and generation time are served as the ETag and
+    Last-Modified headers, and conditional requests for unchanged content
+    are answered with a 304 Not Modified.
+    """
+
+    # Defaults for responses cached before these were stored
+    content_hash = None
+    generated_at = None
+
+    excluded_headers = ("content-length", "content-encoding")
+
+    def __init__(
+        self,
+        status: int,
+        headers: List[tuple],
+        gzip_content: bytes,
+        brotli_content: Optional[bytes] = None,
+        content_hash: Optional[str] = None,
+        generated_at: Optional[int] = None,
+    ):
+        self.status = status
+        self.headers = headers
+        self.gzip_content = gzip_content
+        self.brotli_content = brotli_content
+        self.content_hash = content_hash
+        self.generated_at = generated_at
+
+    @classmethod
+    def from_response(cls, response: HttpResponse) -> "CachedResponse":
+        return cls.from_stream(
+            chunks=[response.content],
+            status=response.status_code,
+            headers=[
+                (header, value)
+                for header, value in response.items()
+                if header.lower() not in cls.excluded_headers
+            ],
+        )
+
+    @classmethod
+    def from_stream(
+        cls,
+        chunks: Iterable[bytes],
+        status: int = 200,
+        headers: Optional[List[tuple]] = None,
+    ) -> "CachedResponse":
+        """
+        Build a cached response from content produced in chunks. The content
+        is compressed and hashed as it's produced, so the uncompressed
+        content is never held in memory as a whole.
+        """
+        gzip_buffer = io.BytesIO()
+        gzip_file = gzip.GzipFile(
+            fileobj=gzip_buffer, mode="wb", compresslevel=GZIP_COMPRESS_LEVEL
+        )
+        brotli_compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        brotli_chunks = []
+        content_hash = hashlib.sha256()
+
+        for chunk in chunks:
+            gzip_file.write(chunk)
+            content_hash.update(chunk)
+            brotli_chunks.append(brotli_compressor.process(chunk))
+
+        gzip_file.close()
+        brotli_chunks.append(brotli_compressor.finish())
+
+        return cls(
+            status=status,
+            headers=headers or [],
+            gzip_content=gzip_buffer.getvalue(),
+            brotli_content=b"".join(brotli_chunks),
+            content_hash=content_hash.hexdigest(),
+            generated_at=int(time.time()),
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.gzip_content) + len(self.brotli_content or b"")
+
+    @property
+    def etag(self) -> Optional[str]:
+        if self.content_hash is None:
+            return None
+        # Weak, as the same ETag is used for every content encoding
+        return f"W/{quote_etag(self.content_hash)}"
+
+    def add_validator_headers(self, response: HttpResponse) -> None:
+        if self.etag:
+            response["ETag"] = self.etag
+        if self.generated_at:
+            response["Last-Modified"] = http_date(self.generated_at)
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+    def get_response_encoding(self, request: HttpRequest) -> Optional[str]:
+        """
+        Returns the accepted content coding with the highest quality value,
+        preferring brotli on ties, or None if neither is acceptable.
+        """
+        accepted = get_accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        wildcard = accepted.get("*", 0)
+        candidates = ["br", "gzip"] if self.brotli_content else ["gzip"]
+        qualities = {x: accepted.get(x, wildcard) for x in candidates}
+        encoding = max(candidates, key=lambda x: qualities[x])
+        if qualities[encoding] <= 0:
+            return None
+        return encoding
+
+    def to_response(self, request: HttpRequest) -> HttpResponse:
+        if self.status == 200:
+            not_modified = get_conditional_response(
+                request,
+                etag=self.etag,
+                last_modified=self.generated_at,
+            )
+            if not_modified is not None:
+                self.add_validator_headers(not_modified)
+                return not_modified
+
+        encoding = self.get_response_encoding(request)
+        if encoding == "br":
+            content = self.brotli_content
+        elif encoding == "gzip":
+            content = self.gzip_content
+        else:
+            content = gzip.decompress(self.gzip_content)
+
+        response = HttpResponse(content, status=self.status)
+        for header, value in self.headers:
+            response[header] = value
+        if encoding:
+            response["Content-Encoding"] = encoding
+        self.add_validator_headers(response)
+        return response
+
+
+class LocalCache:
+    """
+    A bounded, size-aware in-process LRU tier in front of the shared cache.
+
+    Every entry written through this tier gets a small version stamp stored
+    next to it in the shared cache. Reads only fetch the stamp, and serve
+    the value from process memory if the stamps match, skipping both the
+    network transfer and unpickling of large values.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_stamp_key(key: str) -> str:
+        return f"stamp.{key}"
+
+    @staticmethod
+    def get_value_size(value: Any) -> int:
+        if isinstance(value, (bytes, str)):
+            return len(value)
+        if isinstance(value, CachedResponse):
+            return value.size
+        if isinstance(value, HttpResponse):
+            return len(value.content)
+        return len(pickle.dumps(value))
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "size": self.size,
+            "max_size": self.max_size,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _get_local(self, key: str, stamp: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _set_local(self, key: str, stamp: str, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        size = self.get_value_size(value)
+        with self._lock:
+            self._pop_local(key)
+            if size > self.max_size:
+                return
+            self._entries[key] = (stamp, value, size)
+            self.size += size
+            while self.size > self.max_size:
+                self._pop_local(next(iter(self._entries)))
+
+    def _pop_local(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        stamp = cache.get(self.get_stamp_key(key))
+        if stamp is None:
+            return cache.get(key, default)
+        result = self._get_local(key, stamp)
+        if result is not None:
+            return result
+        result = cache.get(key)
+        if result is None:
+            return default
+        self._set_local(key, stamp, result)
+        return result
+
+    def set(self, key: str, value: Any, timeout: Optional[int]) -> Any:
+        stamp = uuid.uuid4().hex
+        result = cache.set(key, value, timeout)
+        cache.set(self.get_stamp_key(key), stamp, timeout)
+        self._set_local(key, stamp, value)
+        return result
+
+
+local_cache = LocalCache(max_size=settings.LOCAL_CACHE_MAX_SIZE)
+
+
 class BackgroundUpdatedCacheMixin(object):
     cache_database_fallback = True
 
@@ -164,44 +619,111 @@ class BackgroundUpdatedCacheMixin(object):
 
     @classmethod
     def get_cache(cls, key, default):
-        result = cache.get(key, None)
+        result = local_cache.get(key, None)
         if result:
             return result
         elif cls.cache_database_fallback:
             db_result = DatabaseCache.get(key, None)
             if db_result:
-                cache.set(key, db_result, None)
+                local_cache.set(key, db_result, None)
                 return db_result
         return default
 
     @classmethod
     def set_cache(cls, key, value, timeout):
-        result = cache.set(key, value, timeout)
+        result = local_cache.set(key, value, timeout)
         if cls.cache_database_fallback:
             DatabaseCache.set(key, value, timeout)
         return result
 
+    @staticmethod
+    def copy_response(response: HttpResponse) -> HttpResponse:
+        # Cached responses may be shared between requests through the local
+        # cache, so each request gets its own response object
+        result = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            result[header] = value
+        return result
+
+    def is_cacheable_request(self) -> bool:
+        return True
+
+    def get_snapshot_url(self) -> Optional[str]:
+        """
+        The URL of a static snapshot of the response, which clients are
+        redirected to instead of serving the response from the cache.
+        """
+        return None
+
+    def allows_uncached_response(self) -> bool:
+        """
+        Whether the response may be generated within the request when it's
+        missing from the cache, instead of returning the no cache response.
+        """
+        return False
+
+    def get_uncached_response(self, *args, **kwargs):
+        response = super().dispatch(*args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
     def dispatch(self, *args, **kwargs):
-        if self.request.method != "GET" or kwargs.get("skip_cache", False) is True:
-            return super().dispatch(*args, **kwargs).render()
-        return self.get_cache(
-            self.get_cache_key(*args, **kwargs),
-            self.get_no_cache_response(),
-        )
+        if (
+            self.request.method != "GET"
+            or kwargs.get("skip_cache", False) is True
+            or not self.is_cacheable_request()
+        ):
+            return self.get_uncached_response(*args, **kwargs)
+        snapshot_url = self.get_snapshot_url()
+        if snapshot_url:
+            return HttpResponseRedirect(snapshot_url)
+        cached = self.get_cache(self.get_cache_key(*args, **kwargs), None)
+        if cached is None:
+            if self.allows_uncached_response():
+                return self.get_uncached_response(*args, **kwargs)
+            return self.get_no_cache_response()
+        if isinstance(cached, CachedResponse):
+            return cached.to_response(self.request)
+        # Caches stored before responses were stored compressed
+        return self.copy_response(cached)
 
     @classmethod
     def update_cache(cls, view, *args, **kwargs):
         kwargs.update({"skip_cache": True})
         result = view(*args, **kwargs)
         del kwargs["skip_cache"]
+        response = CachedResponse.from_response(result)
+        cls.store_cached_response(response, *args, **kwargs)
+        return response
+
+    @classmethod
+    def store_cached_response(
+        cls, response: CachedResponse, *args, timeout: Optional[int] = None, **kwargs
+    ):
         cls.set_cache(
             key=cls.get_cache_key(*args, **kwargs),
-            value=result,
-            timeout=None,
+            value=response,
+            timeout=timeout,
         )
 
 
-def cache_function_result(cache_until, expiry=DEFAULT_CACHE_EXPIRY):
+def cache_function_result(
+    cache_until,
+    expiry=DEFAULT_CACHE_EXPIRY,
+    tags: Optional[Callable[..., CacheTags]] = None,
+    stale_expiry: Optional[int] = None,
+):
+    """
+    Cache the function's result until the cache bust condition is met.
+
+    :param tags: Optional callable which receives the same arguments as the
+        decorated function and returns the cache tags the result depends on
+    :param stale_expiry: If set, the result keeps being served for this many
+        seconds after it has expired or been invalidated while it's refreshed
+        in the background
+    """
+
     def decorator(original_function):
         def wrapper(*args, **kwargs):
             return cache_get_or_set(
@@ -210,11 +732,13 @@ def cache_function_result(cache_until, expiry=DEFAULT_CACHE_EXPIRY):
                     cache_type="func",
                     key=original_function.__name__,
                     vary_on=args + tuple(kwargs.values()),
+                    tags=tags(*args, **kwargs) if tags else None,
                 ),
                 default=original_function,
                 default_args=args,
                 default_kwargs=kwargs,
                 expiry=expiry,
+                stale_expiry=stale_expiry,
             )
 
         return wrapper
@@ -0,0 +1,202 @@
+import warnings
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple, Type
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.module_loading import import_string
+
+from thunderstore.core.transactions import atomic_lock
+
+DEFAULT_LOCK_TIMEOUT = 60 * 5
+
+
+def get_redis_errors() -> Tuple[Type[Exception], ...]:
+    """
+    Returns the errors of an unavailable Redis server, which code using the
+    client directly should handle like the cache's IGNORE_EXCEPTIONS does.
+    """
+    from redis.exceptions import ConnectionError, TimeoutError
+
+    return ConnectionError, TimeoutError
+
+
+def get_fence_timeout(timeout: int) -> int:
+    # Fences outlive their locks, so that the tokens handed out after a lock
+    # expires still increase while its previous holder may be running. They
+    # expire eventually, as lock ids may contain cache generations which
+    # are never locked again once bumped
+    return timeout * 2
+
+
+class Lock:
+    """
+    A handle to an acquired (or failed to acquire) lock.
+
+    The token is a fencing token which increases monotonically for each
+    acquisition of the same lock id, which allows callers to verify they
+    still hold the lock before committing results.
+    """
+
+    def __init__(self, backend: "BaseLockBackend", lock_id: str, token: Optional[int]):
+        self.backend = backend
+        self.lock_id = lock_id
+        self.token = token
+
+    @property
+    def acquired(self) -> bool:
+        return self.token is not None
+
+    def is_held(self) -> bool:
+        return self.acquired and self.backend.is_held(self)
+
+
+class BaseLockBackend:
+    @contextmanager
+    def lock(self, lock_id: str, timeout: int = DEFAULT_LOCK_TIMEOUT) -> Iterator[Lock]:
+        raise NotImplementedError()
+
+    def is_held(self, lock: Lock) -> bool:
+        raise NotImplementedError()
+
+
+class PostgresAdvisoryLockBackend(BaseLockBackend):
+    """
+    Transaction scoped Postgres advisory locks. The lock holds a database
+    connection for its whole duration and can't be acquired inside an
+    existing transaction, in which case the caller proceeds unguarded.
+    """
+
+    @contextmanager
+    def lock(self, lock_id: str, timeout: int = DEFAULT_LOCK_TIMEOUT) -> Iterator[Lock]:
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            if settings.DEBUG:
+                raise RuntimeError(f"Unable to lock {lock_id} during a transaction")
+            warnings.warn(f"Unable to lock {lock_id} during a transaction")
+            yield Lock(self, lock_id, 0)
+            return
+        with atomic_lock(lock_id, shared=False, wait=False) as acquired:
+            yield Lock(self, lock_id, 0 if acquired else None)
+
+    def is_held(self, lock: Lock) -> bool:
+        # Advisory locks are held until the transaction ends
+        return True
+
+
+class CacheLockBackend(BaseLockBackend):
+    """
+    Locks stored in the Django cache with an atomic add. Works with any cache
+    backend, but only coordinates between processes sharing the cache.
+    """
+
+    def get_lock_key(self, lock_id: str) -> str:
+        return f"lock.{lock_id}"
+
+    def get_fence_key(self, lock_id: str) -> str:
+        return f"lock.fence.{lock_id}"
+
+    def get_next_token(self, lock_id: str, timeout: int) -> int:
+        fence_key = self.get_fence_key(lock_id)
+        fence_timeout = get_fence_timeout(timeout)
+        cache.add(fence_key, 0, timeout=fence_timeout)
+        try:
+            token = cache.incr(fence_key)
+        except ValueError:
+            # The fence was evicted between the add and the incr
+            cache.add(fence_key, 0, timeout=fence_timeout)
+            token = cache.incr(fence_key)
+        cache.touch(fence_key, fence_timeout)
+        return token
+
+    def acquire(self, lock_id: str, timeout: int) -> Lock:
+        token = self.get_next_token(lock_id, timeout)
+        if cache.add(self.get_lock_key(lock_id), token, timeout=timeout):
+            return Lock(self, lock_id, token)
+        return Lock(self, lock_id, None)
+
+    def release(self, lock: Lock) -> None:
+        if self.is_held(lock):
+            cache.delete(self.get_lock_key(lock.lock_id))
+
+    def is_held(self, lock: Lock) -> bool:
+        return cache.get(self.get_lock_key(lock.lock_id)) == lock.token
+
+    @contextmanager
+    def lock(self, lock_id: str, timeout: int = DEFAULT_LOCK_TIMEOUT) -> Iterator[Lock]:
+        lock = self.acquire(lock_id, timeout)
+        try:
+            yield lock
+        finally:
+            if lock.acquired:
+                self.release(lock)
+
+
+class RedisLockBackend(CacheLockBackend):
+    """
+    Locks acquired with SET NX PX on the Redis server backing the default
+    cache. The fencing token is an INCR counter and locks are released with
+    a compare-and-delete script, so an expired lock is never released by its
+    previous holder.
+
+    Like the cache itself, the locks tolerate Redis being unavailable, in
+    which case they are never acquired.
+    """
+
+    RELEASE_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    else
+        return 0
+    end
+    """
+
+    def get_client(self):
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+
+    def get_next_token(self, lock_id: str, timeout: int) -> int:
+        client = self.get_client()
+        fence_key = cache.make_key(self.get_fence_key(lock_id))
+        token = client.incr(fence_key)
+        client.expire(fence_key, get_fence_timeout(timeout))
+        return token
+
+    def acquire(self, lock_id: str, timeout: int) -> Lock:
+        try:
+            token = self.get_next_token(lock_id, timeout)
+            acquired = self.get_client().set(
+                cache.make_key(self.get_lock_key(lock_id)),
+                token,
+                nx=True,
+                px=timeout * 1000,
+            )
+        except get_redis_errors():
+            return Lock(self, lock_id, None)
+        return Lock(self, lock_id, token if acquired else None)
+
+    def release(self, lock: Lock) -> None:
+        try:
+            self.get_client().eval(
+                self.RELEASE_SCRIPT,
+                1,
+                cache.make_key(self.get_lock_key(lock.lock_id)),
+                lock.token,
+            )
+        except get_redis_errors():
+            # The lock expires by itself
+            pass
+
+    def is_held(self, lock: Lock) -> bool:
+        try:
+            value = self.get_client().get(
+                cache.make_key(self.get_lock_key(lock.lock_id))
+            )
+        except get_redis_errors():
+            return False
+        return value is not None and int(value) == lock.token
+
+
+def get_lock_backend() -> BaseLockBackend:
+    return import_string(settings.LOCK_BACKEND)()
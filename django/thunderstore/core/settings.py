@@ -54,6 +54,17 @@ env = environ.Env(
     AWS_LOCATION=(str, ""),
     AWS_QUERYSTRING_AUTH=(bool, False),
     REDIS_URL=(str, ""),
+    CACHE_BACKGROUND_REFRESH=(bool, True),
+    LOCK_BACKEND=(str, ""),
+    LOCAL_CACHE_MAX_SIZE=(int, 64 * 1024 * 1024),
+    API_V1_BULK_SERIALIZER=(bool, False),
+    API_SNAPSHOT_COMMUNITIES=(list, []),
+    API_V1_CHANGES_SETTLE_SECONDS=(int, 300),
+    DOWNLOAD_EVENT_RETENTION_HOURS=(int, 24),
+    DOWNLOAD_COUNTER_BACKEND=(
+        str,
+        "thunderstore.repository.downloads.DatabaseDownloadCounter",
+    ),
     DB_CERT_DIR=(str, ""),
     DB_CLIENT_CERT=(str, ""),
     DB_CLIENT_KEY=(str, ""),
@@ -299,6 +310,42 @@ if REDIS_URL:
         }
     }
 
+# Per worker memory cap in bytes for the in-process cache tier, 0 disables it
+LOCAL_CACHE_MAX_SIZE = env.int("LOCAL_CACHE_MAX_SIZE")
+
+# Lock backend used to coordinate cache regeneration between workers
+LOCK_BACKEND = env.str("LOCK_BACKEND")
+if not LOCK_BACKEND:
+    if REDIS_URL:
+        LOCK_BACKEND = "thunderstore.core.locks.RedisLockBackend"
+    else:
+        LOCK_BACKEND = "thunderstore.core.locks.CacheLockBackend"
+
+# Refresh stale-while-revalidate cache entries on a background thread instead
+# of the request thread which noticed the entry was stale
+CACHE_BACKGROUND_REFRESH = env.bool("CACHE_BACKGROUND_REFRESH")
+
+# Serialize the v1 package index with values() queries instead of DRF. Opt-in
+# fast path, the DRF serializer stays the default
+API_V1_BULK_SERIALIZER = env.bool("API_V1_BULK_SERIALIZER")
+
+# Identifiers of communities whose package indexes are published as static
+# snapshots to the default file storage, and served by redirecting to them
+API_SNAPSHOT_COMMUNITIES = env.list("API_SNAPSHOT_COMMUNITIES")
+
+# Package changes younger than this are listed again after the v1 changes
+# cursor, as a change recorded in a transaction which is still running might
+# commit after newer changes have already been listed
+API_V1_CHANGES_SETTLE_SECONDS = env.int("API_V1_CHANGES_SETTLE_SECONDS")
+
+# Download counting backend. The cache and Redis backends buffer download
+# counts outside the database until they're flushed by a periodic task
+DOWNLOAD_COUNTER_BACKEND = env.str("DOWNLOAD_COUNTER_BACKEND")
+
+# Download events whose latest download is older than this are pruned. Never
+# shorter than the download dedup window regardless of the setting
+DOWNLOAD_EVENT_RETENTION_HOURS = env.int("DOWNLOAD_EVENT_RETENTION_HOURS")
+
 # if DEBUG and not DEBUG_SIMULATED_LAG:
 #     CACHES = {
 #         "default": {
@@ -0,0 +1,389 @@
+import gzip
+import hashlib
+import time
+from unittest.mock import Mock
+
+import pytest
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import RequestFactory
+
+from thunderstore.core.cache import (
+    CacheBustCondition,
+    CachedResponse,
+    CacheTagType,
+    LocalCache,
+    cache_function_result,
+    cache_get_or_set,
+    get_cache_key,
+    get_cache_tag,
+    get_unversioned_cache_key,
+    invalidate_cache,
+    run_in_background,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_cache_get_cache_tag():
+    assert get_cache_tag(CacheTagType.package, 5) == "package:5"
+
+
+def test_cache_get_cache_tag_invalid_type():
+    with pytest.raises(ValueError) as e:
+        get_cache_tag("invalid", 5)
+    assert "Invalid cache tag type: invalid" in str(e.value)
+
+
+def test_cache_get_cache_key_untagged_is_stable():
+    kwargs = dict(
+        cache_bust_condition=CacheBustCondition.any_package_updated,
+        cache_type="test",
+        key="key",
+        vary_on=("a", 1),
+    )
+    assert get_cache_key(**kwargs) == get_cache_key(**kwargs)
+
+
+@pytest.mark.parametrize("tags", (None, "package:1"))
+def test_cache_invalidate_cache_untagged(tags):
+    def get_key(condition):
+        return get_cache_key(
+            cache_bust_condition=condition,
+            cache_type="test",
+            key="key",
+            vary_on=(),
+        )
+
+    original = get_key(CacheBustCondition.any_package_updated)
+    other = get_key(CacheBustCondition.dynamic_html_updated)
+    invalidate_cache(CacheBustCondition.any_package_updated, tags=tags)
+
+    invalidated = get_key(CacheBustCondition.any_package_updated)
+    assert invalidated != original
+    assert get_unversioned_cache_key(invalidated) == get_unversioned_cache_key(original)
+    assert get_key(CacheBustCondition.dynamic_html_updated) == other
+
+
+def test_cache_invalidate_cache_without_tags_busts_tagged():
+    kwargs = dict(
+        cache_bust_condition=CacheBustCondition.any_package_updated,
+        cache_type="test",
+        key="key",
+        vary_on=(),
+        tags=["package:1"],
+    )
+    original = get_cache_key(**kwargs)
+    invalidate_cache(CacheBustCondition.any_package_updated)
+    assert get_cache_key(**kwargs) != original
+
+
+def test_cache_invalidate_cache_without_delete_pattern():
+    assert not hasattr(cache, "delete_pattern")
+    key = get_cache_key(
+        cache_bust_condition=CacheBustCondition.any_package_updated,
+        cache_type="test",
+        key="key",
+        vary_on=(),
+    )
+    cache.set(key, "value")
+    invalidate_cache(CacheBustCondition.any_package_updated)
+    key = get_cache_key(
+        cache_bust_condition=CacheBustCondition.any_package_updated,
+        cache_type="test",
+        key="key",
+        vary_on=(),
+    )
+    assert cache.get(key) is None
+
+
+def test_cache_get_cache_key_background_update_only_is_unversioned():
+    key = get_cache_key(
+        cache_bust_condition=CacheBustCondition.background_update_only,
+        cache_type="test",
+        key="key",
+        vary_on=(),
+    )
+    assert get_unversioned_cache_key(key) == key
+    with pytest.raises(ValueError):
+        get_cache_key(
+            cache_bust_condition=CacheBustCondition.background_update_only,
+            cache_type="test",
+            key="key",
+            vary_on=(),
+            tags="package:1",
+        )
+
+
+def test_cache_get_cache_key_changes_only_for_invalidated_tags():
+    def get_key(tag):
+        return get_cache_key(
+            cache_bust_condition=CacheBustCondition.any_package_updated,
+            cache_type="test",
+            key="key",
+            vary_on=(),
+            tags=[tag],
+        )
+
+    first = get_key("package:1")
+    second = get_key("package:2")
+    assert first != second
+
+    invalidate_cache(CacheBustCondition.any_package_updated, tags=["package:1"])
+    assert get_key("package:1") != first
+    assert get_key("package:2") == second
+
+
+@pytest.mark.django_db
+def test_cache_function_result_tags():
+    calls = []
+
+    @cache_function_result(
+        cache_until=CacheBustCondition.any_package_updated,
+        tags=lambda package_id: get_cache_tag(CacheTagType.package, package_id),
+    )
+    def get_value(package_id):
+        calls.append(package_id)
+        return f"value-{package_id}"
+
+    assert get_value(1) == "value-1"
+    assert get_value(2) == "value-2"
+    assert get_value(1) == "value-1"
+    assert calls == [1, 2]
+
+    invalidate_cache(CacheBustCondition.any_package_updated, tags="package:1")
+    assert get_value(1) == "value-1"
+    assert get_value(2) == "value-2"
+    assert calls == [1, 2, 1]
+
+
+@pytest.mark.django_db
+def test_cache_until_template_tag_tags():
+    template = Template(
+        "{% load cache_until %}"
+        '{% cache_until "any_package_updated" "test" 300 tags=tag %}'
+        "{{ value }}"
+        "{% endcache %}"
+    )
+    assert template.render(Context({"tag": "package:1", "value": "a"})) == "a"
+    assert template.render(Context({"tag": "package:1", "value": "b"})) == "a"
+    assert template.render(Context({"tag": "package:2", "value": "c"})) == "c"
+
+    invalidate_cache(CacheBustCondition.any_package_updated, tags="package:1")
+    assert template.render(Context({"tag": "package:1", "value": "d"})) == "d"
+    assert template.render(Context({"tag": "package:2", "value": "e"})) == "c"
+
+
+def _get_stale_key():
+    return get_cache_key(
+        cache_bust_condition=CacheBustCondition.any_package_updated,
+        cache_type="test",
+        key="stale",
+        vary_on=(),
+    )
+
+
+@pytest.mark.django_db
+def test_cache_stale_while_revalidate_serves_stale_after_invalidation():
+    values = iter(("a", "b"))
+
+    def get_value():
+        return cache_get_or_set(
+            key=_get_stale_key(),
+            default=lambda: next(values),
+            expiry=300,
+            stale_expiry=3600,
+        )
+
+    assert get_value() == "a"
+    assert get_value() == "a"
+    invalidate_cache(CacheBustCondition.any_package_updated)
+    # The stale value is served while the refresh happens
+    assert get_value() == "a"
+    assert get_value() == "b"
+
+
+@pytest.mark.django_db
+def test_cache_stale_while_revalidate_serves_stale_after_soft_expiry(mocker):
+    values = iter(("a", "b"))
+
+    def get_value():
+        return cache_get_or_set(
+            key=_get_stale_key(),
+            default=lambda: next(values),
+            expiry=300,
+            stale_expiry=3600,
+        )
+
+    now = time.time()
+    mocked_time = mocker.patch("thunderstore.core.cache.time")
+    mocked_time.time.return_value = now
+    assert get_value() == "a"
+    mocked_time.time.return_value = now + 301
+    assert get_value() == "a"
+    assert get_value() == "b"
+
+
+@pytest.mark.django_db
+def test_cache_stale_while_revalidate_refreshes_once():
+    generator = Mock(side_effect=("a", "b", "c"))
+
+    def get_value():
+        return cache_get_or_set(
+            key=_get_stale_key(),
+            default=generator,
+            expiry=300,
+            stale_expiry=3600,
+        )
+
+    assert get_value() == "a"
+    invalidate_cache(CacheBustCondition.any_package_updated)
+    # Simulate another caller already refreshing the entry
+    assert cache.add(f"refresh.{_get_stale_key()}", True)
+    assert get_value() == "a"
+    assert get_value() == "a"
+    assert generator.call_count == 1
+
+
+def test_cache_run_in_background(settings, mocker):
+    settings.CACHE_BACKGROUND_REFRESH = True
+    mocked_thread = mocker.patch("thunderstore.core.cache.threading.Thread")
+    task = Mock()
+    run_in_background(task)
+    task.assert_not_called()
+    mocked_thread.return_value.start.assert_called_once()
+
+
+def test_cache_run_in_background_disabled(settings):
+    settings.CACHE_BACKGROUND_REFRESH = False
+    task = Mock()
+    run_in_background(task)
+    task.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_cache_until_template_tag_stale():
+    template = Template(
+        "{% load cache_until %}"
+        '{% cache_until "any_package_updated" "test" 300 tags="package:1" stale=3600 %}'
+        "{{ value }}"
+        "{% endcache %}"
+    )
+    assert template.render(Context({"value": "a"})) == "a"
+    invalidate_cache(CacheBustCondition.any_package_updated, tags="package:1")
+    assert template.render(Context({"value": "b"})) == "a"
+    assert template.render(Context({"value": "c"})) == "b"
+
+
+def test_cache_regenerate_cache_not_stored_if_lock_lost(mocker):
+    mocker.patch("thunderstore.core.locks.Lock.is_held", return_value=False)
+    result = cache_get_or_set(
+        key=_get_stale_key(),
+        default=lambda: "value",
+        expiry=300,
+    )
+    assert result == "value"
+    assert cache.get(_get_stale_key()) is None
+
+
+def test_cache_regenerate_cache_outside_database_transaction():
+    result = cache_get_or_set(
+        key=_get_stale_key(),
+        default=lambda: "value",
+        expiry=300,
+    )
+    assert result == "value"
+    assert cache.get(_get_stale_key()) == "value"
+
+
+def test_cache_local_cache_serves_from_memory_while_stamp_matches():
+    local = LocalCache(max_size=1024)
+    local.set("key", "value", None)
+    # Fetching the value from the shared cache would return a different value
+    cache.set("key", "other", None)
+    assert local.get("key") == "value"
+    assert local.get_stats()["hits"] == 1
+
+    local.set("key", "new", None)
+    other_worker = LocalCache(max_size=1024)
+    assert other_worker.get("key") == "new"
+    assert other_worker.get_stats()["misses"] == 1
+    assert other_worker.get("key") == "new"
+    assert other_worker.get_stats()["hits"] == 1
+
+
+def test_cache_local_cache_revalidates_against_shared_stamp():
+    local = LocalCache(max_size=1024)
+    other_worker = LocalCache(max_size=1024)
+    local.set("key", "value", None)
+    assert other_worker.get("key") == "value"
+    local.set("key", "new", None)
+    assert other_worker.get("key") == "new"
+
+
+def test_cache_local_cache_evicts_least_recently_used():
+    local = LocalCache(max_size=10)
+    local.set("a", "aaaa", None)
+    local.set("b", "bbbb", None)
+    assert local.get("a") == "aaaa"
+    local.set("c", "cccc", None)
+    stats = local.get_stats()
+    assert stats["entries"] == 2
+    assert stats["size"] == 8
+    assert local._get_local("b", cache.get(LocalCache.get_stamp_key("b"))) is None
+    # Evicted entries are still available from the shared cache
+    assert local.get("b") == "bbbb"
+
+
+def test_cache_local_cache_skips_values_larger_than_max_size():
+    local = LocalCache(max_size=3)
+    local.set("key", "value", None)
+    assert local.get_stats()["entries"] == 0
+    assert local.get("key") == "value"
+
+
+def test_cache_cached_response_from_stream():
+    chunks = [b"[", b'{"a":1}', b",", b'{"b":2}', b"]"]
+    content = b"".join(chunks)
+    response = CachedResponse.from_stream(
+        chunks=iter(chunks), headers=[("Content-Type", "application/json")]
+    )
+    assert response.status == 200
+    assert gzip.decompress(response.gzip_content) == content
+    assert response.content_hash == hashlib.sha256(content).hexdigest()
+    assert response.headers == [("Content-Type", "application/json")]
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    (
+        ("", None),
+        ("gzip", "gzip"),
+        ("gzip, br", "br"),
+        ("br;q=0, gzip", "gzip"),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("gzip;q=0", None),
+        ("GZIP;Q=0.1", "gzip"),
+        ("identity, *;q=0", None),
+        ("*", "br"),
+        ("*, br;q=0", "gzip"),
+        ("deflate", None),
+        ("gzip;q=invalid", None),
+    ),
+)
+def test_cache_cached_response_encoding_negotiation(accept_encoding, expected):
+    content = b'{"a":1}'
+    response = CachedResponse.from_stream(
+        chunks=iter([content]), headers=[("Content-Type", "application/json")]
+    )
+    response.brotli_content = b"brotli"
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+    result = response.to_response(request)
+    assert result.get("Content-Encoding") == expected
+    if expected is None:
+        assert result.content == content
@@ -23,6 +23,11 @@ KNOWN_CELERY_IDS = (
     "celery.starmap",
     "celery.backend_cleanup",
     "thunderstore.repository.tasks.update_api_caches",
+    "thunderstore.repository.tasks.update_community_api_cache",
+    "thunderstore.repository.tasks.cleanup_api_caches",
+    "thunderstore.repository.tasks.flush_download_counters",
+    "thunderstore.repository.tasks.prune_download_events",
+    "thunderstore.repository.tasks.update_dependency_graph",
 )
 
 
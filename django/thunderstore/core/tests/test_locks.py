@@ -0,0 +1,177 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from redis.exceptions import ConnectionError
+
+from thunderstore.core.locks import (
+    CacheLockBackend,
+    PostgresAdvisoryLockBackend,
+    RedisLockBackend,
+    get_fence_timeout,
+    get_lock_backend,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_locks_get_lock_backend(settings):
+    settings.LOCK_BACKEND = "thunderstore.core.locks.CacheLockBackend"
+    assert isinstance(get_lock_backend(), CacheLockBackend)
+    settings.LOCK_BACKEND = "thunderstore.core.locks.RedisLockBackend"
+    assert isinstance(get_lock_backend(), RedisLockBackend)
+    settings.LOCK_BACKEND = "thunderstore.core.locks.PostgresAdvisoryLockBackend"
+    assert isinstance(get_lock_backend(), PostgresAdvisoryLockBackend)
+
+
+def test_locks_cache_lock_backend_lock():
+    backend = CacheLockBackend()
+    with backend.lock("test-lock") as lock:
+        assert lock.acquired is True
+        assert lock.is_held() is True
+        with backend.lock("test-lock") as lock2:
+            assert lock2.acquired is False
+            assert lock2.is_held() is False
+        with backend.lock("other-lock") as lock3:
+            assert lock3.acquired is True
+        assert lock.is_held() is True
+    assert lock.is_held() is False
+    with backend.lock("test-lock") as lock4:
+        assert lock4.acquired is True
+
+
+def test_locks_cache_lock_backend_fencing_token_increases():
+    backend = CacheLockBackend()
+    with backend.lock("test-lock") as lock:
+        first = lock.token
+    with backend.lock("test-lock") as lock:
+        assert lock.token > first
+
+
+def test_locks_cache_lock_backend_expired_lock_not_released_by_old_holder():
+    backend = CacheLockBackend()
+    with backend.lock("test-lock") as lock:
+        # Simulate the lock expiring and being taken over by another worker
+        cache.delete(backend.get_lock_key("test-lock"))
+        other = backend.acquire("test-lock", timeout=60)
+        assert other.acquired is True
+        assert lock.is_held() is False
+    assert other.is_held() is True
+
+
+@pytest.mark.django_db
+def test_locks_cache_lock_backend_works_in_transaction():
+    backend = CacheLockBackend()
+    with backend.lock("test-lock") as lock:
+        assert lock.acquired is True
+
+
+def test_locks_cache_lock_backend_fence_expires(mocker):
+    backend = CacheLockBackend()
+    fence_key = backend.get_fence_key("test-lock")
+    with backend.lock("test-lock", timeout=60):
+        pass
+    assert cache.get(fence_key) == 1
+    now = time.time()
+    mocker.patch("time.time", return_value=now + 61)
+    assert cache.get(fence_key) == 1
+    mocker.patch("time.time", return_value=now + get_fence_timeout(60) + 1)
+    assert cache.get(fence_key) is None
+
+
+class FakeRedis:
+    """
+    Implements the subset of the Redis client used by RedisLockBackend.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.expiries = {}
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def expire(self, key, seconds):
+        self.expiries[key] = seconds * 1000
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value).encode()
+        self.expiries[key] = px
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def eval(self, script, numkeys, key, token):
+        assert script == RedisLockBackend.RELEASE_SCRIPT
+        if self.values.get(key) == str(token).encode():
+            del self.values[key]
+            return 1
+        return 0
+
+
+@pytest.fixture()
+def redis_client(mocker):
+    client = FakeRedis()
+    mocker.patch.object(RedisLockBackend, "get_client", return_value=client)
+    return client
+
+
+def test_locks_redis_lock_backend_lock(redis_client):
+    backend = RedisLockBackend()
+    lock_key = cache.make_key(backend.get_lock_key("test-lock"))
+    fence_key = cache.make_key(backend.get_fence_key("test-lock"))
+    with backend.lock("test-lock", timeout=60) as lock:
+        assert lock.acquired is True
+        assert lock.is_held() is True
+        assert redis_client.values[lock_key] == str(lock.token).encode()
+        assert redis_client.expiries[lock_key] == 60 * 1000
+        assert redis_client.expiries[fence_key] == get_fence_timeout(60) * 1000
+        with backend.lock("test-lock") as lock2:
+            assert lock2.acquired is False
+            assert lock2.is_held() is False
+            assert lock2.token is None
+        assert lock.is_held() is True
+    assert lock.is_held() is False
+    assert lock_key not in redis_client.values
+
+
+def test_locks_redis_lock_backend_fencing_token_increases(redis_client):
+    backend = RedisLockBackend()
+    with backend.lock("test-lock") as lock:
+        first = lock.token
+    with backend.lock("test-lock") as lock:
+        assert lock.token > first
+
+
+def test_locks_redis_lock_backend_expired_lock_not_released_by_old_holder(
+    redis_client,
+):
+    backend = RedisLockBackend()
+    with backend.lock("test-lock") as lock:
+        # Simulate the lock expiring and being taken over by another worker
+        del redis_client.values[cache.make_key(backend.get_lock_key("test-lock"))]
+        other = backend.acquire("test-lock", timeout=60)
+        assert other.acquired is True
+        assert other.token > lock.token
+        assert lock.is_held() is False
+    assert other.is_held() is True
+
+
+def test_locks_redis_lock_backend_redis_unavailable(redis_client, mocker):
+    backend = RedisLockBackend()
+    with backend.lock("test-lock") as lock:
+        for method in ("incr", "set", "get", "eval"):
+            mocker.patch.object(redis_client, method, side_effect=ConnectionError())
+        assert lock.is_held() is False
+    with backend.lock("test-lock") as lock:
+        assert lock.acquired is False
+        assert lock.is_held() is False
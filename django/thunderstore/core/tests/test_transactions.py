@@ -9,6 +9,7 @@ from thunderstore.core.transactions import (
     _get_lock_id_from_str,
     _get_xact_lock,
     atomic_lock,
+    on_commit_batched,
 )
 
 
@@ -163,3 +164,40 @@ def test_transactions_atomic_lock_fails_if_called_in_existing_transaction():
         "Unable to acquire a transaction scoped lock while already in a transaction"
         in str(e.value)
     )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transactions_on_commit_batched():
+    calls = []
+    on_commit_batched(calls.append, [1])
+    assert calls == [{1}]
+
+    with transaction.atomic():
+        on_commit_batched(calls.append, [1, 2])
+        on_commit_batched(calls.append, [2, 3])
+        assert calls == [{1}]
+    assert calls == [{1}, {1, 2, 3}]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transactions_on_commit_batched_rollback():
+    calls = []
+    with transaction.atomic():
+        on_commit_batched(calls.append, [1])
+        try:
+            with transaction.atomic():
+                on_commit_batched(calls.append, [2])
+                raise RuntimeError()
+        except RuntimeError:
+            pass
+        on_commit_batched(calls.append, [3])
+    assert calls == [{1, 2, 3}]
+
+    try:
+        with transaction.atomic():
+            on_commit_batched(calls.append, [4])
+            raise RuntimeError()
+    except RuntimeError:
+        pass
+    on_commit_batched(calls.append, [5])
+    assert calls == [{1, 2, 3}, {5}]
@@ -1,5 +1,5 @@
 from contextlib import contextmanager
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, Optional, Set
 from zlib import crc32
 
 from django.db import DEFAULT_DB_ALIAS, connections, transaction
@@ -30,6 +30,45 @@ def atomic_lock(
         )
 
 
+class _CommitBatch:
+    def __init__(self, func: Callable[[Set], Any], batches: Dict[Callable, Any]):
+        self.func = func
+        self.batches = batches
+        self.items = set()
+
+    def __call__(self):
+        if self.batches.get(self.func) is self:
+            del self.batches[self.func]
+        self.func(self.items)
+
+
+def on_commit_batched(
+    func: Callable[[Set], Any], items: Iterable, using: Optional[str] = None
+) -> None:
+    """
+    Calls func with a set of the items collected from every call with the
+    same func during the current transaction, once the transaction commits.
+    Outside of transactions func is called right away.
+
+    Items added in a savepoint which is rolled back are still passed to func
+    unless the whole batch was rolled back, so func should recompute its
+    results from the database rather than trust the items.
+    """
+    connection = transaction.get_connection(using)
+    batches = connection.__dict__.setdefault("_on_commit_batches", {})
+    batch = batches.get(func)
+    # Callbacks are discarded when the transaction or savepoint they were
+    # registered in is rolled back, along with the batch collected in it
+    if batch is None or all(
+        callback is not batch for _, callback in connection.run_on_commit
+    ):
+        batch = batches[func] = _CommitBatch(func, batches)
+        batch.items.update(items)
+        transaction.on_commit(batch, using=using)
+    else:
+        batch.items.update(items)
+
+
 def _get_lock_id_from_str(lock_id_str: str) -> int:
     pos = crc32(lock_id_str.encode("utf-8"))
     result = (2 ** 31 - 1) & pos
@@ -1,3 +1,5 @@
+from copy import copy
+
 from django.template import Library, Node, TemplateSyntaxError, VariableDoesNotExist
 
 from thunderstore.core.cache import (
@@ -10,12 +12,23 @@ register = Library()
 
 
 class CacheNode(Node):
-    def __init__(self, nodelist, cache_bust_condition, fragment_name, expiry, vary_on):
+    def __init__(
+        self,
+        nodelist,
+        cache_bust_condition,
+        fragment_name,
+        expiry,
+        vary_on,
+        tags,
+        stale_expiry,
+    ):
         self.nodelist = nodelist
         self.cache_bust_condition = cache_bust_condition
         self.expiry = expiry
         self.fragment_name = fragment_name
         self.vary_on = vary_on
+        self.tags = tags
+        self.stale_expiry = stale_expiry
 
     def render(self, context):
         try:
@@ -42,15 +55,44 @@ class CacheNode(Node):
 
         vary_on = [var.resolve(context) for var in self.vary_on]
 
+        tags = None
+        if self.tags is not None:
+            try:
+                tags = self.tags.resolve(context)
+            except VariableDoesNotExist:
+                raise TemplateSyntaxError(
+                    f'"cache_until" tag got an unknown variable: {self.tags.var}'
+                )
+
+        stale_expiry = None
+        if self.stale_expiry is not None:
+            try:
+                stale_expiry = self.stale_expiry.resolve(context)
+            except VariableDoesNotExist:
+                raise TemplateSyntaxError(
+                    f'"cache_until" tag got an unknown variable: {self.stale_expiry.var}'
+                )
+            try:
+                stale_expiry = int(stale_expiry)
+            except (ValueError, TypeError):
+                raise TemplateSyntaxError(
+                    f'"cache_until" tag got a non-integer stale value: {stale_expiry}'
+                )
+            # Stale entries may be re-rendered on another thread after this
+            # context has moved on
+            context = copy(context)
+
         return cache_get_or_set(
             key=get_cache_key(
                 cache_bust_condition=cache_until,
                 cache_type="template",
                 key=self.fragment_name,
                 vary_on=vary_on,
+                tags=tags,
             ),
             default=lambda: self.nodelist.render(context),
             expiry=expire_time,
+            stale_expiry=stale_expiry,
         )
 
 
@@ -70,11 +112,29 @@ def do_cache(parser, token):
             .. some expensive processing ..
         {% endcache %}
     Each unique set of arguments will result in a unique cache entry.
+    The cache entry can additionally be tagged, in which case it's only busted
+    by invalidations of the given cache bust condition targeting those tags::
+        {% load cache_until %}
+        {% cache_until [cache_bust_condition] [fragment_name] [timeout] [var1] .. tags=[tags] %}
+            .. some expensive processing ..
+        {% endcache %}
+    The tags value may be either a single tag or a list of tags.
+    Expired or invalidated fragments can also be served stale for a number of
+    seconds while they're re-rendered in the background::
+        {% load cache_until %}
+        {% cache_until [cache_bust_condition] [fragment_name] [timeout] [var1] .. stale=[stale_timeout] %}
+            .. some expensive processing ..
+        {% endcache %}
     """
     nodelist = parser.parse(("endcache",))
     parser.delete_first_token()
     tokens = token.split_contents()
 
+    options = {"tags": None, "stale": None}
+    while tokens and tokens[-1].partition("=")[0] in options:
+        option, _, value = tokens.pop().partition("=")
+        options[option] = parser.compile_filter(value)
+
     if len(tokens) < 3:
         raise TemplateSyntaxError("'%r' tag requires at least 2 arguments." % tokens[0])
 
@@ -88,4 +148,6 @@ def do_cache(parser, token):
         fragment_name=tokens[2],
         expiry=expiry,
         vary_on=[parser.compile_filter(t) for t in tokens[4:]],
+        tags=options["tags"],
+        stale_expiry=options["stale"],
     )
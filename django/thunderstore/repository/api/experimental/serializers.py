@@ -1,9 +1,13 @@
+from datetime import timedelta
+
 from django.db.models import Q
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.fields import SerializerMethodField, empty
 
 from thunderstore.community.models import Community, PackageCategory, PackageListing
 from thunderstore.repository.models import Package, PackageVersion, UploaderIdentity
+from thunderstore.repository.package_reference import PackageReference
 from thunderstore.repository.package_upload import PackageUploadForm
 from thunderstore.repository.serializer_fields import ModelChoiceField
 
@@ -185,3 +189,41 @@ class PackageUploadSerializerExperiemental(serializers.Serializer):
         form = self._create_form(validated_data)
         form.is_valid()
         return form.save()
+
+
+class PackageDownloadStatsQuerySerializer(serializers.Serializer):
+    DEFAULT_DAYS = 30
+    MAX_DAYS = 366
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, data):
+        date_to = data.get("date_to") or timezone.now().date()
+        date_from = data.get("date_from") or (
+            date_to - timedelta(days=self.DEFAULT_DAYS - 1)
+        )
+        if date_from > date_to:
+            raise serializers.ValidationError("date_from must not be after date_to")
+        if (date_to - date_from).days >= self.MAX_DAYS:
+            raise serializers.ValidationError(
+                f"The date range can't be longer than {self.MAX_DAYS} days"
+            )
+        return {"date_from": date_from, "date_to": date_to}
+
+
+class PackageReferenceListField(serializers.ListField):
+    child = serializers.CharField()
+
+    def to_internal_value(self, data):
+        references = []
+        for value in super().to_internal_value(data):
+            try:
+                references.append(PackageReference.parse(value))
+            except ValueError:
+                raise serializers.ValidationError(f"Invalid package reference: {value}")
+        return references
+
+
+class DependencyResolveRequestSerializer(serializers.Serializer):
+    packages = PackageReferenceListField(allow_empty=False, max_length=1000)
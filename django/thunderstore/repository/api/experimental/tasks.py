@@ -3,14 +3,26 @@ from django.test.client import RequestFactory
 from thunderstore.community.middleware import add_community_context_to_request
 from thunderstore.community.models import CommunitySite
 from thunderstore.repository.api.experimental.views import PackageListApiView
+from thunderstore.repository.models import ApiSnapshot
 
 
 def update_api_experimental_caches():
     for community_site in CommunitySite.objects.all():
-        request = RequestFactory().get(
-            "/api/experimental/package/", SERVER_NAME=community_site.site.domain
+        update_api_experimental_cache(community_site)
+
+
+def update_api_experimental_cache(community_site):
+    request = RequestFactory().get(
+        "/api/experimental/package/", SERVER_NAME=community_site.site.domain
+    )
+    # TODO: Somehow use middleware instead
+    add_community_context_to_request(request)
+    view = PackageListApiView.as_view()
+    response = PackageListApiView.update_cache(view, request)
+    if ApiSnapshot.is_enabled(community_site) and response.status == 200:
+        ApiSnapshot.publish(
+            community_site,
+            "experimental",
+            response.gzip_content,
+            response.content_hash,
         )
-        # TODO: Somehow use middleware instead
-        add_community_context_to_request(request)
-        view = PackageListApiView.as_view()
-        PackageListApiView.update_cache(view, request)
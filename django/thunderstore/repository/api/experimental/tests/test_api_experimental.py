@@ -1,15 +1,21 @@
 import io
 import json
+from datetime import timedelta
 from zipfile import ZIP_DEFLATED, ZipFile
 
 import pytest
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
 from PIL import Image
 
 from thunderstore.repository.api.experimental.tasks import (
     update_api_experimental_caches,
 )
+from thunderstore.repository.dependency_graph import clear_dependency_graph
+from thunderstore.repository.factories import PackageFactory, PackageVersionFactory
 from thunderstore.repository.models import (
+    PackageVersionDownloadStat,
     UploaderIdentityMember,
     UploaderIdentityMemberRole,
 )
@@ -32,6 +38,17 @@ def test_api_experimental(api_client, active_package_listing):
     )
 
 
+@pytest.mark.django_db
+def test_api_experimental_conditional_etag(api_client, active_package_listing):
+    update_api_experimental_caches()
+    response = api_client.get("/api/experimental/package/")
+    assert response.status_code == 200
+    response = api_client.get(
+        "/api/experimental/package/", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert response.status_code == 304
+
+
 def _create_test_zip(manifest_data):
     icon_raw = io.BytesIO()
     icon = Image.new("RGB", (256, 256), "#FF0000")
@@ -175,3 +192,86 @@ def test_api_experimental_upload_package_fail_invalid_category(
     name = "name"
     version = "1.0.0"
     assert PackageReference(namespace, name, version).exists is False
+
+
+@pytest.mark.django_db
+def test_api_experimental_package_downloads(
+    api_client, active_package_listing, community
+):
+    package = active_package_listing.package
+    version, other_version = (
+        PackageVersionFactory.create(
+            package=package, name=package.name, version_number=version_number
+        )
+        for version_number in ("2.0.0", "3.0.0")
+    )
+    today = timezone.now().date()
+    for days_ago, downloads in ((0, 3), (2, 5), (40, 7)):
+        PackageVersionDownloadStat.objects.create(
+            package=package,
+            version=version,
+            community=community,
+            date=today - timedelta(days=days_ago),
+            downloads=downloads,
+        )
+    PackageVersionDownloadStat.objects.create(
+        package=package,
+        version=other_version,
+        community=community,
+        date=today,
+        downloads=1,
+    )
+    url = f"/api/experimental/package/{package.owner.name}/{package.name}/downloads/"
+
+    result = api_client.get(url).json()
+    assert len(result["downloads"]) == 30
+    assert result["date_to"] == today.isoformat()
+    assert result["downloads"][-1] == {"date": today.isoformat(), "downloads": 4}
+    assert result["downloads"][-3]["downloads"] == 5
+    assert sum(x["downloads"] for x in result["downloads"]) == 9
+
+    date_from = (today - timedelta(days=40)).isoformat()
+    date_to = (today - timedelta(days=39)).isoformat()
+    result = api_client.get(url, {"date_from": date_from, "date_to": date_to}).json()
+    assert result["downloads"] == [
+        {"date": date_from, "downloads": 7},
+        {"date": date_to, "downloads": 0},
+    ]
+
+    response = api_client.get(url, {"date_from": "2020-01-02", "date_to": "2020-01-01"})
+    assert response.status_code == 400
+    response = api_client.get(url, {"date_from": "2019-01-01", "date_to": "2020-12-31"})
+    assert response.status_code == 400
+    assert api_client.get(f"{url[:-11]}-missing/downloads/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_api_experimental_resolve_dependencies(api_client, active_version):
+    clear_dependency_graph()
+    cache.clear()
+    dependant = PackageVersionFactory.create(
+        package=PackageFactory.create(is_active=True), is_active=True
+    )
+    dependant.dependencies.add(active_version)
+    url = "/api/experimental/package/resolve-dependencies/"
+
+    response = api_client.post(
+        url,
+        {"packages": [dependant.package.full_package_name, "Missing-Package"]},
+        format="json",
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["unresolved"] == ["Missing-Package"]
+    assert [x["full_name"] for x in result["versions"]] == [
+        active_version.full_version_name,
+        dependant.full_version_name,
+    ]
+    assert result["versions"][1]["dependencies"] == [active_version.full_version_name]
+    assert result["versions"][0]["download_url"] == (
+        f"http://testsite.test{active_version.download_url}"
+    )
+
+    response = api_client.post(url, {"packages": ["invalid"]}, format="json")
+    assert response.status_code == 400
+    assert api_client.post(url, {"packages": []}, format="json").status_code == 400
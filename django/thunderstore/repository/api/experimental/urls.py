@@ -1,6 +1,8 @@
 from django.urls import path
 
 from thunderstore.repository.api.experimental.views import (
+    DependencyResolveApiView,
+    PackageDownloadStatsApiView,
     PackageListApiView,
     UploadPackageApiView,
 )
@@ -12,4 +14,14 @@ urls = [
     ),
     path("package/", PackageListApiView.as_view(), name="package-list"),
     path("package/upload/", UploadPackageApiView.as_view(), name="package-upload"),
+    path(
+        "package/resolve-dependencies/",
+        DependencyResolveApiView.as_view(),
+        name="package-resolve-dependencies",
+    ),
+    path(
+        "package/<str:owner>/<str:name>/downloads/",
+        PackageDownloadStatsApiView.as_view(),
+        name="package-downloads",
+    ),
 ]
@@ -2,6 +2,7 @@ import json
 
 from django.db.models import Q
 from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework import permissions
 from rest_framework.generics import ListAPIView
 from rest_framework.parsers import MultiPartParser
@@ -17,13 +18,21 @@ from thunderstore.core.cache import (
 )
 from thunderstore.core.utils import CommunitySiteSerializerContext
 from thunderstore.repository.api.experimental.serializers import (
+    DependencyResolveRequestSerializer,
+    PackageDownloadStatsQuerySerializer,
     PackageListingSerializerExperimental,
     PackageUploadSerializerExperiemental,
     PackageVersionSerializerExperimental,
 )
+from thunderstore.repository.api.v1.bulk_serializers import get_url_template
+from thunderstore.repository.dependency_graph import get_dependency_graph
+from thunderstore.repository.models import ApiSnapshot, PackageVersionDownloadStat
 
 
-@cache_function_result(cache_until=CacheBustCondition.any_package_updated)
+@cache_function_result(
+    cache_until=CacheBustCondition.any_package_updated,
+    tags=lambda community_site: community_site.community.cache_tag,
+)
 def get_mod_list_queryset(community_site: CommunitySite):
     return (
         PackageListing.objects.active()
@@ -68,6 +77,9 @@ class PackageListApiView(
     def get_queryset(self):
         return get_mod_list_queryset(self.request.community_site)
 
+    def get_snapshot_url(self):
+        return ApiSnapshot.get_latest_url(self.request.community_site, "experimental")
+
 
 class UploadPackageApiView(APIView):
     """
@@ -86,3 +98,79 @@ class UploadPackageApiView(APIView):
         package_version = serializer.save()
         serializer = PackageVersionSerializerExperimental(instance=package_version)
         return Response(serializer.data)
+
+
+class PackageDownloadStatsApiView(APIView):
+    """
+    Lists the daily downloads of a package in the current community.
+    Defaults to the last 30 days, other ranges can be requested with the
+    date_from and date_to (inclusive) query parameters.
+    """
+
+    def get(self, request, owner, name):
+        query = PackageDownloadStatsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        date_from = query.validated_data["date_from"]
+        date_to = query.validated_data["date_to"]
+
+        listing = get_object_or_404(
+            PackageListing.objects.select_related("package"),
+            package__owner__name=owner,
+            package__name=name,
+            community=request.community,
+        )
+        downloads = PackageVersionDownloadStat.get_daily_downloads(
+            listing.package, request.community, date_from, date_to
+        )
+        return Response(
+            {
+                "date_from": date_from,
+                "date_to": date_to,
+                "downloads": [
+                    {"date": day, "downloads": amount}
+                    for day, amount in downloads.items()
+                ],
+            }
+        )
+
+
+class DependencyResolveApiView(APIView):
+    """
+    Resolves package references to the referenced versions and all of their
+    transitive dependencies. Versionless references resolve to the latest
+    version of the package. Versions are listed after their dependencies.
+    """
+
+    def post(self, request):
+        serializer = DependencyResolveRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        graph = get_dependency_graph()
+        resolved, unresolved = graph.resolve(serializer.validated_data["packages"])
+        download_url_template = get_url_template(
+            "packages.download", "owner", "name", "version"
+        )
+        versions = []
+        for version_id in resolved:
+            version = graph.versions[version_id]
+            versions.append(
+                {
+                    "full_name": version.full_name,
+                    "namespace": version.namespace,
+                    "name": version.name,
+                    "version_number": version.version_number,
+                    "dependencies": [
+                        graph.versions[dependency].full_name
+                        for dependency in graph.dependencies.get(version_id, ())
+                        if dependency in graph.versions
+                    ],
+                    "download_url": request.build_absolute_uri(
+                        download_url_template.format(
+                            owner=version.namespace,
+                            name=version.name,
+                            version=version.version_number,
+                        )
+                    ),
+                }
+            )
+        return Response({"versions": versions, "unresolved": unresolved})
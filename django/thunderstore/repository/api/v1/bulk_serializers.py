@@ -0,0 +1,197 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.urls import reverse
+from rest_framework.fields import DateTimeField
+
+from thunderstore.community.models import PackageListing
+from thunderstore.repository.models import PackageVersion
+
+_datetime_field = DateTimeField()
+
+
+def format_datetime(value) -> str:
+    return _datetime_field.to_representation(value)
+
+
+def get_url_template(viewname: str, *kwargs: str) -> str:
+    """
+    Reverses an URL once with placeholder arguments and returns it as a
+    str.format template. Only usable for arguments which don't need quoting,
+    which is the case for owner names, package names and version numbers.
+    """
+    placeholders = {kwarg: f"__{kwarg.upper()}__" for kwarg in kwargs}
+    template = reverse(viewname, kwargs=placeholders)
+    template = template.replace("{", "{{").replace("}", "}}")
+    for kwarg, placeholder in placeholders.items():
+        template = template.replace(placeholder, f"{{{kwarg}}}")
+    return template
+
+
+class BulkPackageListingSerializer:
+    """
+    Serializes package listings into the same representation as the v1
+    PackageListingSerializer, but reads the data with a handful of values()
+    queries per batch instead of model instances and related managers.
+
+    URL prefixes are computed once per serializer, as they only depend on
+    the community site and request host.
+    """
+
+    def __init__(self, request: HttpRequest, community_site):
+        self.request = request
+        self.community_site = community_site
+        self.package_url_template = "%s%s%s" % (
+            settings.PROTOCOL,
+            community_site.site.domain,
+            get_url_template("packages.detail", "owner", "name"),
+        )
+        download_prefix = request.build_absolute_uri("/")[:-1]
+        if settings.PROTOCOL == "https://" and download_prefix.startswith("http://"):
+            download_prefix = f"https://{download_prefix[7:]}"
+        self.download_url_template = download_prefix + get_url_template(
+            "packages.download", "owner", "name", "version"
+        )
+        self.icon_storage = PackageVersion._meta.get_field("icon").storage
+
+    def get_icon_url(self, name: str):
+        if not name:
+            return None
+        return self.request.build_absolute_uri(self.icon_storage.url(name))
+
+    def get_dependencies(self, version_ids: List[int]) -> Dict[int, List[str]]:
+        dependencies = defaultdict(list)
+        rows = (
+            PackageVersion.dependencies.through.objects.filter(
+                from_packageversion_id__in=version_ids
+            )
+            .order_by("id")
+            .values_list(
+                "from_packageversion_id",
+                "to_packageversion__package__owner__name",
+                "to_packageversion__package__name",
+                "to_packageversion__version_number",
+            )
+        )
+        for version_id, owner, name, version_number in rows:
+            dependencies[version_id].append(f"{owner}-{name}-{version_number}")
+        return dependencies
+
+    def get_versions(self, packages: Dict[int, dict]) -> Dict[int, List[dict]]:
+        rows = (
+            PackageVersion.objects.filter(
+                package_id__in=packages.keys(), is_active=True
+            )
+            .order_by("-version_major", "-version_minor", "-version_patch")
+            .values_list(
+                "id",
+                "package_id",
+                "name",
+                "description",
+                "icon",
+                "version_number",
+                "downloads",
+                "date_created",
+                "website_url",
+                "is_active",
+                "uuid4",
+            )
+        )
+        dependencies = self.get_dependencies([row[0] for row in rows])
+
+        versions = defaultdict(list)
+        for (
+            version_id,
+            package_id,
+            name,
+            description,
+            icon,
+            version_number,
+            downloads,
+            date_created,
+            website_url,
+            is_active,
+            uuid4,
+        ) in rows:
+            package = packages[package_id]
+            owner, package_name = package["owner"], package["name"]
+            versions[package_id].append(
+                {
+                    "name": name,
+                    "full_name": f"{owner}-{package_name}-{version_number}",
+                    "description": description,
+                    "icon": self.get_icon_url(icon),
+                    "version_number": version_number,
+                    "dependencies": dependencies.get(version_id, []),
+                    "download_url": self.download_url_template.format(
+                        owner=owner, name=package_name, version=version_number
+                    ),
+                    "downloads": downloads,
+                    "date_created": format_datetime(date_created),
+                    "website_url": website_url,
+                    "is_active": is_active,
+                    "uuid4": str(uuid4),
+                }
+            )
+        return versions
+
+    def serialize(self, listing_ids: Iterable[int]) -> Dict[int, dict]:
+        """
+        Returns the serialized representation of each existing listing,
+        keyed by the listing id.
+        """
+        listings = list(
+            PackageListing.objects.filter(id__in=listing_ids).values_list(
+                "id",
+                "package_id",
+                "has_nsfw_content",
+                "package__name",
+                "package__owner__name",
+                "package__date_created",
+                "package__date_updated",
+                "package__uuid4",
+                "package__is_pinned",
+                "package__is_deprecated",
+                "package__rating_count",
+            )
+        )
+        packages = {row[1]: {"name": row[3], "owner": row[4]} for row in listings}
+        categories = defaultdict(list)
+        for listing_id, category in PackageListing.categories.through.objects.filter(
+            packagelisting_id__in=[row[0] for row in listings]
+        ).values_list("packagelisting_id", "packagecategory__name"):
+            categories[listing_id].append(category)
+        versions = self.get_versions(packages)
+
+        result = {}
+        for (
+            listing_id,
+            package_id,
+            has_nsfw_content,
+            name,
+            owner,
+            date_created,
+            date_updated,
+            uuid4,
+            is_pinned,
+            is_deprecated,
+            rating_count,
+        ) in listings:
+            result[listing_id] = {
+                "name": name,
+                "full_name": f"{owner}-{name}",
+                "owner": owner,
+                "package_url": self.package_url_template.format(owner=owner, name=name),
+                "date_created": format_datetime(date_created),
+                "date_updated": format_datetime(date_updated),
+                "uuid4": str(uuid4),
+                "rating_score": rating_count,
+                "is_pinned": is_pinned,
+                "is_deprecated": is_deprecated,
+                "has_nsfw_content": has_nsfw_content,
+                "categories": categories[listing_id],
+                "versions": versions[package_id],
+            }
+        return result
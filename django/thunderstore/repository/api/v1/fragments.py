@@ -0,0 +1,330 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import HttpRequest
+from django.utils.dateparse import parse_datetime
+from rest_framework.renderers import JSONRenderer
+
+from thunderstore.community.models import PackageListing
+from thunderstore.repository.api.v1.bulk_serializers import BulkPackageListingSerializer
+from thunderstore.repository.api.v1.serializers import PackageListingSerializer
+from thunderstore.repository.models import Package, PackageChange
+
+# Bump whenever the serialized representation of a listing changes
+FRAGMENT_SCHEMA_VERSION = 1
+FRAGMENT_EXPIRY = 60 * 60 * 24 * 7
+FRAGMENT_BATCH_SIZE = 500
+# Amount of listings on each page of the paginated index
+INDEX_PAGE_SIZE = 500
+
+LISTING_ORDERING = (
+    "-package__is_pinned",
+    "package__is_deprecated",
+    "-package__date_updated",
+    "-id",
+)
+
+
+def get_fragment_key(community_site_id: int, listing_id: int, version: str) -> str:
+    return (
+        f"api.v1.fragment.{FRAGMENT_SCHEMA_VERSION}"
+        f".{community_site_id}.{listing_id}.{version}"
+    )
+
+
+def get_package_detail_key(community_site_id: int, package_uuid4) -> str:
+    return f"api.v1.detail.{community_site_id}.{package_uuid4}"
+
+
+def get_listed_packages_key(community_site_id: int) -> str:
+    return f"api.v1.listed.{community_site_id}"
+
+
+def iter_ordered_listings(community) -> Iterator[List[Tuple[int, int, UUID]]]:
+    """
+    Yields batches of (listing id, package id, package uuid4) tuples of the
+    community's active listings in the order they're listed in the index.
+    """
+    listings = (
+        PackageListing.objects.active()
+        .filter(community=community)
+        .order_by(*LISTING_ORDERING)
+        .values_list("id", "package_id", "package__uuid4")
+        .iterator(chunk_size=FRAGMENT_BATCH_SIZE)
+    )
+    while batch := list(islice(listings, FRAGMENT_BATCH_SIZE)):
+        yield batch
+
+
+def get_package_content_versions(
+    package_ids: Optional[Iterable[int]] = None,
+) -> Dict[int, str]:
+    """
+    Returns a version string for each package which changes whenever the
+    package's serialized representation does. Download counts aren't covered
+    by change tracking, so their totals are included in the version.
+
+    The versions are limited to the given packages if any are given.
+    """
+    changes = PackageChange.objects.exclude(package=None)
+    packages = Package.objects.all()
+    if package_ids is not None:
+        package_ids = list(package_ids)
+        changes = changes.filter(package_id__in=package_ids)
+        packages = packages.filter(id__in=package_ids)
+    changes = dict(
+        # Ordered so that the latest of concurrently recorded changes is used
+        changes.order_by("id").values_list("package_id", "id")
+    )
+    downloads = dict(packages.values_list("id", "total_downloads"))
+    return {
+        package_id: f"{changes.get(package_id)}.{downloads.get(package_id)}"
+        for package_id in changes.keys() | downloads.keys()
+    }
+
+
+def render_listing_fragments(
+    request: HttpRequest, listing_ids: Iterable[int]
+) -> Dict[int, bytes]:
+    renderer = JSONRenderer()
+    if settings.API_V1_BULK_SERIALIZER:
+        serializer = BulkPackageListingSerializer(request, request.community_site)
+        return {
+            listing_id: renderer.render(data)
+            for listing_id, data in serializer.serialize(listing_ids).items()
+        }
+
+    listings = (
+        PackageListing.objects.filter(id__in=listing_ids)
+        .select_related(
+            "package",
+            "package__owner",
+            "package__latest",
+        )
+        .prefetch_related(
+            "package__versions",
+            "package__versions__dependencies",
+        )
+    )
+    context = {"request": request, "community_site": request.community_site}
+    return {
+        listing.id: renderer.render(
+            PackageListingSerializer(listing, context=context).data
+        )
+        for listing in listings
+    }
+
+
+def get_listing_fragments(
+    request: HttpRequest,
+    listings: List[Tuple[int, int, UUID]],
+    versions: Dict[int, str],
+) -> List[bytes]:
+    """
+    Returns the fragments of the given (listing id, package id, package
+    uuid4) tuples in the same order, rendering and storing the ones which
+    aren't cached.
+
+    The package detail entries pointing to the fragments are updated as a
+    by-product, which only writes to the cache for changed packages.
+    """
+    community_site = request.community_site
+    keys = {
+        listing_id: get_fragment_key(
+            community_site.pk, listing_id, versions.get(package_id)
+        )
+        for listing_id, package_id, _ in listings
+    }
+    detail_keys = {
+        get_package_detail_key(community_site.pk, package_uuid4): keys[listing_id]
+        for listing_id, _, package_uuid4 in listings
+    }
+    fragments = cache.get_many(list(keys.values()) + list(detail_keys.keys()))
+    changed_details = {
+        detail_key: fragment_key
+        for detail_key, fragment_key in detail_keys.items()
+        if fragments.pop(detail_key, None) != fragment_key
+    }
+    missing = [x for x, key in keys.items() if key not in fragments]
+    if missing:
+        rendered = {
+            keys[listing_id]: fragment
+            for listing_id, fragment in render_listing_fragments(
+                request, missing
+            ).items()
+        }
+        cache.set_many(rendered, timeout=FRAGMENT_EXPIRY)
+        fragments.update(rendered)
+
+    # Listings removed since they were listed have no fragment
+    cache.set_many(
+        {
+            detail_key: fragment_key
+            for detail_key, fragment_key in changed_details.items()
+            if fragment_key in fragments
+        },
+        timeout=None,
+    )
+    return [fragments[key] for key in keys.values() if key in fragments]
+
+
+def prune_package_details(community_site, listed_uuids: Set[str]) -> None:
+    """
+    Removes the package detail entries of packages which were listed by the
+    previous index generation, but aren't listed anymore.
+    """
+    listed_key = get_listed_packages_key(community_site.pk)
+    removed = (cache.get(listed_key) or set()) - listed_uuids
+    cache.delete_many(
+        [get_package_detail_key(community_site.pk, uuid4) for uuid4 in removed]
+    )
+    cache.set(listed_key, listed_uuids, timeout=None)
+
+
+def get_package_detail(community_site, package_uuid4) -> Optional[bytes]:
+    """
+    Returns the serialized v1 representation of a listed package from the
+    cache, or None if it isn't cached. Packages which aren't listed in the
+    community are never cached, but a missing entry doesn't imply that.
+    """
+    fragment_key = cache.get(get_package_detail_key(community_site.pk, package_uuid4))
+    if fragment_key is None:
+        return None
+    return cache.get(fragment_key)
+
+
+def iter_package_index(request: HttpRequest) -> Iterator[bytes]:
+    """
+    Yields the v1 package index of the request's community site in chunks.
+    The index is assembled from per listing fragments, and only listings
+    whose package changed since the fragment was stored are serialized
+    again. Listings are processed in fixed size batches, so memory use
+    doesn't grow with the size of the index.
+    """
+    versions = get_package_content_versions()
+    listed_uuids = set()
+
+    yield b"["
+    first = True
+    for listings in iter_ordered_listings(request.community_site.community):
+        listed_uuids.update(str(package_uuid4) for _, _, package_uuid4 in listings)
+        chunk = b",".join(get_listing_fragments(request, listings, versions))
+        if chunk:
+            yield chunk if first else b"," + chunk
+            first = False
+    yield b"]"
+    prune_package_details(request.community_site, listed_uuids)
+
+
+def encode_index_cursor(
+    is_pinned: bool, is_deprecated: bool, date_updated: datetime, listing_id: int
+) -> str:
+    position = [
+        int(is_pinned),
+        int(is_deprecated),
+        date_updated.isoformat(),
+        listing_id,
+    ]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_index_cursor(cursor: str) -> Tuple[bool, bool, datetime, int]:
+    """
+    Decodes a cursor returned by encode_index_cursor, raising a ValueError
+    if the cursor is malformed.
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        is_pinned, is_deprecated, date_updated, listing_id = position
+        date_updated = parse_datetime(date_updated)
+    except (binascii.Error, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if date_updated is None or not isinstance(listing_id, int):
+        raise ValueError("Invalid cursor")
+    return bool(is_pinned), bool(is_deprecated), date_updated, listing_id
+
+
+def get_index_cursor_filter(cursor: str) -> Q:
+    """
+    Returns a filter matching the listings ordered after the cursor position
+    in LISTING_ORDERING.
+    """
+    is_pinned, is_deprecated, date_updated, listing_id = decode_index_cursor(cursor)
+    same_pinned = Q(package__is_pinned=is_pinned)
+    same_deprecated = same_pinned & Q(package__is_deprecated=is_deprecated)
+    same_date = same_deprecated & Q(package__date_updated=date_updated)
+    return (
+        Q(package__is_pinned__lt=is_pinned)
+        | (same_pinned & Q(package__is_deprecated__gt=is_deprecated))
+        | (same_deprecated & Q(package__date_updated__lt=date_updated))
+        | (same_date & Q(id__lt=listing_id))
+    )
+
+
+def get_index_page(
+    community, cursor: Optional[str]
+) -> Tuple[List[Tuple[int, int, UUID]], Optional[str]]:
+    """
+    Returns the (listing id, package id, package uuid4) tuples on the page
+    starting after the cursor, and the cursor of the next page if there is
+    one.
+    """
+    listings = PackageListing.objects.active().filter(community=community)
+    if cursor:
+        listings = listings.filter(get_index_cursor_filter(cursor))
+    rows = list(
+        listings.order_by(*LISTING_ORDERING).values_list(
+            "id",
+            "package_id",
+            "package__uuid4",
+            "package__is_pinned",
+            "package__is_deprecated",
+            "package__date_updated",
+        )[: INDEX_PAGE_SIZE + 1]
+    )
+    next_cursor = None
+    if len(rows) > INDEX_PAGE_SIZE:
+        listing_id, _, _, is_pinned, is_deprecated, date_updated = rows[
+            INDEX_PAGE_SIZE - 1
+        ]
+        next_cursor = encode_index_cursor(
+            is_pinned, is_deprecated, date_updated, listing_id
+        )
+    return [row[:3] for row in rows[:INDEX_PAGE_SIZE]], next_cursor
+
+
+def render_package_index_page(
+    request: HttpRequest,
+    cursor: Optional[str],
+    versions: Optional[Dict[int, str]] = None,
+) -> Tuple[bytes, Optional[str]]:
+    """
+    Renders a page of the v1 package index in the same format as the package
+    changes listing, and returns it along with the cursor of the next page.
+    """
+    listings, next_cursor = get_index_page(request.community_site.community, cursor)
+    if versions is None:
+        versions = get_package_content_versions(
+            package_id for _, package_id, _ in listings
+        )
+    fragments = get_listing_fragments(request, listings, versions)
+    content = b"".join(
+        (
+            b'{"cursor":',
+            json.dumps(next_cursor).encode(),
+            b',"has_more":',
+            b"true" if next_cursor else b"false",
+            b',"packages":[',
+            b",".join(fragments),
+            b"]}",
+        )
+    )
+    return content, next_cursor
@@ -1,37 +1,66 @@
 from django.test.client import RequestFactory
 
+from thunderstore.cache.models import DatabaseCache
 from thunderstore.community.middleware import add_community_context_to_request
 from thunderstore.community.models import CommunitySite
+from thunderstore.core.cache import CachedResponse
+from thunderstore.repository.api.v1.fragments import (
+    get_package_content_versions,
+    iter_package_index,
+    render_package_index_page,
+)
 from thunderstore.repository.api.v1.viewsets import PackageViewSet
-from thunderstore.repository.models import Package
+from thunderstore.repository.models import ApiSnapshot
+
+# Pages are keyed by their cursor, which changes as packages are updated, so
+# pages cached by earlier updates are left to expire
+INDEX_PAGE_CACHE_EXPIRY = 60 * 60
 
 
 def update_api_v1_caches():
     update_api_v1_indexes()
-    # TODO: Optimize and enable, or just leave it out of the manual cache
-    # update_api_v1_details()
+    DatabaseCache.delete_expired()
+
+
+def get_community_request(community_site, **params):
+    request = RequestFactory().get(
+        "/api/v1/package/", params, SERVER_NAME=community_site.site.domain
+    )
+    # TODO: Somehow use middleware instead
+    add_community_context_to_request(request)
+    return request
 
 
 def update_api_v1_indexes():
     for community_site in CommunitySite.objects.all():
-        request = RequestFactory().get(
-            "/api/v1/package/", SERVER_NAME=community_site.site.domain
+        update_api_v1_index(community_site)
+
+
+def update_api_v1_index(community_site):
+    request = get_community_request(community_site)
+    response = CachedResponse.from_stream(
+        chunks=iter_package_index(request),
+        headers=[("Content-Type", "application/json")],
+    )
+    PackageViewSet.store_cached_response(response, request)
+    if ApiSnapshot.is_enabled(community_site):
+        ApiSnapshot.publish(
+            community_site, "v1", response.gzip_content, response.content_hash
         )
-        # TODO: Somehow use middleware instead
-        add_community_context_to_request(request)
-        view = PackageViewSet.as_view({"get": "list"})
-        PackageViewSet.update_cache(view, request)
+    update_api_v1_index_pages(community_site)
 
 
-def update_api_v1_details():
-    for community_site in CommunitySite.objects.all():
-        for uuid in Package.objects.filter(is_active=True).values_list(
-            "uuid4", flat=True
-        ):
-            view = PackageViewSet.as_view({"get": "retrieve"})
-            request = RequestFactory().get(
-                f"/api/v1/package/{uuid}/", SERVER_NAME=community_site.site.domain
-            )
-            # TODO: Somehow use middleware instead
-            add_community_context_to_request(request)
-            PackageViewSet.update_cache(view, request, uuid4=uuid)
+def update_api_v1_index_pages(community_site):
+    versions = get_package_content_versions()
+    cursor = ""
+    while cursor is not None:
+        request = get_community_request(community_site, cursor=cursor)
+        content, next_cursor = render_package_index_page(request, cursor, versions)
+        response = CachedResponse.from_stream(
+            chunks=[content],
+            headers=[("Content-Type", "application/json")],
+        )
+        PackageViewSet.store_cached_response(
+            response, request, timeout=INDEX_PAGE_CACHE_EXPIRY
+        )
+        cursor = next_cursor
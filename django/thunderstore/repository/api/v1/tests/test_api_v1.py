@@ -1,9 +1,31 @@
+import gzip
 import json
+from datetime import timedelta
+from uuid import uuid4
 
+import brotli
 import pytest
+from django.core.cache import cache
+from django.utils import timezone
 
+from thunderstore.community.models import Community, PackageListing
 from thunderstore.core.factories import UserFactory
+from thunderstore.repository.api.v1 import fragments
 from thunderstore.repository.api.v1.tasks import update_api_v1_caches
+from thunderstore.repository.factories import PackageFactory, PackageVersionFactory
+from thunderstore.repository.models import PackageChange, PackageRating, PackageVersion
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def settled_changes(settings):
+    settings.API_V1_CHANGES_SETTLE_SECONDS = 0
 
 
 @pytest.mark.django_db
@@ -16,13 +38,345 @@ def test_api_v1(api_client, active_package_listing):
     assert result[0]["name"] == active_package_listing.package.name
     assert result[0]["full_name"] == active_package_listing.package.full_package_name
 
-    # TODO: Enable once detail views have been re-enabled
-    # uuid = result[0]["uuid4"]
-    # response = api_client.get(
-    #     f"/api/v1/package/{uuid}/",
-    # )
-    # assert response.status_code == 200
-    # assert response.json() == result[0]
+    uuid = result[0]["uuid4"]
+    response = api_client.get(
+        f"/api/v1/package/{uuid}/",
+    )
+    assert response.status_code == 200
+    assert response.json() == result[0]
+
+
+@pytest.mark.django_db
+def test_api_v1_compressed(api_client, active_package_listing):
+    update_api_v1_caches()
+    expected = api_client.get("/api/v1/package/").content
+
+    response = api_client.get("/api/v1/package/", HTTP_ACCEPT_ENCODING="gzip")
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response["Vary"]
+    assert response["Content-Type"] == "application/json"
+    assert gzip.decompress(response.content) == expected
+
+
+@pytest.mark.django_db
+def test_api_v1_compressed_brotli(api_client, active_package_listing):
+    update_api_v1_caches()
+    expected = api_client.get("/api/v1/package/").content
+
+    response = api_client.get("/api/v1/package/", HTTP_ACCEPT_ENCODING="gzip, br")
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "br"
+    assert brotli.decompress(response.content) == expected
+
+
+@pytest.mark.django_db
+def test_api_v1_conditional_etag(api_client, active_package_listing):
+    update_api_v1_caches()
+    response = api_client.get("/api/v1/package/")
+    assert response.status_code == 200
+    etag = response["ETag"]
+    assert etag.startswith('W/"')
+
+    response = api_client.get("/api/v1/package/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response["ETag"] == etag
+
+    response = api_client.get("/api/v1/package/", HTTP_IF_NONE_MATCH='W/"other"')
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_api_v1_conditional_last_modified(api_client, active_package_listing):
+    update_api_v1_caches()
+    response = api_client.get("/api/v1/package/")
+    assert response.status_code == 200
+    last_modified = response["Last-Modified"]
+
+    response = api_client.get("/api/v1/package/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 304
+    response = api_client.get(
+        "/api/v1/package/", HTTP_IF_MODIFIED_SINCE="Thu, 01 Jan 1970 00:00:00 GMT"
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_api_v1_changes(api_client, active_package_listing):
+    response = api_client.get("/api/v1/package/?since=0")
+    assert response.status_code == 200
+    result = response.json()
+    assert result["has_more"] is False
+    assert [x["uuid4"] for x in result["packages"]] == [
+        str(active_package_listing.package.uuid4)
+    ]
+    assert result["removed"] == []
+    cursor = result["cursor"]
+
+    response = api_client.get(f"/api/v1/package/?since={cursor}")
+    result = response.json()
+    assert result["packages"] == []
+    assert result["removed"] == []
+    assert result["cursor"] == cursor
+
+    package = active_package_listing.package
+    package.is_deprecated = True
+    package.save()
+    response = api_client.get(f"/api/v1/package/?since={cursor}")
+    result = response.json()
+    assert [x["is_deprecated"] for x in result["packages"]] == [True]
+    assert result["cursor"] > cursor
+    cursor = result["cursor"]
+
+    package.is_active = False
+    package.save()
+    response = api_client.get(f"/api/v1/package/?since={cursor}")
+    result = response.json()
+    assert result["packages"] == []
+    assert result["removed"] == [str(package.uuid4)]
+
+
+@pytest.mark.django_db
+def test_api_v1_changes_ignore_download_counter(
+    api_client, active_package_listing, active_version
+):
+    result = api_client.get("/api/v1/package/?since=0").json()
+    assert len(result["packages"]) == 1
+    cursor = result["cursor"]
+    PackageVersion.objects.get(pk=active_version.pk)._increase_download_counter()
+    result = api_client.get(f"/api/v1/package/?since={cursor}").json()
+    assert result["packages"] == []
+
+
+@pytest.mark.django_db
+def test_api_v1_changes_rating(api_client, active_package_listing):
+    cursor = api_client.get("/api/v1/package/?since=0").json()["cursor"]
+    PackageRating.objects.create(
+        rater=UserFactory.create(), package=active_package_listing.package
+    )
+    result = api_client.get(f"/api/v1/package/?since={cursor}").json()
+    assert [x["rating_score"] for x in result["packages"]] == [1]
+
+
+@pytest.mark.django_db
+def test_api_v1_changes_deleted_package(api_client, active_package_listing):
+    cursor = api_client.get("/api/v1/package/?since=0").json()["cursor"]
+    package = active_package_listing.package
+    uuid4 = str(package.uuid4)
+    package.versions.all().delete()
+    package.delete()
+    result = api_client.get(f"/api/v1/package/?since={cursor}").json()
+    assert result["removed"] == [uuid4]
+
+
+@pytest.mark.django_db
+def test_api_v1_changes_settle_window(api_client, active_package_listing, settings):
+    settings.API_V1_CHANGES_SETTLE_SECONDS = 300
+    result = api_client.get("/api/v1/package/?since=0").json()
+    assert len(result["packages"]) == 1
+    # The change might still have been committed after newer changes
+    assert result["cursor"] == 0
+    assert result["has_more"] is False
+
+    PackageChange.objects.update(date_created=timezone.now() - timedelta(minutes=10))
+    result = api_client.get("/api/v1/package/?since=0").json()
+    assert len(result["packages"]) == 1
+    cursor = result["cursor"]
+    assert cursor > 0
+    result = api_client.get(f"/api/v1/package/?since={cursor}").json()
+    assert result["packages"] == []
+
+
+@pytest.mark.django_db
+def test_api_v1_changes_removed_only_from_listed_communities(
+    api_client, active_package_listing
+):
+    other_community = Community.objects.create(name="Other", identifier="other")
+    other = PackageListing.objects.create(
+        community=other_community,
+        package=PackageVersionFactory.create(is_active=True).package,
+    )
+    cursor = api_client.get("/api/v1/package/?since=0").json()["cursor"]
+
+    other.package.is_active = False
+    other.package.save()
+    other.delete()
+    active_package_listing.delete()
+    result = api_client.get(f"/api/v1/package/?since={cursor}").json()
+    assert result["removed"] == [str(active_package_listing.package.uuid4)]
+
+    # The tombstone outlives later changes of the package
+    active_package_listing.package.save()
+    result = api_client.get(f"/api/v1/package/?since={cursor}").json()
+    assert result["removed"] == [str(active_package_listing.package.uuid4)]
+
+
+@pytest.mark.django_db
+def test_api_v1_changes_concurrent_records(active_package):
+    # A concurrent transaction may have recorded a change which this one
+    # doesn't see yet, which is simulated by recording one in advance
+    PackageChange.objects.create(
+        package=active_package, package_uuid4=active_package.uuid4
+    )
+    PackageChange.record(active_package)
+    changes = PackageChange.objects.filter(package_uuid4=active_package.uuid4)
+    assert changes.count() == 1
+
+
+@pytest.mark.django_db
+def test_api_v1_changes_reverse_category_clear(
+    api_client, active_package_listing, package_category
+):
+    active_package_listing.categories.add(package_category)
+    cursor = api_client.get("/api/v1/package/?since=0").json()["cursor"]
+    package_category.packages.clear()
+    result = api_client.get(f"/api/v1/package/?since={cursor}").json()
+    assert [x["categories"] for x in result["packages"]] == [[]]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("since", ("", "-1", "abc"))
+def test_api_v1_changes_invalid_cursor(api_client, since):
+    response = api_client.get(f"/api/v1/package/?since={since}")
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_api_v1_detail_not_listed(api_client, active_package_listing):
+    update_api_v1_caches()
+    response = api_client.get(f"/api/v1/package/{uuid4()}/")
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_api_v1_detail_updated_with_index(api_client, active_package_listing):
+    package = active_package_listing.package
+    url = f"/api/v1/package/{package.uuid4}/"
+    update_api_v1_caches()
+    assert api_client.get(url).json()["is_pinned"] is False
+
+    package.is_pinned = True
+    package.save()
+    update_api_v1_caches()
+    assert api_client.get(url).json()["is_pinned"] is True
+
+    package.is_active = False
+    package.save()
+    update_api_v1_caches()
+    assert api_client.get(url).status_code == 404
+
+
+@pytest.mark.django_db
+def test_api_v1_detail_without_cache(
+    api_client, community_site, active_package_listing
+):
+    package = active_package_listing.package
+    url = f"/api/v1/package/{package.uuid4}/"
+    # Before the first index generation
+    assert api_client.get(url).json()["uuid4"] == str(package.uuid4)
+
+    update_api_v1_caches()
+    expected = api_client.get(url).json()
+    # The fragment was evicted while the detail entry pointing to it wasn't
+    detail_key = fragments.get_package_detail_key(community_site.pk, package.uuid4)
+    cache.delete(cache.get(detail_key))
+    assert api_client.get(url).json() == expected
+    cache.clear()
+    assert api_client.get(url).json() == expected
+
+    package.is_active = False
+    package.save()
+    assert api_client.get(url).status_code == 404
+
+
+@pytest.mark.django_db
+def test_api_v1_detail_is_a_cache_read(
+    community_site, active_package_listing, django_assert_num_queries
+):
+    update_api_v1_caches()
+    with django_assert_num_queries(0):
+        content = fragments.get_package_detail(
+            community_site, active_package_listing.package.uuid4
+        )
+    assert json.loads(content)["name"] == active_package_listing.package.name
+
+
+def create_listings(community, count):
+    for _ in range(count):
+        package = PackageFactory.create(is_active=True)
+        PackageVersionFactory.create(name=package.name, package=package, is_active=True)
+        PackageListing.objects.create(community=community, package=package)
+
+
+def get_all_pages(api_client):
+    packages, cursor, requests = [], "", 0
+    while cursor is not None:
+        response = api_client.get("/api/v1/package/", {"cursor": cursor})
+        assert response.status_code == 200
+        result = response.json()
+        assert result["has_more"] is (result["cursor"] is not None)
+        packages += result["packages"]
+        cursor = result["cursor"]
+        requests += 1
+    return packages, requests
+
+
+@pytest.mark.django_db
+def test_api_v1_paginated(api_client, community_site, mocker):
+    mocker.patch.object(fragments, "INDEX_PAGE_SIZE", 2)
+    create_listings(community_site.community, 5)
+    update_api_v1_caches()
+    expected = api_client.get("/api/v1/package/").json()
+
+    render = mocker.spy(fragments, "render_package_index_page")
+    packages, requests = get_all_pages(api_client)
+    assert requests == 3
+    assert packages == expected
+    # Every page was served from the cache
+    assert render.call_count == 0
+
+
+@pytest.mark.django_db
+def test_api_v1_paginated_without_cache(api_client, community_site, mocker):
+    mocker.patch.object(fragments, "INDEX_PAGE_SIZE", 2)
+    create_listings(community_site.community, 3)
+    get_versions = fragments.get_package_content_versions
+    versions = []
+
+    def record_versions(*args):
+        versions.append(get_versions(*args))
+        return versions[-1]
+
+    mocker.patch.object(fragments, "get_package_content_versions", record_versions)
+    packages, requests = get_all_pages(api_client)
+    assert requests == 2
+    assert len({x["uuid4"] for x in packages}) == 3
+    # Uncached pages only look up the versions of their own packages
+    assert [len(x) for x in versions] == [2, 1]
+
+
+@pytest.mark.django_db
+def test_api_v1_paginated_cursor_survives_updates(api_client, community_site, mocker):
+    mocker.patch.object(fragments, "INDEX_PAGE_SIZE", 2)
+    create_listings(community_site.community, 4)
+    first = api_client.get("/api/v1/package/", {"cursor": ""}).json()
+    create_listings(community_site.community, 1)
+    update_api_v1_caches()
+
+    # Packages updated after the first page was fetched are listed on top
+    result = api_client.get("/api/v1/package/", {"cursor": first["cursor"]}).json()
+    seen = {x["uuid4"] for x in first["packages"]}
+    assert len(result["packages"]) == 2
+    assert not seen & {x["uuid4"] for x in result["packages"]}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("cursor", ("abc", "W10=", "WzEsIDIsICJ4IiwgM10="))
+def test_api_v1_paginated_invalid_cursor(api_client, cursor):
+    response = api_client.get("/api/v1/package/", {"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json() == {"cursor": ["Invalid cursor"]}
 
 
 @pytest.mark.django_db
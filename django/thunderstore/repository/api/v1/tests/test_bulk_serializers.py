@@ -0,0 +1,118 @@
+import json
+
+import pytest
+from django.test.client import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from thunderstore.community.middleware import add_community_context_to_request
+from thunderstore.community.models import PackageCategory, PackageListing
+from thunderstore.core.factories import UserFactory
+from thunderstore.repository.api.v1.bulk_serializers import (
+    BulkPackageListingSerializer,
+    get_url_template,
+)
+from thunderstore.repository.api.v1.serializers import PackageListingSerializer
+from thunderstore.repository.factories import PackageFactory, PackageVersionFactory
+from thunderstore.repository.models import PackageRating
+
+
+def get_request(community_site):
+    request = RequestFactory().get(
+        "/api/v1/package/", SERVER_NAME=community_site.site.domain
+    )
+    add_community_context_to_request(request)
+    return request
+
+
+def serialize_with_drf(request, listing):
+    context = {"request": request, "community_site": request.community_site}
+    listing = PackageListing.objects.get(pk=listing.pk)
+    data = PackageListingSerializer(listing, context=context).data
+    return json.loads(JSONRenderer().render(data))
+
+
+def normalize(data):
+    # Categories are serialized from a set, so their order is arbitrary
+    data["categories"] = sorted(data["categories"])
+    return data
+
+
+@pytest.fixture()
+def listings(community_site):
+    community = community_site.community
+    dependency = PackageVersionFactory.create(is_active=True)
+    category = PackageCategory.objects.create(
+        name="Tools", slug="tools", community=community
+    )
+    result = []
+    for i in range(3):
+        package = PackageFactory.create(is_active=True, is_pinned=i == 0)
+        for version_number in ("1.0.0", "1.10.0", "1.2.0"):
+            version = PackageVersionFactory.create(
+                package=package,
+                name=package.name,
+                version_number=version_number,
+                is_active=True,
+                downloads=i * 10,
+            )
+            version.dependencies.add(dependency)
+        PackageVersionFactory.create(
+            package=package,
+            name=package.name,
+            version_number="2.0.0",
+            is_active=False,
+        )
+        listing = PackageListing.objects.create(
+            community=community, package=package, has_nsfw_content=i == 1
+        )
+        if i > 0:
+            listing.categories.add(category)
+        result.append(listing)
+    PackageRating.objects.create(rater=UserFactory.create(), package=result[2].package)
+    return result
+
+
+@pytest.mark.django_db
+def test_bulk_serializer_matches_drf(community_site, listings):
+    request = get_request(community_site)
+    serializer = BulkPackageListingSerializer(request, community_site)
+    result = serializer.serialize([listing.id for listing in listings])
+
+    assert result.keys() == {listing.id for listing in listings}
+    for listing in listings:
+        expected = normalize(serialize_with_drf(request, listing))
+        actual = normalize(json.loads(JSONRenderer().render(result[listing.id])))
+        assert actual == expected
+        assert [x["version_number"] for x in actual["versions"]] == [
+            "1.10.0",
+            "1.2.0",
+            "1.0.0",
+        ]
+    assert result[listings[2].id]["rating_score"] == 1
+
+
+@pytest.mark.django_db
+def test_bulk_serializer_https_download_urls(community_site, listings, settings):
+    settings.PROTOCOL = "https://"
+    request = get_request(community_site)
+    serializer = BulkPackageListingSerializer(request, community_site)
+    result = serializer.serialize([listings[0].id])
+
+    expected = serialize_with_drf(request, listings[0])
+    assert result[listings[0].id]["versions"] == expected["versions"]
+    assert expected["versions"][0]["download_url"].startswith("https://")
+
+
+@pytest.mark.django_db
+def test_bulk_serializer_skips_missing_listings(community_site):
+    serializer = BulkPackageListingSerializer(
+        get_request(community_site), community_site
+    )
+    assert serializer.serialize([12345]) == {}
+
+
+def test_get_url_template():
+    template = get_url_template("packages.download", "owner", "name", "version")
+    assert template.format(owner="Owner", name="Name", version="1.0.0") == (
+        "/package/download/Owner/Name/1.0.0/"
+    )
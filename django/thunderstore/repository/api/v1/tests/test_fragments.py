@@ -0,0 +1,106 @@
+import json
+
+import pytest
+from django.core.cache import cache
+from django.test.client import RequestFactory
+
+from thunderstore.community.middleware import add_community_context_to_request
+from thunderstore.community.models import PackageListing
+from thunderstore.repository.api.v1 import fragments
+from thunderstore.repository.api.v1.viewsets import PackageViewSet
+from thunderstore.repository.factories import PackageFactory, PackageVersionFactory
+from thunderstore.repository.models import PackageVersion
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def create_listing(community, **kwargs):
+    package = PackageFactory.create(is_active=True, **kwargs)
+    PackageVersionFactory.create(name=package.name, package=package, is_active=True)
+    return PackageListing.objects.create(community=community, package=package)
+
+
+def render_package_index(request):
+    return b"".join(fragments.iter_package_index(request))
+
+
+def get_request(community_site):
+    request = RequestFactory().get(
+        "/api/v1/package/", SERVER_NAME=community_site.site.domain
+    )
+    add_community_context_to_request(request)
+    return request
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("bulk_serializer", (True, False))
+def test_render_package_index_matches_viewset(
+    community_site, settings, bulk_serializer
+):
+    settings.API_V1_BULK_SERIALIZER = bulk_serializer
+    create_listing(community_site.community)
+    create_listing(community_site.community, is_pinned=True)
+    create_listing(community_site.community, is_deprecated=True)
+
+    request = get_request(community_site)
+    response = PackageViewSet.as_view({"get": "list"})(request, skip_cache=True)
+    response.render()
+
+    result = json.loads(render_package_index(get_request(community_site)))
+    assert len(result) == 3
+    assert result == json.loads(response.content)
+
+
+@pytest.mark.django_db
+def test_render_package_index_reuses_fragments(community_site, mocker):
+    first = create_listing(community_site.community)
+    second = create_listing(community_site.community)
+    spy = mocker.spy(fragments, "render_listing_fragments")
+
+    render_package_index(get_request(community_site))
+    assert set(spy.call_args[0][1]) == {first.id, second.id}
+
+    spy.reset_mock()
+    render_package_index(get_request(community_site))
+    assert spy.call_count == 0
+
+    first.package.save()
+    render_package_index(get_request(community_site))
+    assert spy.call_count == 1
+    assert list(spy.call_args[0][1]) == [first.id]
+
+
+@pytest.mark.django_db
+def test_render_package_index_download_count_changes(community_site):
+    listing = create_listing(community_site.community)
+    render_package_index(get_request(community_site))
+
+    for version in PackageVersion.objects.filter(package=listing.package):
+        version._increase_download_counter()
+    result = json.loads(render_package_index(get_request(community_site)))
+    assert result[0]["versions"][0]["downloads"] == 1
+
+
+@pytest.mark.django_db
+def test_render_package_index_empty(community_site):
+    assert render_package_index(get_request(community_site)) == b"[]"
+
+
+@pytest.mark.django_db
+def test_iter_package_index_batches(community_site, mocker):
+    for _ in range(5):
+        create_listing(community_site.community)
+    expected = render_package_index(get_request(community_site))
+    cache.clear()
+
+    mocker.patch.object(fragments, "FRAGMENT_BATCH_SIZE", 2)
+    chunks = list(fragments.iter_package_index(get_request(community_site)))
+    # Opening bracket, three batches and the closing bracket
+    assert len(chunks) == 5
+    assert b"".join(chunks) == expected
+    assert len(json.loads(expected)) == 5
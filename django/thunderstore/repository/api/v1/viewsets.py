@@ -1,20 +1,42 @@
 import json
+from datetime import timedelta
 
+from django.conf import settings
+from django.db.models import Q
 from django.http import HttpResponse
-from rest_framework import viewsets
+from django.utils import timezone
+from rest_framework import serializers, viewsets
 from rest_framework.authentication import BasicAuthentication, SessionAuthentication
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from thunderstore.community.models import PackageListing
 from thunderstore.core.cache import BackgroundUpdatedCacheMixin
 from thunderstore.core.utils import CommunitySiteSerializerContext
+from thunderstore.repository.api.v1.fragments import (
+    get_package_detail,
+    render_package_index_page,
+)
 from thunderstore.repository.api.v1.serializers import PackageListingSerializer
 from thunderstore.repository.cache import get_package_listing_queryset
-from thunderstore.repository.models import Package, PackageRating
+from thunderstore.repository.models import (
+    ApiSnapshot,
+    Package,
+    PackageChange,
+    PackageRating,
+)
 from thunderstore.repository.permissions import ensure_can_rate_package
 
+# Maximum amount of package changes returned by a single changes request
+CHANGES_PAGE_SIZE = 1000
+
+
+class PackageChangesQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0)
+
 
 class PackageViewSet(
     BackgroundUpdatedCacheMixin,
@@ -36,6 +58,150 @@ class PackageViewSet(
     def get_queryset(self):
         return get_package_listing_queryset(community_site=self.request.community_site)
 
+    @classmethod
+    def get_cache_key(cls, request, *args, **kwargs):
+        if "cursor" in request.GET:
+            kwargs = {**kwargs, "cursor": request.GET["cursor"]}
+        return super().get_cache_key(request, *args, **kwargs)
+
+    def is_cacheable_request(self):
+        # Package details are read from the cache by the retrieve action
+        return "since" not in self.request.GET and "uuid4" not in self.kwargs
+
+    def get_snapshot_url(self):
+        if self.request.GET or "uuid4" in self.kwargs:
+            return None
+        return ApiSnapshot.get_latest_url(self.request.community_site, "v1")
+
+    def allows_uncached_response(self):
+        # Pages are cheap to generate, and cursors of pages which were cached
+        # by an earlier update keep working
+        return "cursor" in self.request.GET
+
+    def list(self, request, *args, **kwargs):
+        if "since" in request.query_params:
+            return self.list_changes(request)
+        if "cursor" in request.query_params:
+            return self.list_page(request)
+        return super().list(request, *args, **kwargs)
+
+    def list_page(self, request):
+        """
+        Lists a page of the package index. The first page is requested with
+        an empty cursor, and the following pages with the cursor returned by
+        the previous page, until `has_more` is false.
+        """
+        try:
+            content, _ = render_package_index_page(
+                request, request.query_params["cursor"]
+            )
+        except ValueError as e:
+            raise ValidationError({"cursor": [str(e)]})
+        return HttpResponse(content, content_type="application/json")
+
+    def list_changes(self, request):
+        """
+        Lists packages changed after the `since` cursor. Packages which have
+        been removed from the community since are listed by their uuid4 under
+        `removed`. Clients should continue with the returned cursor, and keep
+        requesting until `has_more` is false.
+
+        The cursor never advances past changes younger than the settle
+        window, so recent changes may be listed more than once.
+        """
+        query = PackageChangesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        since = query.validated_data["since"]
+        changes = list(
+            PackageChange.objects.filter(
+                Q(community=None) | Q(community=request.community),
+                id__gt=since,
+            )
+            .order_by("id")
+            .values_list("id", "package_uuid4", "date_created")[: CHANGES_PAGE_SIZE + 1]
+        )
+        has_more = len(changes) > CHANGES_PAGE_SIZE
+        changes = changes[:CHANGES_PAGE_SIZE]
+
+        settled_before = timezone.now() - timedelta(
+            seconds=settings.API_V1_CHANGES_SETTLE_SECONDS
+        )
+        cursor = since
+        for change_id, _, date_created in changes:
+            if date_created > settled_before:
+                # Continuing from here would be stuck on the unsettled
+                # changes, so the client should come back later instead
+                has_more = False
+                break
+            cursor = change_id
+        changed_uuids = list(
+            dict.fromkeys(package_uuid4 for _, package_uuid4, _ in changes)
+        )
+
+        listings = (
+            PackageListing.objects.active()
+            .filter(
+                community=request.community,
+                package__uuid4__in=changed_uuids,
+            )
+            .select_related(
+                "package",
+                "package__owner",
+                "package__latest",
+            )
+            .prefetch_related(
+                "package__versions",
+                "package__versions__dependencies",
+            )
+            .order_by(
+                "-package__is_pinned",
+                "package__is_deprecated",
+                "-package__date_updated",
+            )
+        )
+        serializer = self.get_serializer(listings, many=True)
+        listed_uuids = {str(listing["uuid4"]) for listing in serializer.data}
+        return Response(
+            {
+                "cursor": cursor,
+                "has_more": has_more,
+                "packages": serializer.data,
+                "removed": self.get_removed_uuids(
+                    request.community,
+                    [x for x in changed_uuids if str(x) not in listed_uuids],
+                ),
+            }
+        )
+
+    def get_removed_uuids(self, community, package_uuids):
+        """
+        Returns the uuids of the given unlisted packages which have been
+        listed in the community, either by a listing which is no longer
+        active or by a tombstone of a deleted listing.
+        """
+        previously_listed = set(
+            PackageListing.objects.filter(
+                community=community, package__uuid4__in=package_uuids
+            ).values_list("package__uuid4", flat=True)
+        ) | set(
+            PackageChange.objects.filter(
+                community=community, package_uuid4__in=package_uuids
+            ).values_list("package_uuid4", flat=True)
+        )
+        return [str(x) for x in package_uuids if x in previously_listed]
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Returns a package from the cache populated by the index generation,
+        without touching the database. Packages missing from the cache, e.g.
+        before the first generation or after an eviction, are serialized
+        from the database instead.
+        """
+        content = get_package_detail(request.community_site, kwargs["uuid4"])
+        if content is None:
+            return super().retrieve(request, *args, **kwargs)
+        return HttpResponse(content, content_type="application/json")
+
     @action(
         detail=True,
         methods=["post"],
@@ -53,6 +219,7 @@ class PackageViewSet(
         else:
             PackageRating.objects.filter(rater=user, package=package).delete()
             result_state = "unrated"
+        package.refresh_from_db(fields=("rating_count",))
         return Response(
             {
                 "state": result_state,
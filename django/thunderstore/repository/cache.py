@@ -1,8 +1,14 @@
-from thunderstore.community.models import CommunitySite, PackageListing, Q
+from django.db.models import Max
+
+from thunderstore.community.models import Community, CommunitySite, PackageListing, Q
 from thunderstore.core.cache import CacheBustCondition, cache_function_result
+from thunderstore.repository.models import PackageChange
 
 
-@cache_function_result(cache_until=CacheBustCondition.any_package_updated)
+@cache_function_result(
+    cache_until=CacheBustCondition.any_package_updated,
+    tags=lambda community_site: community_site.community.cache_tag,
+)
 def get_package_listing_queryset(community_site: CommunitySite):
     return (
         PackageListing.objects.active()
@@ -17,6 +23,25 @@ def get_package_listing_queryset(community_site: CommunitySite):
             "package__versions__dependencies",
         )
         .order_by(
-            "-package__is_pinned", "package__is_deprecated", "-package__date_updated"
+            "-package__is_pinned",
+            "package__is_deprecated",
+            "-package__date_updated",
+            "-id",
         )
     )
+
+
+def get_community_listings_fingerprint(community: Community) -> str:
+    """
+    Returns a value which changes whenever any of the community's listings
+    change. Listing changes are tracked as changes of their packages.
+
+    Download counts are left out, as nearly every community gets downloads
+    between updates. They're refreshed whenever the fingerprint changes or
+    the cache reaches its maximum age.
+    """
+    last_change = PackageChange.objects.filter(
+        package__package_listings__community=community
+    ).aggregate(last_change=Max("id"))["last_change"]
+    active_listings = PackageListing.objects.active().filter(community=community)
+    return f"{last_change}.{active_listings.count()}"
@@ -0,0 +1,211 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+
+from thunderstore.repository.models import Package, PackageVersion
+from thunderstore.repository.package_reference import PackageReference
+
+DEPENDENCY_GRAPH_FINGERPRINT_KEY = "repository.dependency_graph.fingerprint"
+
+# The graph is only kept in process memory, as it's too large to be
+# transferred from the shared cache on every use
+_graph: Optional["DependencyGraph"] = None
+_graph_lock = threading.Lock()
+
+
+class GraphVersion(NamedTuple):
+    namespace: str
+    name: str
+    version_number: str
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.namespace}-{self.name}-{self.version_number}"
+
+
+class DependencyGraph:
+    """
+    An in-memory adjacency structure of the dependencies between the versions
+    of all active packages, built with a few values() queries.
+
+    The fingerprint summarizes the active versions and the dependencies at the
+    time of building, so that the graph is only rebuilt when either of them
+    changes and not on every other change to a package. The sums of the ids
+    change even when one version is deactivated and another one activated,
+    or a dependency is replaced, which the counts alone wouldn't reflect.
+
+    Dependencies on versions which aren't active are kept along with the
+    names of those versions, so that they can be reported as unresolved.
+    """
+
+    def __init__(
+        self,
+        fingerprint: Optional[str],
+        versions: Dict[int, GraphVersion],
+        dependencies: Dict[int, Tuple[int, ...]],
+        latest: Dict[Tuple[str, str], int],
+        inactive: Optional[Dict[int, GraphVersion]] = None,
+    ):
+        self.fingerprint = fingerprint
+        self.versions = versions
+        self.dependencies = dependencies
+        self.latest = latest
+        self.inactive = inactive or {}
+        self.version_ids = {
+            (version.namespace, version.name, version.version_number): version_id
+            for version_id, version in versions.items()
+        }
+
+    @staticmethod
+    def get_fingerprint() -> str:
+        versions = PackageVersion.objects.filter(
+            is_active=True, package__is_active=True
+        ).aggregate(count=Count("id"), latest=Max("id"), ids=Sum("id"))
+        dependencies = PackageVersion.dependencies.through.objects.aggregate(
+            count=Count("id"),
+            latest=Max("id"),
+            ids=Sum("id"),
+            from_ids=Sum("from_packageversion_id"),
+            to_ids=Sum("to_packageversion_id"),
+        )
+        return ".".join(
+            str(value) for value in (*versions.values(), *dependencies.values())
+        )
+
+    @classmethod
+    def build(cls, fingerprint: Optional[str]) -> "DependencyGraph":
+        versions = {
+            version_id: GraphVersion(namespace, name, version_number)
+            for version_id, namespace, name, version_number in (
+                PackageVersion.objects.filter(is_active=True, package__is_active=True)
+                .values_list(
+                    "pk", "package__owner__name", "package__name", "version_number"
+                )
+                .iterator()
+            )
+        }
+        dependencies = defaultdict(list)
+        for version_id, dependency_id in (
+            PackageVersion.dependencies.through.objects.filter(
+                from_packageversion__is_active=True,
+                from_packageversion__package__is_active=True,
+            )
+            .order_by("id")
+            .values_list("from_packageversion_id", "to_packageversion_id")
+            .iterator()
+        ):
+            dependencies[version_id].append(dependency_id)
+        inactive = {
+            version_id: GraphVersion(namespace, name, version_number)
+            for version_id, namespace, name, version_number in (
+                PackageVersion.objects.filter(
+                    pk__in={
+                        dependency_id
+                        for version_dependencies in dependencies.values()
+                        for dependency_id in version_dependencies
+                    }
+                    - versions.keys()
+                ).values_list(
+                    "pk", "package__owner__name", "package__name", "version_number"
+                )
+            )
+        }
+        latest = {
+            (namespace, name): latest_id
+            for namespace, name, latest_id in Package.objects.filter(
+                is_active=True, latest__isnull=False
+            ).values_list("owner__name", "name", "latest_id")
+        }
+        return cls(
+            fingerprint=fingerprint,
+            versions=versions,
+            dependencies={key: tuple(value) for key, value in dependencies.items()},
+            latest=latest,
+            inactive=inactive,
+        )
+
+    def get_version_id(self, reference: PackageReference) -> Optional[int]:
+        if reference.version_tuple is None:
+            return self.latest.get((reference.namespace, reference.name))
+        return self.version_ids.get(
+            (reference.namespace, reference.name, reference.version_str)
+        )
+
+    def resolve(
+        self, references: Iterable[PackageReference]
+    ) -> Tuple[List[int], List[str]]:
+        """
+        Returns the ids of the referenced versions and all of their transitive
+        dependencies, ordered so that every version comes after its
+        dependencies, along with the references and dependencies which didn't
+        match any active version. Versionless references resolve to the
+        latest version.
+        """
+        resolved = []
+        unresolved = []
+        visited = set()
+        for reference in references:
+            root = self.get_version_id(reference)
+            if root is None or root not in self.versions:
+                unresolved.append(str(reference))
+                continue
+            if root in visited:
+                continue
+            visited.add(root)
+            # Iterative post-order depth first search, as dependency chains
+            # can be deeper than the recursion limit
+            stack = [(root, iter(self.dependencies.get(root, ())))]
+            while stack:
+                version_id, children = stack[-1]
+                for child in children:
+                    if child in visited:
+                        continue
+                    visited.add(child)
+                    if child in self.versions:
+                        stack.append((child, iter(self.dependencies.get(child, ()))))
+                        break
+                    if child in self.inactive:
+                        unresolved.append(self.inactive[child].full_name)
+                else:
+                    stack.pop()
+                    resolved.append(version_id)
+        return resolved, unresolved
+
+
+def update_dependency_graph_fingerprint() -> str:
+    fingerprint = DependencyGraph.get_fingerprint()
+    cache.set(DEPENDENCY_GRAPH_FINGERPRINT_KEY, fingerprint, timeout=None)
+    return fingerprint
+
+
+def get_dependency_graph() -> DependencyGraph:
+    """
+    Returns the dependency graph of this process, rebuilding it if the
+    fingerprint last stored by the update_dependency_graph task differs from
+    the one the graph was built with. While a thread is rebuilding the graph,
+    the other threads keep using the outdated one.
+    """
+    global _graph
+    fingerprint = cache.get(DEPENDENCY_GRAPH_FINGERPRINT_KEY)
+    if fingerprint is None:
+        fingerprint = update_dependency_graph_fingerprint()
+    graph = _graph
+    if graph is not None and graph.fingerprint == fingerprint:
+        return graph
+
+    if not _graph_lock.acquire(blocking=graph is None):
+        return graph
+    try:
+        if _graph is None or _graph.fingerprint != fingerprint:
+            _graph = DependencyGraph.build(fingerprint)
+        return _graph
+    finally:
+        _graph_lock.release()
+
+
+def clear_dependency_graph() -> None:
+    global _graph
+    _graph = None
@@ -0,0 +1,306 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Iterator, NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from thunderstore.community.models import Community
+from thunderstore.core.locks import get_lock_backend, get_redis_errors
+from thunderstore.core.utils import capture_exception
+from thunderstore.repository.models import (
+    DOWNLOAD_DEDUP_WINDOW,
+    Package,
+    PackageVersion,
+    PackageVersionDownloadEvent,
+    PackageVersionDownloadStat,
+)
+
+# Buffered downloads which haven't been flushed by then are lost, which
+# should only happen if the flush task isn't running at all
+DOWNLOAD_BUFFER_EXPIRY = 60 * 60 * 24
+DOWNLOAD_FLUSH_TIME_LIMIT = 60 * 5
+
+
+class DownloadKey(NamedTuple):
+    version_id: int
+    community_id: int
+    date: date
+
+    def serialize(self) -> str:
+        return f"{self.version_id}.{self.community_id}.{self.date.isoformat()}"
+
+    @classmethod
+    def deserialize(cls, value: str) -> "DownloadKey":
+        version_id, community_id, day = value.split(".")
+        return cls(int(version_id), int(community_id), date.fromisoformat(day))
+
+
+def apply_download_deltas(deltas: Dict[DownloadKey, int]) -> None:
+    """
+    Adds the given amounts of downloads to the versions (and their packages
+    and daily statistics) identified by the keys. Versions receiving the
+    same amount are updated with a single UPDATE statement, which keeps the
+    amount of statements low as most versions are downloaded only a few
+    times between flushes.
+    """
+    if not deltas:
+        return
+    version_deltas = defaultdict(int)
+    for key, amount in deltas.items():
+        version_deltas[key.version_id] += amount
+    package_ids = dict(
+        PackageVersion.objects.filter(pk__in=version_deltas.keys()).values_list(
+            "pk", "package_id"
+        )
+    )
+    package_deltas = defaultdict(int)
+    for version_id, package_id in package_ids.items():
+        package_deltas[package_id] += version_deltas[version_id]
+
+    with transaction.atomic():
+        for amount, ids in group_by_amount(version_deltas).items():
+            PackageVersion.objects.filter(pk__in=ids).update(
+                downloads=F("downloads") + amount
+            )
+        for amount, ids in group_by_amount(package_deltas).items():
+            Package.objects.filter(pk__in=ids).update(
+                total_downloads=F("total_downloads") + amount
+            )
+        PackageVersionDownloadStat.record_many(deltas, package_ids)
+
+
+def group_by_amount(deltas: Dict[int, int]) -> Dict[int, list]:
+    groups = defaultdict(list)
+    for object_id, amount in deltas.items():
+        if amount > 0:
+            groups[amount].append(object_id)
+    return groups
+
+
+class BaseDownloadCounter:
+    def count_download(
+        self, version: PackageVersion, community: Community, client_ip: str
+    ) -> None:
+        raise NotImplementedError()
+
+    @contextmanager
+    def pop_buffered_downloads(self) -> Iterator[Dict[DownloadKey, int]]:
+        """
+        Yields the buffered download counts by DownloadKey. The counts are
+        removed from the buffer only if the block exits without an error.
+        """
+        yield {}
+
+
+class DatabaseDownloadCounter(BaseDownloadCounter):
+    """
+    Tracks download events in the database and increments the counters
+    synchronously on every counted download.
+    """
+
+    def count_download(
+        self, version: PackageVersion, community: Community, client_ip: str
+    ) -> None:
+        download_event, created = PackageVersionDownloadEvent.objects.get_or_create(
+            version=version,
+            source_ip=client_ip,
+        )
+
+        if created:
+            valid = True
+        else:
+            valid = download_event.count_downloads_and_return_validity()
+
+        if valid:
+            version._increase_download_counter()
+            PackageVersionDownloadStat.record(version, community)
+
+
+class CacheDownloadCounter(BaseDownloadCounter):
+    """
+    Deduplicates downloads with expiring cache keys and buffers the counts in
+    the cache until they're flushed to the database, so that counting a
+    download doesn't write to the database at all.
+
+    Works with any cache backend. As there's no way to atomically swap out
+    the buffer, downloads are buffered in numbered epochs. Each flush starts
+    a new epoch and flushes the epochs before the previous one, which no
+    download has been written to since the previous flush. Epochs are marked
+    as flushed only once they've been written to the database, so the epochs
+    of a failed flush are retried by the next one.
+    """
+
+    def get_dedup_key(self, version_id: int, client_ip: str) -> str:
+        return f"downloads.dedup.{version_id}.{client_ip}"
+
+    def get_epoch_key(self) -> str:
+        return "downloads.epoch"
+
+    def get_epoch(self) -> int:
+        epoch = cache.get(self.get_epoch_key())
+        if epoch is None:
+            cache.add(self.get_epoch_key(), 0, timeout=None)
+            epoch = cache.get(self.get_epoch_key(), 0)
+        return epoch
+
+    def get_flushed_epoch_key(self) -> str:
+        return "downloads.flushed_epoch"
+
+    def get_slots_key(self, epoch: int) -> str:
+        return f"downloads.{epoch}.slots"
+
+    def get_slot_key(self, epoch: int, slot: int) -> str:
+        return f"downloads.{epoch}.slot.{slot}"
+
+    def get_count_key(self, epoch: int, key: DownloadKey) -> str:
+        return f"downloads.{epoch}.count.{key.serialize()}"
+
+    def count_download(
+        self, version: PackageVersion, community: Community, client_ip: str
+    ) -> None:
+        if cache.add(
+            self.get_dedup_key(version.pk, client_ip),
+            1,
+            timeout=int(DOWNLOAD_DEDUP_WINDOW.total_seconds()),
+        ):
+            self.buffer_download(
+                DownloadKey(version.pk, community.pk, timezone.now().date())
+            )
+
+    def buffer_download(self, key: DownloadKey) -> None:
+        epoch = self.get_epoch()
+        count_key = self.get_count_key(epoch, key)
+        if cache.add(count_key, 0, timeout=DOWNLOAD_BUFFER_EXPIRY):
+            # First download of the key in this epoch, register the key so
+            # that the flush can find its counter
+            slots_key = self.get_slots_key(epoch)
+            cache.add(slots_key, 0, timeout=DOWNLOAD_BUFFER_EXPIRY)
+            slot = self.incr_counter(slots_key)
+            cache.set(
+                self.get_slot_key(epoch, slot),
+                key.serialize(),
+                timeout=DOWNLOAD_BUFFER_EXPIRY,
+            )
+        self.incr_counter(count_key)
+
+    def incr_counter(self, key: str) -> int:
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # The counter was evicted since it was added
+            cache.add(key, 0, timeout=DOWNLOAD_BUFFER_EXPIRY)
+            return cache.incr(key)
+
+    @contextmanager
+    def pop_buffered_downloads(self) -> Iterator[Dict[DownloadKey, int]]:
+        with get_lock_backend().lock(
+            "flush_download_counters", timeout=DOWNLOAD_FLUSH_TIME_LIMIT
+        ) as lock:
+            if not lock.acquired:
+                yield {}
+                return
+
+            epoch = self.get_epoch()
+            cache.incr(self.get_epoch_key())
+            # The first epoch which hasn't been flushed yet
+            flushed_epoch = cache.get(self.get_flushed_epoch_key(), epoch - 1)
+            if flushed_epoch > epoch:
+                # The epoch was evicted and restarted from zero
+                flushed_epoch = 0
+
+            keys = []
+            deltas = defaultdict(int)
+            for unflushed in range(flushed_epoch, epoch):
+                slot_count = cache.get(self.get_slots_key(unflushed), 0)
+                slot_keys = [
+                    self.get_slot_key(unflushed, slot)
+                    for slot in range(1, slot_count + 1)
+                ]
+                count_keys = {
+                    self.get_count_key(unflushed, key): key
+                    for key in map(
+                        DownloadKey.deserialize, cache.get_many(slot_keys).values()
+                    )
+                }
+                for key, count in cache.get_many(count_keys.keys()).items():
+                    deltas[count_keys[key]] += count
+                keys += [self.get_slots_key(unflushed), *slot_keys, *count_keys]
+            yield dict(deltas)
+            cache.set(self.get_flushed_epoch_key(), epoch, timeout=None)
+            cache.delete_many(keys)
+
+
+class RedisDownloadCounter(CacheDownloadCounter):
+    """
+    Buffers the download counts in a Redis hash on the server backing the
+    default cache. The flush atomically renames the hash, so counting
+    never has to wait for or race with the flush.
+    """
+
+    def get_client(self):
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+
+    def get_buffer_key(self) -> str:
+        return cache.make_key("downloads.buffer")
+
+    def get_flush_key(self) -> str:
+        return cache.make_key("downloads.flushing")
+
+    def buffer_download(self, key: DownloadKey) -> None:
+        try:
+            self.get_client().hincrby(self.get_buffer_key(), key.serialize(), 1)
+        except get_redis_errors() as e:
+            # Already deduplicated, so the download can be counted directly
+            capture_exception(e)
+            apply_download_deltas({key: 1})
+
+    @contextmanager
+    def pop_buffered_downloads(self) -> Iterator[Dict[DownloadKey, int]]:
+        from redis.exceptions import ResponseError
+
+        client = self.get_client()
+        flush_key = self.get_flush_key()
+        with get_lock_backend().lock(
+            "flush_download_counters", timeout=DOWNLOAD_FLUSH_TIME_LIMIT
+        ) as lock:
+            if not lock.acquired:
+                yield {}
+                return
+
+            # A leftover hash means the previous flush failed, in which case
+            # it's retried before new downloads are picked up
+            if not client.exists(flush_key):
+                try:
+                    client.renamenx(self.get_buffer_key(), flush_key)
+                except ResponseError:
+                    # Nothing has been downloaded since the previous flush
+                    yield {}
+                    return
+
+            yield {
+                DownloadKey.deserialize(key.decode()): int(count)
+                for key, count in client.hgetall(flush_key).items()
+            }
+            client.delete(flush_key)
+
+
+def get_download_counter() -> BaseDownloadCounter:
+    return import_string(settings.DOWNLOAD_COUNTER_BACKEND)()
+
+
+def flush_buffered_downloads() -> int:
+    """
+    Writes the buffered download counts to the database and returns the
+    amount of flushed download keys.
+    """
+    with get_download_counter().pop_buffered_downloads() as deltas:
+        apply_download_deltas(deltas)
+    return len(deltas)
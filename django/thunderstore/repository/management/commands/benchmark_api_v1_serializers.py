@@ -0,0 +1,104 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.client import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from thunderstore.community.middleware import add_community_context_to_request
+from thunderstore.community.models import CommunitySite, PackageListing
+from thunderstore.repository.api.v1.bulk_serializers import BulkPackageListingSerializer
+from thunderstore.repository.api.v1.serializers import PackageListingSerializer
+from thunderstore.repository.models import Package, PackageVersion, UploaderIdentity
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the DRF and bulk v1 package listing serializers on a "
+        "synthetic catalogue, which is rolled back afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=int, nargs="?", default=1000)
+        parser.add_argument("--versions", type=int, default=5)
+
+    def handle(self, *args, **kwargs):
+        if not settings.DEBUG:
+            raise CommandError("Only executable in debug environments")
+        community_site = CommunitySite.objects.select_related("site").first()
+        if not community_site:
+            raise CommandError("A community site is required")
+
+        with transaction.atomic():
+            listing_ids = self.create_data(
+                community_site, kwargs["count"], kwargs["versions"]
+            )
+            request = RequestFactory().get(
+                "/api/v1/package/", SERVER_NAME=community_site.site.domain
+            )
+            add_community_context_to_request(request)
+
+            drf_time = self.benchmark(
+                "DRF", lambda: self.serialize_with_drf(request, listing_ids)
+            )
+            bulk_time = self.benchmark(
+                "Bulk",
+                lambda: BulkPackageListingSerializer(request, community_site).serialize(
+                    listing_ids
+                ),
+            )
+            print(f"Speedup: {drf_time / bulk_time:.1f}x")
+            transaction.set_rollback(True)
+
+    def create_data(self, community_site, count, version_count):
+        print(f"Creating {count} packages with {version_count} versions each...")
+        owner = UploaderIdentity.objects.create(name="Benchmark_Identity")
+        Package.objects.bulk_create(
+            Package(owner=owner, name=f"Benchmark_Package_{i}", is_active=True)
+            for i in range(count)
+        )
+        packages = Package.objects.filter(owner=owner)
+        PackageVersion.objects.bulk_create(
+            PackageVersion(
+                package=package,
+                name=package.name,
+                version_number=f"1.{i}.0",
+                version_major=1,
+                version_minor=i,
+                description=f"Benchmark package {package.name}",
+                website_url="https://example.org",
+                readme="# Benchmark",
+                file_size=1024,
+                icon=f"benchmark/{package.name}.png",
+                file=f"benchmark/{package.name}.zip",
+            )
+            for package in packages
+            for i in range(version_count)
+        )
+        PackageListing.objects.bulk_create(
+            PackageListing(community=community_site.community, package=package)
+            for package in packages
+        )
+        return list(
+            PackageListing.objects.filter(package__owner=owner).values_list(
+                "id", flat=True
+            )
+        )
+
+    def serialize_with_drf(self, request, listing_ids):
+        listings = (
+            PackageListing.objects.filter(id__in=listing_ids)
+            .select_related("package", "package__owner", "package__latest")
+            .prefetch_related("package__versions", "package__versions__dependencies")
+        )
+        context = {"request": request, "community_site": request.community_site}
+        return PackageListingSerializer(listings, many=True, context=context).data
+
+    def benchmark(self, name, serialize):
+        start = time.perf_counter()
+        data = serialize()
+        JSONRenderer().render(data)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {elapsed:.2f}s")
+        return elapsed
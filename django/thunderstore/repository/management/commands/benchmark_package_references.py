@@ -0,0 +1,57 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from thunderstore.repository.package_reference import (
+    PackageReference,
+    parse_reference,
+    parse_version,
+)
+from thunderstore.repository.utils import has_duplicate_packages
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures parsing, hashing and duplicate checking of synthetic "
+        "package references"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=int, nargs="?", default=100)
+        parser.add_argument("--rounds", type=int, default=1000)
+
+    def handle(self, *args, **kwargs):
+        if not settings.DEBUG:
+            raise CommandError("Only executable in debug environments")
+        count, rounds = kwargs["count"], kwargs["rounds"]
+        print(f"Processing {count} references {rounds} times...")
+        strings = [
+            f"Benchmark-Namespace_{i % 10}-Benchmark_Package_{i}-1.{i}.0"
+            for i in range(count)
+        ]
+        references = [PackageReference.parse(x) for x in strings]
+
+        def parse_uncached():
+            parse_reference.cache_clear()
+            parse_version.cache_clear()
+            return [PackageReference.parse(x) for x in strings]
+
+        self.benchmark("Parse (uncached)", rounds, parse_uncached)
+        self.benchmark(
+            "Parse (cached)",
+            rounds,
+            lambda: [PackageReference.parse(x) for x in strings],
+        )
+        self.benchmark("Hash", rounds, lambda: set(references))
+        self.benchmark(
+            "Duplicate check", rounds, lambda: has_duplicate_packages(references)
+        )
+
+    def benchmark(self, name, rounds, func):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {elapsed:.2f}s ({elapsed / rounds * 1000000:.0f}us per round)")
+        return elapsed
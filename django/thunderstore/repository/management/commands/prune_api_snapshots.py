@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from thunderstore.repository.models import ApiSnapshot
+
+
+class Command(BaseCommand):
+    help = "Deletes old package index snapshots from the file storage"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=5,
+            help="Amount of latest snapshots to keep per community and API version",
+        )
+
+    def handle(self, *args, **kwargs):
+        deleted = ApiSnapshot.prune(keep=max(kwargs["keep"], 1))
+        self.stdout.write(f"Deleted {deleted} snapshots")
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from thunderstore.repository.models import PackageVersionDownloadEvent
+
+
+class Command(BaseCommand):
+    help = "Deletes download events which no longer affect download counting"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-hours",
+            type=int,
+            default=settings.DOWNLOAD_EVENT_RETENTION_HOURS,
+            help="Age in hours after which download events are deleted",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Amount of events deleted per statement",
+        )
+
+    def handle(self, *args, **kwargs):
+        deleted = PackageVersionDownloadEvent.prune(
+            timedelta(hours=kwargs["retention_hours"]),
+            batch_size=max(kwargs["batch_size"], 1),
+        )
+        self.stdout.write(f"Deleted {deleted} download events")
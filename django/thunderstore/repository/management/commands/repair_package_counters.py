@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from thunderstore.repository.models import Package, PackageDependencyEdge
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the package dependency edges and recomputes the download, "
+        "rating and dependant counters of all packages"
+    )
+
+    def handle(self, *args, **kwargs):
+        PackageDependencyEdge.rebuild(Package.objects.values_list("pk", flat=True))
+        updated = Package.update_counters()
+        self.stdout.write(f"Updated counters of {updated} packages")
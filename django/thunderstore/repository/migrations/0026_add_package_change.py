@@ -0,0 +1,39 @@
+# Generated by Django 3.1.14 on 2026-10-18 18:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("repository", "0025_alter_name_validator"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PackageChange",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("package_uuid4", models.UUIDField(unique=True)),
+                ("date_created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "package",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="repository.package",
+                    ),
+                ),
+            ],
+        ),
+    ]
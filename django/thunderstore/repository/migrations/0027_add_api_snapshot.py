@@ -0,0 +1,56 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import thunderstore.repository.models.api_snapshot
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0011_add_community_site_is_listed_flag"),
+        ("repository", "0026_add_package_change"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApiSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("api_version", models.CharField(max_length=32)),
+                (
+                    "file",
+                    models.FileField(
+                        upload_to=thunderstore.repository.models.api_snapshot.get_snapshot_filepath
+                    ),
+                ),
+                ("file_size", models.PositiveIntegerField()),
+                ("content_hash", models.CharField(max_length=64)),
+                ("date_created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "community_site",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="api_snapshots",
+                        to="community.communitysite",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="apisnapshot",
+            index=models.Index(
+                fields=["community_site", "api_version", "-date_created"],
+                name="repository__communi_b2fa93_idx",
+            ),
+        ),
+    ]
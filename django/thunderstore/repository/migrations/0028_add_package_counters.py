@@ -0,0 +1,49 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:23
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def forwards(apps, schema_editor):
+    Package = apps.get_model("repository", "Package")
+    PackageVersion = apps.get_model("repository", "PackageVersion")
+    PackageRating = apps.get_model("repository", "PackageRating")
+
+    downloads = (
+        PackageVersion.objects.filter(package=OuterRef("pk"))
+        .values("package")
+        .annotate(total=Sum("downloads"))
+        .values("total")
+    )
+    ratings = (
+        PackageRating.objects.filter(package=OuterRef("pk"))
+        .values("package")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Package.objects.update(
+        total_downloads=Coalesce(Subquery(downloads), 0),
+        rating_count=Coalesce(Subquery(ratings), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("repository", "0027_add_api_snapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="package",
+            name="rating_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="package",
+            name="total_downloads",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0011_add_community_site_is_listed_flag"),
+        ("repository", "0029_add_download_counter_flush_schedule"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PackageVersionDownloadStat",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("downloads", models.PositiveIntegerField(default=0)),
+                (
+                    "community",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="download_stats",
+                        to="community.community",
+                    ),
+                ),
+                (
+                    "package",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="download_stats",
+                        to="repository.package",
+                    ),
+                ),
+                (
+                    "version",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="download_stats",
+                        to="repository.packageversion",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="packageversiondownloadstat",
+            index=models.Index(
+                fields=["package", "community", "date"],
+                name="repository__package_0d2550_idx",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="packageversiondownloadstat",
+            unique_together={("version", "community", "date")},
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:36
+
+import pytz
+from django.db import migrations, models
+
+from thunderstore.core.migration_operations import AddIndexConcurrentlyIfSupported
+
+
+def forwards(apps, schema_editor):
+    CrontabSchedule = apps.get_model("django_celery_beat", "CrontabSchedule")
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+
+    schedule, _ = CrontabSchedule.objects.get_or_create(
+        minute="15",
+        hour="*",
+        day_of_week="*",
+        day_of_month="*",
+        month_of_year="*",
+        timezone=pytz.timezone("UTC"),
+    )
+    PeriodicTask.objects.get_or_create(
+        crontab=schedule,
+        name="Prune download events",
+        task="thunderstore.repository.tasks.prune_download_events",
+    )
+
+
+class Migration(migrations.Migration):
+    # The index is created concurrently to avoid locking the events table
+    atomic = False
+
+    dependencies = [
+        ("repository", "0030_add_package_version_download_stat"),
+        ("django_celery_beat", "0014_remove_clockedschedule_enabled"),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name="packageversiondownloadevent",
+            index=models.Index(
+                fields=["last_download"], name="repository__last_do_fa49a0_idx"
+            ),
+        ),
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:41
+
+from distutils.version import StrictVersion
+
+from django.db import migrations, models
+
+
+def get_version_parts(version_number):
+    try:
+        return StrictVersion(version_number).version
+    except ValueError:
+        return (0, 0, 0)
+
+
+def forwards(apps, schema_editor):
+    PackageVersion = apps.get_model("repository", "PackageVersion")
+
+    batch = []
+    for version in PackageVersion.objects.only("pk", "version_number").iterator():
+        (
+            version.version_major,
+            version.version_minor,
+            version.version_patch,
+        ) = get_version_parts(version.version_number)
+        batch.append(version)
+        if len(batch) >= 1000:
+            PackageVersion.objects.bulk_update(
+                batch, ("version_major", "version_minor", "version_patch")
+            )
+            batch = []
+    PackageVersion.objects.bulk_update(
+        batch, ("version_major", "version_minor", "version_patch")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("repository", "0031_add_download_event_pruning"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="packageversion",
+            name="version_major",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="packageversion",
+            name="version_minor",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="packageversion",
+            name="version_patch",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="packageversion",
+            index=models.Index(
+                fields=["package", "version_major", "version_minor", "version_patch"],
+                name="repository__package_ea81f8_idx",
+            ),
+        ),
+    ]
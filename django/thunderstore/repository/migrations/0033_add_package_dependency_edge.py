@@ -0,0 +1,92 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def forwards(apps, schema_editor):
+    Package = apps.get_model("repository", "Package")
+    PackageVersion = apps.get_model("repository", "PackageVersion")
+    PackageDependencyEdge = apps.get_model("repository", "PackageDependencyEdge")
+
+    edges = (
+        PackageVersion.dependencies.through.objects.filter(
+            from_packageversion__package__is_active=True,
+            from_packageversion__is_active=True,
+        )
+        .exclude(to_packageversion__package_id=F("from_packageversion__package_id"))
+        .values_list("from_packageversion__package_id", "to_packageversion__package_id")
+        .distinct()
+    )
+    PackageDependencyEdge.objects.bulk_create(
+        (
+            PackageDependencyEdge(package_id=package_id, dependency_id=dependency_id)
+            for package_id, dependency_id in edges.iterator()
+        ),
+        batch_size=1000,
+    )
+    dependants = (
+        PackageDependencyEdge.objects.filter(dependency=OuterRef("pk"))
+        .values("dependency")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Package.objects.update(dependant_count=Coalesce(Subquery(dependants), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("repository", "0032_add_package_version_number_parts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="package",
+            name="dependant_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="PackageDependencyEdge",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dependency",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dependant_edges",
+                        to="repository.package",
+                    ),
+                ),
+                (
+                    "package",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dependency_edges",
+                        to="repository.package",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="packagedependencyedge",
+            index=models.Index(
+                fields=["dependency", "package"], name="repository__depende_f05230_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="packagedependencyedge",
+            unique_together={("package", "dependency")},
+        ),
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.1.14 on 2026-10-18 20:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0013_add_package_listing_search_indexes"),
+        ("repository", "0033_add_package_dependency_edge"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="packagechange",
+            name="community",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="community.community",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="packagechange",
+            name="package_uuid4",
+            field=models.UUIDField(db_index=True),
+        ),
+    ]
@@ -1,5 +1,8 @@
+from .api_snapshot import *
 from .discord_bot import *
 from .package import *
+from .package_change import *
+from .package_dependency import *
 from .package_download import *
 from .package_rating import *
 from .package_version import *
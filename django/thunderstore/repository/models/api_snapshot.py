@@ -0,0 +1,143 @@
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import get_storage_class
+from django.db import models
+from django.utils import timezone
+
+# Latest snapshot URLs are looked up from the database at most this often
+LATEST_SNAPSHOT_URL_EXPIRY = 60 * 5
+
+# Storage backends known to serve .json.gz objects with a gzip
+# Content-Encoding, which clients need to decode the redirected responses.
+# Snapshots are disabled on other backends
+GZIP_ENCODING_STORAGES = ("storages.backends.s3boto3.S3Boto3Storage",)
+
+
+def get_snapshot_filepath(instance, filename):
+    return (
+        f"api-snapshots/{instance.community_site.community.identifier}"
+        f"/{instance.api_version}/{filename}"
+    )
+
+
+class ApiSnapshot(models.Model):
+    """
+    A rendered package index published to the file storage, so that it can
+    be served by the storage or a CDN in front of it instead of the API.
+
+    Snapshots are stored gzip compressed with a .json.gz extension, which
+    storage backends in GZIP_ENCODING_STORAGES use to set the
+    Content-Encoding of the object.
+    """
+
+    community_site = models.ForeignKey(
+        "community.CommunitySite",
+        related_name="api_snapshots",
+        on_delete=models.CASCADE,
+    )
+    api_version = models.CharField(max_length=32)
+    file = models.FileField(upload_to=get_snapshot_filepath)
+    file_size = models.PositiveIntegerField()
+    content_hash = models.CharField(max_length=64)
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("community_site", "api_version", "-date_created")),
+        ]
+
+    def __str__(self):
+        return f"{self.api_version} snapshot of {self.community_site}"
+
+    @staticmethod
+    def storage_sends_gzip_encoding() -> bool:
+        # Snapshots are stored in the default file storage
+        return any(
+            f"{cls.__module__}.{cls.__qualname__}" in GZIP_ENCODING_STORAGES
+            for cls in get_storage_class().__mro__
+        )
+
+    @classmethod
+    def is_enabled(cls, community_site) -> bool:
+        return (
+            community_site.community.identifier in settings.API_SNAPSHOT_COMMUNITIES
+            and cls.storage_sends_gzip_encoding()
+        )
+
+    @staticmethod
+    def get_latest_url_key(community_site, api_version: str) -> str:
+        return f"api_snapshot.latest.{api_version}.{community_site.pk}"
+
+    @classmethod
+    def get_latest(cls, community_site, api_version: str) -> Optional["ApiSnapshot"]:
+        return (
+            cls.objects.filter(community_site=community_site, api_version=api_version)
+            .order_by("-date_created", "-pk")
+            .first()
+        )
+
+    @classmethod
+    def get_latest_url(cls, community_site, api_version: str) -> Optional[str]:
+        if not cls.is_enabled(community_site):
+            return None
+        key = cls.get_latest_url_key(community_site, api_version)
+        url = cache.get(key)
+        if url is None:
+            latest = cls.get_latest(community_site, api_version)
+            url = latest.file.url if latest else ""
+            cache.set(key, url, LATEST_SNAPSHOT_URL_EXPIRY)
+        return url or None
+
+    @classmethod
+    def publish(
+        cls, community_site, api_version: str, gzip_content: bytes, content_hash: str
+    ) -> "ApiSnapshot":
+        """
+        Stores the gzip compressed index as a new snapshot, unless it's
+        identical to the latest snapshot.
+        """
+        latest = cls.get_latest(community_site, api_version)
+        if latest and latest.content_hash == content_hash:
+            return latest
+        snapshot = cls(
+            community_site=community_site,
+            api_version=api_version,
+            file_size=len(gzip_content),
+            content_hash=content_hash,
+        )
+        timestamp = timezone.now().strftime("%Y%m%d%H%M%S")
+        snapshot.file.save(
+            f"{timestamp}-{content_hash[:16]}.json.gz",
+            ContentFile(gzip_content),
+            save=False,
+        )
+        snapshot.save()
+        cache.set(
+            cls.get_latest_url_key(community_site, api_version),
+            snapshot.file.url,
+            LATEST_SNAPSHOT_URL_EXPIRY,
+        )
+        return snapshot
+
+    @classmethod
+    def prune(cls, keep: int) -> int:
+        """
+        Deletes all but the latest `keep` snapshots of each community site
+        and API version along with their files. Returns the amount of
+        deleted snapshots.
+        """
+        deleted = 0
+        groups = cls.objects.values_list("community_site_id", "api_version").distinct()
+        for community_site_id, api_version in groups:
+            outdated = cls.objects.filter(
+                community_site_id=community_site_id,
+                api_version=api_version,
+            ).order_by("-date_created", "-pk")[keep:]
+            for snapshot in outdated:
+                snapshot.file.delete(save=False)
+                snapshot.delete()
+                deleted += 1
+        return deleted
@@ -1,18 +1,28 @@
 import re
 import uuid
-from distutils.version import StrictVersion
+from typing import Iterable, Optional
 
 from django.conf import settings
 from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Case, Q, Sum, When, signals
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, signals
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.functional import cached_property
 
-from thunderstore.core.cache import CacheBustCondition, invalidate_cache
+from thunderstore.core.cache import (
+    CacheBustCondition,
+    CacheTagType,
+    get_cache_tag,
+    invalidate_cache,
+)
+from thunderstore.core.transactions import on_commit_batched
 from thunderstore.repository.consts import PACKAGE_NAME_REGEX
+from thunderstore.repository.models.package_change import PackageChange
+
+COUNTER_FIELDS = ("total_downloads", "rating_count", "dependant_count")
 
 
 class PackageQueryset(models.QuerySet):
@@ -56,6 +66,15 @@ class Package(models.Model):
         related_name="+",
         null=True,
     )
+    total_downloads = models.PositiveBigIntegerField(
+        default=0,
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+    )
+    dependant_count = models.PositiveIntegerField(
+        default=0,
+    )
 
     class Meta:
         unique_together = ("owner", "name")
@@ -68,8 +87,75 @@ class Package(models.Model):
 
     def save(self, *args, **kwargs):
         self.validate()
+        # Counters are only written with update queries, so that saving an
+        # instance loaded before a counter changed doesn't revert the change
+        if not self._state.adding and not args and "update_fields" not in kwargs:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTER_FIELDS
+            ]
         return super().save(*args, **kwargs)
 
+    @classmethod
+    def update_counters(cls, package_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recomputes the denormalized download, rating and dependant counters
+        of the given packages, or all packages if none are given. The
+        counters are otherwise kept up to date incrementally, so this is
+        only needed for backfills and repairs.
+        """
+        from thunderstore.repository.models import (
+            PackageDependencyEdge,
+            PackageRating,
+            PackageVersion,
+        )
+
+        packages = cls.objects.all()
+        if package_ids is not None:
+            packages = packages.filter(pk__in=package_ids)
+        downloads = (
+            PackageVersion.objects.filter(package=OuterRef("pk"))
+            .values("package")
+            .annotate(total=Sum("downloads"))
+            .values("total")
+        )
+        ratings = (
+            PackageRating.objects.filter(package=OuterRef("pk"))
+            .values("package")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        dependants = (
+            PackageDependencyEdge.objects.filter(dependency=OuterRef("pk"))
+            .values("dependency")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return packages.update(
+            total_downloads=Coalesce(Subquery(downloads), 0),
+            rating_count=Coalesce(Subquery(ratings), 0),
+            dependant_count=Coalesce(Subquery(dependants), 0),
+        )
+
+    @classmethod
+    def update_dependant_counts(cls, package_ids: Iterable[int]) -> int:
+        from thunderstore.repository.models import PackageDependencyEdge
+
+        dependants = (
+            PackageDependencyEdge.objects.filter(dependency=OuterRef("pk"))
+            .values("dependency")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return cls.objects.filter(pk__in=package_ids).update(
+            dependant_count=Coalesce(Subquery(dependants), 0)
+        )
+
+    @classmethod
+    def increment_counter(cls, package_id: int, field: str, amount: int = 1):
+        cls.objects.filter(pk=package_id).update(**{field: F(field) + amount})
+
     def get_package_listing(self, community):
         from thunderstore.community.models import PackageListing
 
@@ -105,16 +191,9 @@ class Package(models.Model):
 
     @cached_property
     def available_versions(self):
-        # TODO: Caching
-        versions = self.versions.filter(is_active=True).values_list(
-            "pk", "version_number"
-        )
-        ordered = sorted(versions, key=lambda version: StrictVersion(version[1]))
-        pk_list = [version[0] for version in reversed(ordered)]
-        preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(pk_list)])
         return (
-            self.versions.filter(pk__in=pk_list)
-            .order_by(preserved)
+            self.versions.filter(is_active=True)
+            .order_by("-version_major", "-version_minor", "-version_patch")
             .prefetch_related(
                 "dependencies",
                 "dependencies__package",
@@ -126,14 +205,13 @@ class Package(models.Model):
             )
         )
 
-    @cached_property
+    @property
     def downloads(self):
-        # TODO: Caching
-        return self.versions.aggregate(downloads=Sum("downloads"))["downloads"]
+        return self.total_downloads
 
-    @cached_property
+    @property
     def rating_score(self):
-        return self.package_ratings.count()
+        return self.rating_count
 
     @cached_property
     def icon(self):
@@ -157,10 +235,8 @@ class Package(models.Model):
 
     @cached_property
     def sorted_dependencies(self):
-        return (
-            self.latest.dependencies.select_related("package")
-            .annotate(total_downloads=Sum("package__versions__downloads"))
-            .order_by("-package__is_pinned", "-total_downloads")
+        return self.latest.dependencies.select_related("package").order_by(
+            "-package__is_pinned", "-package__total_downloads"
         )
 
     @cached_property
@@ -169,12 +245,7 @@ class Package(models.Model):
 
     @cached_property
     def dependants(self):
-        # TODO: Caching
-        return Package.objects.exclude(
-            ~Q(
-                versions__dependencies__package=self,
-            )
-        ).active()
+        return Package.objects.filter(dependency_edges__dependency=self)
 
     @cached_property
     def owner_url(self):
@@ -194,6 +265,35 @@ class Package(models.Model):
     def readme(self):
         return self.latest.readme
 
+    @cached_property
+    def cache_tag(self):
+        return get_cache_tag(CacheTagType.package, self.pk)
+
+    def get_cache_tags(self):
+        """
+        Returns the cache tags which should be invalidated when this package
+        changes. Packages the latest version depends on are included as their
+        dependant listings include this package.
+        """
+        tags = [
+            get_cache_tag(CacheTagType.package, self.pk),
+            get_cache_tag(CacheTagType.owner, self.owner_id),
+        ]
+        tags += [
+            get_cache_tag(CacheTagType.community, community_id)
+            for community_id in self.package_listings.values_list(
+                "community_id", flat=True
+            )
+        ]
+        if self.latest_id:
+            tags += [
+                get_cache_tag(CacheTagType.package, package_id)
+                for package_id in self.latest.dependencies.values_list(
+                    "package_id", flat=True
+                )
+            ]
+        return tags
+
     def get_absolute_url(self):
         return reverse(
             "packages.detail", kwargs={"owner": self.owner.name, "name": self.name}
@@ -210,7 +310,11 @@ class Package(models.Model):
         old_latest = self.latest
         if hasattr(self, "available_versions"):
             del self.available_versions  # Bust the version cache
-        self.latest = self.available_versions.first()
+        self.latest = (
+            self.versions.filter(is_active=True)
+            .order_by("-version_major", "-version_minor", "-version_patch")
+            .first()
+        )
         if old_latest != self.latest:
             self.save()
 
@@ -230,12 +334,38 @@ class Package(models.Model):
 
     @staticmethod
     def post_save(sender, instance, created, **kwargs):
-        invalidate_cache(CacheBustCondition.any_package_updated)
+        from thunderstore.community.models import PackageListing
+        from thunderstore.repository.models import PackageDependencyEdge
+
+        on_commit_batched(PackageChange.record_by_ids, [instance.pk])
+        PackageListing.update_search_documents([instance.pk])
+        on_commit_batched(PackageDependencyEdge.rebuild, [instance.pk])
+        invalidate_cache(
+            CacheBustCondition.any_package_updated,
+            tags=instance.get_cache_tags(),
+        )
+
+    @staticmethod
+    def pre_delete(sender, instance, **kwargs):
+        # The edges are deleted along with the package, after which the
+        # dependant counts of its dependencies need to be refreshed
+        instance._dependency_ids = list(
+            instance.dependency_edges.values_list("dependency_id", flat=True)
+        )
 
     @staticmethod
     def post_delete(sender, instance, **kwargs):
-        invalidate_cache(CacheBustCondition.any_package_updated)
+        PackageChange.record(instance, deleted=True)
+        Package.update_dependant_counts(getattr(instance, "_dependency_ids", ()))
+        invalidate_cache(
+            CacheBustCondition.any_package_updated,
+            tags=[
+                get_cache_tag(CacheTagType.package, instance.pk),
+                get_cache_tag(CacheTagType.owner, instance.owner_id),
+            ],
+        )
 
 
 signals.post_save.connect(Package.post_save, sender=Package)
+signals.pre_delete.connect(Package.pre_delete, sender=Package)
 signals.post_delete.connect(Package.post_delete, sender=Package)
@@ -0,0 +1,65 @@
+from django.db import models
+
+
+class PackageChange(models.Model):
+    """
+    Tracks the latest change of each package for incremental API syncing.
+
+    Every change creates a new row and deletes the package's older rows, so
+    the id increases with each change and can be used as a cursor. Rows
+    outlive their packages so that deleted packages can be reported as
+    removed.
+
+    Rows with a community are tombstones of listings removed from that
+    community. They're kept regardless of later changes to the package, so
+    that removals are only reported to the communities the package was
+    listed in.
+    """
+
+    package = models.ForeignKey(
+        "repository.Package",
+        related_name="+",
+        on_delete=models.SET_NULL,
+        null=True,
+    )
+    package_uuid4 = models.UUIDField(db_index=True)
+    community = models.ForeignKey(
+        "community.Community",
+        related_name="+",
+        on_delete=models.CASCADE,
+        null=True,
+    )
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def _replace(cls, **fields):
+        change = cls.objects.create(**fields)
+        # Concurrent changes of the same package may both survive this, which
+        # only means that the package is listed twice in the changes
+        cls.objects.filter(
+            package_uuid4=fields["package_uuid4"],
+            community=fields.get("community"),
+            id__lt=change.id,
+        ).delete()
+        return change
+
+    @classmethod
+    def record(cls, package, deleted=False):
+        return cls._replace(
+            package=None if deleted else package,
+            package_uuid4=package.uuid4,
+        )
+
+    @classmethod
+    def record_by_ids(cls, package_ids):
+        from thunderstore.repository.models import Package
+
+        for package in Package.objects.filter(pk__in=package_ids):
+            cls.record(package)
+
+    @classmethod
+    def record_removal(cls, package, community):
+        return cls._replace(package_uuid4=package.uuid4, community=community)
+
+    def __str__(self):
+        return f"{self.package_uuid4} changed on {self.date_created}"
@@ -0,0 +1,83 @@
+from typing import Iterable
+
+from django.db import models
+
+
+class PackageDependencyEdge(models.Model):
+    """
+    A package level dependency, materialized from the dependencies of the
+    active versions of active packages. Allows dependant lookups without
+    joining through the dependencies of every version.
+    """
+
+    package = models.ForeignKey(
+        "repository.Package",
+        related_name="dependency_edges",
+        on_delete=models.CASCADE,
+    )
+    dependency = models.ForeignKey(
+        "repository.Package",
+        related_name="dependant_edges",
+        on_delete=models.CASCADE,
+    )
+
+    class Meta:
+        unique_together = ("package", "dependency")
+        indexes = [
+            models.Index(fields=("dependency", "package")),
+        ]
+
+    def __str__(self):
+        return f"{self.package_id} depends on {self.dependency_id}"
+
+    @classmethod
+    def rebuild(cls, package_ids: Iterable[int]):
+        """
+        Brings the dependency edges of the given packages up to date and
+        refreshes the dependant counts of the packages whose dependants
+        changed.
+        """
+        from thunderstore.repository.models import Package, PackageVersion
+
+        package_ids = set(package_ids)
+        if not package_ids:
+            return
+
+        current = set(
+            PackageVersion.dependencies.through.objects.filter(
+                from_packageversion__package_id__in=package_ids,
+                from_packageversion__package__is_active=True,
+                from_packageversion__is_active=True,
+            )
+            .exclude(
+                to_packageversion__package_id=models.F(
+                    "from_packageversion__package_id"
+                )
+            )
+            .values_list(
+                "from_packageversion__package_id", "to_packageversion__package_id"
+            )
+            .distinct()
+        )
+        existing = {
+            (package_id, dependency_id): pk
+            for pk, package_id, dependency_id in cls.objects.filter(
+                package_id__in=package_ids
+            ).values_list("pk", "package_id", "dependency_id")
+        }
+
+        removed = existing.keys() - current
+        added = current - existing.keys()
+        if removed:
+            cls.objects.filter(pk__in=[existing[edge] for edge in removed]).delete()
+        if added:
+            cls.objects.bulk_create(
+                [
+                    cls(package_id=package_id, dependency_id=dependency_id)
+                    for package_id, dependency_id in added
+                ],
+                ignore_conflicts=True,
+            )
+        changed = {dependency_id for _, dependency_id in removed | added}
+        if changed:
+            Package.update_dependant_counts(changed)
@@ -1,8 +1,15 @@
-from datetime import timedelta
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
 
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Sum
 from django.utils import timezone
 
+# Repeated downloads of a version from the same IP are counted at most once
+# within this window
+DOWNLOAD_DEDUP_WINDOW = timedelta(minutes=10)
+
 
 class PackageVersionDownloadEvent(models.Model):
     version = models.ForeignKey(
@@ -19,7 +26,7 @@ class PackageVersionDownloadEvent(models.Model):
         self.total_downloads += 1
         is_valid = False
 
-        if self.last_download + timedelta(minutes=10) < timezone.now():
+        if self.last_download + DOWNLOAD_DEDUP_WINDOW < timezone.now():
             self.counted_downloads += 1
             self.last_download = timezone.now()
             is_valid = True
@@ -29,5 +36,160 @@ class PackageVersionDownloadEvent(models.Model):
         )
         return is_valid
 
+    @classmethod
+    def prune(
+        cls,
+        retention: timedelta,
+        batch_size: int = 1000,
+        max_batches: Optional[int] = None,
+    ) -> int:
+        """
+        Deletes events whose last download is older than the retention, which
+        is never shorter than the dedup window. Rows are deleted in batches
+        of primary keys to keep the transactions and locks short. Returns the
+        amount of deleted events.
+        """
+        cutoff = timezone.now() - max(retention, DOWNLOAD_DEDUP_WINDOW)
+        outdated = cls.objects.filter(last_download__lt=cutoff)
+        deleted = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            batches += 1
+            pks = list(outdated.order_by().values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+            # The filter is repeated as an event could have been counted again
+            # since the primary keys were selected
+            count, _ = outdated.filter(pk__in=pks).delete()
+            deleted += count
+            if len(pks) < batch_size:
+                break
+        return deleted
+
     class Meta:
         unique_together = ("version", "source_ip")
+        indexes = [
+            models.Index(fields=("last_download",)),
+        ]
+
+
+class PackageVersionDownloadStat(models.Model):
+    """
+    Amount of counted downloads of a version in a community on a single day,
+    so that download time series never have to be computed from events.
+
+    The package is stored alongside the version so that package level time
+    series are served from a single index range scan.
+    """
+
+    package = models.ForeignKey(
+        "repository.Package",
+        related_name="download_stats",
+        on_delete=models.CASCADE,
+    )
+    version = models.ForeignKey(
+        "repository.PackageVersion",
+        related_name="download_stats",
+        on_delete=models.CASCADE,
+    )
+    community = models.ForeignKey(
+        "community.Community",
+        related_name="download_stats",
+        on_delete=models.CASCADE,
+    )
+    date = models.DateField()
+    downloads = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("version", "community", "date")
+        indexes = [
+            models.Index(fields=("package", "community", "date")),
+        ]
+
+    def __str__(self):
+        return f"{self.version} downloads in {self.community} on {self.date}"
+
+    @classmethod
+    def record(cls, version, community, amount: int = 1):
+        today = timezone.now().date()
+        updated = cls.objects.filter(
+            version=version, community=community, date=today
+        ).update(downloads=F("downloads") + amount)
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    package_id=version.package_id,
+                    version=version,
+                    community=community,
+                    date=today,
+                    downloads=amount,
+                )
+        except IntegrityError:
+            # Another download created the row first
+            cls.objects.filter(version=version, community=community, date=today).update(
+                downloads=F("downloads") + amount
+            )
+
+    @classmethod
+    def record_many(
+        cls,
+        deltas: Dict[Tuple[int, int, date], int],
+        package_ids: Dict[int, int],
+    ):
+        """
+        Adds downloads to the rows identified by (version id, community id,
+        date) keys in bulk. `package_ids` maps the version ids to the ids of
+        their packages.
+        """
+        existing = {
+            (version_id, community_id, day): pk
+            for pk, version_id, community_id, day in cls.objects.filter(
+                version_id__in={key[0] for key in deltas},
+                date__in={key[2] for key in deltas},
+            ).values_list("pk", "version_id", "community_id", "date")
+        }
+        updates = defaultdict(list)
+        for key, amount in deltas.items():
+            if key in existing:
+                updates[amount].append(existing[key])
+        for amount, pks in updates.items():
+            cls.objects.filter(pk__in=pks).update(downloads=F("downloads") + amount)
+        cls.objects.bulk_create(
+            cls(
+                package_id=package_ids[version_id],
+                version_id=version_id,
+                community_id=community_id,
+                date=day,
+                downloads=amount,
+            )
+            for (version_id, community_id, day), amount in deltas.items()
+            if (version_id, community_id, day) not in existing
+            and version_id in package_ids
+        )
+
+    @classmethod
+    def get_daily_downloads(
+        cls, package, community, date_from: date, date_to: date
+    ) -> Dict[date, int]:
+        """
+        Returns the downloads of the package per day within the inclusive
+        range, including the days without any downloads.
+        """
+        totals = dict(
+            cls.objects.filter(
+                package=package,
+                community=community,
+                date__gte=date_from,
+                date__lte=date_to,
+            )
+            .values("date")
+            .annotate(total=Sum("downloads"))
+            .values_list("date", "total")
+        )
+        days = (date_to - date_from).days + 1
+        return {
+            day: totals.get(day, 0)
+            for day in (date_from + timedelta(days=i) for i in range(days))
+        }
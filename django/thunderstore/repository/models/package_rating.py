@@ -1,5 +1,9 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import signals
+
+from thunderstore.repository.models.package import Package
+from thunderstore.repository.models.package_change import PackageChange
 
 
 class PackageRating(models.Model):
@@ -22,3 +26,18 @@ class PackageRating(models.Model):
 
     def __str__(self):
         return f"{self.rater.username} rating on {self.package.full_package_name}"
+
+    @staticmethod
+    def post_save(sender, instance, created, **kwargs):
+        if created:
+            Package.increment_counter(instance.package_id, "rating_count")
+        PackageChange.record(instance.package)
+
+    @staticmethod
+    def post_delete(sender, instance, **kwargs):
+        Package.increment_counter(instance.package_id, "rating_count", -1)
+        PackageChange.record(instance.package)
+
+
+signals.post_save.connect(PackageRating.post_save, sender=PackageRating)
+signals.post_delete.connect(PackageRating.post_delete, sender=PackageRating)
@@ -1,5 +1,7 @@
 import re
 import uuid
+from distutils.version import StrictVersion
+from typing import Tuple
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
@@ -10,11 +12,25 @@ from django.urls import reverse
 from django.utils.functional import cached_property
 from ipware import get_client_ip
 
+from thunderstore.core.cache import (
+    CacheBustCondition,
+    CacheTagType,
+    get_cache_tag,
+    invalidate_cache,
+)
+from thunderstore.core.transactions import on_commit_batched
 from thunderstore.repository.consts import PACKAGE_NAME_REGEX
-from thunderstore.repository.models import Package, PackageVersionDownloadEvent
+from thunderstore.repository.models import Package, PackageChange, PackageDependencyEdge
 from thunderstore.webhooks.models import Webhook
 
 
+def get_version_parts(version_number: str) -> Tuple[int, int, int]:
+    try:
+        return StrictVersion(version_number).version
+    except ValueError:
+        return (0, 0, 0)
+
+
 def get_version_zip_filepath(instance, filename):
     return f"repository/packages/{instance}.zip"
 
@@ -43,10 +59,13 @@ class PackageVersion(models.Model):
         max_length=Package._meta.get_field("name").max_length,
     )
 
-    # TODO: Split to three fields for each number in the version for better querying performance
     version_number = models.CharField(
         max_length=16,
     )
+    # Populated from the version number on save, for ordering in the database
+    version_major = models.PositiveIntegerField(default=0, editable=False)
+    version_minor = models.PositiveIntegerField(default=0, editable=False)
+    version_patch = models.PositiveIntegerField(default=0, editable=False)
     website_url = models.CharField(
         max_length=1024,
     )
@@ -80,10 +99,28 @@ class PackageVersion(models.Model):
 
     def save(self, *args, **kwargs):
         self.validate()
+        (
+            self.version_major,
+            self.version_minor,
+            self.version_patch,
+        ) = get_version_parts(self.version_number)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "version_number" in update_fields:
+            kwargs["update_fields"] = {
+                *update_fields,
+                "version_major",
+                "version_minor",
+                "version_patch",
+            }
         return super().save(*args, **kwargs)
 
     class Meta:
         unique_together = ("package", "version_number")
+        indexes = [
+            models.Index(
+                fields=("package", "version_major", "version_minor", "version_patch")
+            ),
+        ]
 
     def get_absolute_url(self):
         return reverse(
@@ -145,15 +182,60 @@ class PackageVersion(models.Model):
         }
 
     @staticmethod
-    def post_save(sender, instance, created, **kwargs):
+    def post_save(sender, instance, created, update_fields, **kwargs):
         if created:
             instance.package.handle_created_version(instance)
             instance.announce_release()
+            if instance.downloads:
+                Package.increment_counter(
+                    instance.package_id, "total_downloads", instance.downloads
+                )
         instance.package.handle_updated_version(instance)
+        # Download counts are left out of change tracking as they change on
+        # every download
+        if update_fields is None or set(update_fields) != {"downloads"}:
+            on_commit_batched(PackageChange.record_by_ids, [instance.package_id])
+            on_commit_batched(PackageDependencyEdge.rebuild, [instance.package_id])
 
     @staticmethod
     def post_delete(sender, instance, **kwargs):
         instance.package.handle_deleted_version(instance)
+        on_commit_batched(PackageChange.record_by_ids, [instance.package_id])
+        if instance.downloads:
+            Package.increment_counter(
+                instance.package_id, "total_downloads", -instance.downloads
+            )
+        on_commit_batched(PackageDependencyEdge.rebuild, [instance.package_id])
+
+    @staticmethod
+    def post_dependencies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+        if action == "post_clear" and not reverse:
+            on_commit_batched(PackageDependencyEdge.rebuild, [instance.package_id])
+        # Dependency changes affect the dependant listings of the target packages
+        if action not in ("post_add", "post_remove") or not pk_set:
+            return
+        if reverse:
+            package_ids = [instance.package_id]
+            dependant_ids = list(
+                PackageVersion.objects.filter(pk__in=pk_set).values_list(
+                    "package_id", flat=True
+                )
+            )
+            on_commit_batched(PackageChange.record_by_ids, dependant_ids)
+            on_commit_batched(PackageDependencyEdge.rebuild, dependant_ids)
+        else:
+            package_ids = PackageVersion.objects.filter(pk__in=pk_set).values_list(
+                "package_id", flat=True
+            )
+            on_commit_batched(PackageChange.record_by_ids, [instance.package_id])
+            on_commit_batched(PackageDependencyEdge.rebuild, [instance.package_id])
+        invalidate_cache(
+            CacheBustCondition.any_package_updated,
+            tags=[
+                get_cache_tag(CacheTagType.package, package_id)
+                for package_id in package_ids
+            ],
+        )
 
     @classmethod
     def get_total_used_disk_space(cls):
@@ -166,26 +248,18 @@ class PackageVersion(models.Model):
             webhook.post_package_version_release(self)
 
     def maybe_increase_download_counter(self, request):
+        from thunderstore.repository.downloads import get_download_counter
+
         client_ip, is_routable = get_client_ip(request)
         if client_ip is None:
             return
 
-        download_event, created = PackageVersionDownloadEvent.objects.get_or_create(
-            version=self,
-            source_ip=client_ip,
-        )
-
-        if created:
-            valid = True
-        else:
-            valid = download_event.count_downloads_and_return_validity()
-
-        if valid:
-            self._increase_download_counter()
+        get_download_counter().count_download(self, request.community, client_ip)
 
     def _increase_download_counter(self):
         self.downloads += 1
         self.save(update_fields=("downloads",))
+        Package.increment_counter(self.package_id, "total_downloads")
 
     def __str__(self):
         return self.full_version_name
@@ -193,3 +267,7 @@ class PackageVersion(models.Model):
 
 signals.post_save.connect(PackageVersion.post_save, sender=PackageVersion)
 signals.post_delete.connect(PackageVersion.post_delete, sender=PackageVersion)
+signals.m2m_changed.connect(
+    PackageVersion.post_dependencies_changed,
+    sender=PackageVersion.dependencies.through,
+)
@@ -2,7 +2,10 @@ from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from thunderstore.repository.models import PackageVersion
-from thunderstore.repository.package_reference import PackageReference
+from thunderstore.repository.package_reference import (
+    PackageReference,
+    resolve_package_references,
+)
 from thunderstore.repository.serializer_fields import (
     DependencyField,
     PackageNameField,
@@ -32,11 +35,23 @@ class ManifestV1Serializer(serializers.Serializer):
         allow_blank=True,
     )
     dependencies = serializers.ListField(
-        child=DependencyField(),
+        # The dependencies are resolved in bulk by validate_dependencies
+        child=DependencyField(resolve=False),
         max_length=100,
         allow_empty=True,
     )
 
+    def validate_dependencies(self, dependencies):
+        resolved = resolve_package_references(dependencies)
+        errors = {
+            index: [f"No matching package found for reference: {reference}"]
+            for index, reference in enumerate(dependencies)
+            if resolved[reference] is None
+        }
+        if errors:
+            raise ValidationError(errors)
+        return dependencies
+
     def validate(self, data):
         result = super().validate(data)
         if self.uploader is None:
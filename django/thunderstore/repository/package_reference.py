@@ -1,42 +1,122 @@
 from __future__ import annotations
 
 from distutils.version import StrictVersion
-from typing import Optional, Union
+from functools import lru_cache, reduce
+from operator import or_
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple, Union
 
-from django.db.models import QuerySet
-from django.utils.functional import cached_property
+from django.db.models import Q, QuerySet
 
+from thunderstore.repository.consts import PACKAGE_VERSION_REGEX
 from thunderstore.repository.models import Package, PackageVersion
 
+VersionTuple = Tuple[int, ...]
+
+PARSE_CACHE_SIZE = 8192
+
+# Marks lazily resolved attributes which haven't been resolved yet
+_UNRESOLVED = object()
+
+
+class ParsedVersion(NamedTuple):
+    numbers: VersionTuple
+    prerelease: Optional[Tuple[str, int]] = None
+
+    @property
+    def sort_key(self) -> tuple:
+        # Pre-releases come before the release itself, as with StrictVersion
+        return self.numbers, self.prerelease is None, self.prerelease or ()
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_version(version: str) -> ParsedVersion:
+    """
+    Parse a version number string the same way StrictVersion does. Plain
+    Major.Minor.Patch versions skip the StrictVersion regex, which is only
+    used for everything else so that the accepted formats don't change.
+
+    :param str version: The version number string
+    :return: The version numbers and pre-release tag
+    :rtype: ParsedVersion
+    :raises ValueError: If the version number is invalid
+    """
+    if PACKAGE_VERSION_REGEX.match(version):
+        return ParsedVersion(tuple(int(x) for x in version.split(".")))
+    strict_version = StrictVersion(version)
+    return ParsedVersion(strict_version.version, strict_version.prerelease)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_reference(unparsed: str) -> Tuple[str, str, Optional[ParsedVersion]]:
+    """
+    Split a package reference string into its namespace, name and version
+    components. The results are cached, as the same references are parsed
+    over and over again when processing manifests and dependency lists.
+
+    :param str unparsed: The package reference string
+    :return: The namespace, name and version of the reference
+    :raises ValueError: If the reference string is in an invalid format
+    """
+    rest, _, version_string = unparsed.rpartition("-")
+    version = None
+    if "." in version_string:
+        if version_string.count(".") != 2:
+            raise ValueError(f"Invalid package reference string: {unparsed}")
+        if unparsed.count("-") < 2:
+            raise ValueError(f"Invalid package reference string: {unparsed}")
+        version = parse_version(version_string)
+        unparsed = rest
+
+    namespace, _, name = unparsed.rpartition("-")
+    if not (namespace and name):
+        raise ValueError(f"Invalid package reference string: {unparsed}")
+
+    return namespace, name, version
+
 
 class PackageReference:
+    __slots__ = ("_namespace", "_name", "_version", "_hash", "_instance", "_package")
+
     def __init__(
         self,
         namespace: str,
         name: str,
-        version: Optional[Union[str, StrictVersion]] = None,
+        version: Optional[
+            Union[str, StrictVersion, ParsedVersion, VersionTuple]
+        ] = None,
     ):
         """
         :param str namespace: The namespace of the referenced package
         :param str name: The name of the referenced package
         :param version: The version of the referenced package
-        :type version: StrictVersion or str or None
+        :type version: StrictVersion or str or tuple of int or None
         """
+        if isinstance(version, str):
+            version = parse_version(version)
+        elif isinstance(version, StrictVersion):
+            version = ParsedVersion(version.version, version.prerelease)
+        elif version is not None and not isinstance(version, ParsedVersion):
+            version = ParsedVersion(tuple(version))
         self._namespace: str = namespace
         self._name: str = name
-        if version is not None and not isinstance(version, StrictVersion):
-            version = StrictVersion(version)
-        self._version: Optional[StrictVersion] = version
+        self._version: Optional[ParsedVersion] = version
+        self._hash: int = hash((namespace, name, version))
+        self._instance = _UNRESOLVED
+        self._package = _UNRESOLVED
 
     def __str__(self) -> str:
-        if self.version:
-            return f"{self.namespace}-{self.name}-{self.version_str}"
+        if self._version:
+            return f"{self._namespace}-{self._name}-{self.version_str}"
         else:
-            return f"{self.namespace}-{self.name}"
+            return f"{self._namespace}-{self._name}"
 
     def __repr__(self) -> str:
         return f"<PackageReference: {str(self)}>"
 
+    def __reduce__(self):
+        # Resolved instances aren't carried over
+        return self.__class__, (self._namespace, self._name, self._version)
+
     @property
     def namespace(self) -> str:
         return self._namespace
@@ -47,12 +127,23 @@ class PackageReference:
 
     @property
     def version(self) -> Optional[StrictVersion]:
-        return self._version
+        if self._version is None:
+            return None
+        version = StrictVersion()
+        version.version = self._version.numbers
+        version.prerelease = self._version.prerelease
+        return version
+
+    @property
+    def version_tuple(self) -> Optional[VersionTuple]:
+        if self._version is None:
+            return None
+        return self._version.numbers
 
     @property
     def version_str(self):
-        if self.version is not None:
-            return ".".join(str(x) for x in self.version.version)
+        if self._version is not None:
+            return ".".join(str(x) for x in self._version.numbers)
         return ""
 
     def is_same_package(self, other: Union[str, PackageReference]) -> bool:
@@ -67,7 +158,7 @@ class PackageReference:
         """
         if isinstance(other, str):
             other = PackageReference.parse(other)
-        return self.namespace == other.namespace and self.name == other.name
+        return self._namespace == other._namespace and self._name == other._name
 
     def is_same_version(self, other: Union[str, PackageReference]) -> bool:
         """
@@ -84,35 +175,35 @@ class PackageReference:
         if not self.is_same_package(other):
             return False
         try:
-            return self.version == other.version
+            return self._version == other._version
         except AttributeError:
             return False
 
     def __eq__(self, other):
         if isinstance(other, PackageReference):
-            return self.is_same_version(other)
+            return self._hash == other._hash and self.is_same_version(other)
         return False
 
     def __gt__(self, other):
         if isinstance(other, PackageReference):
             if not self.is_same_package(other):
                 raise TypeError("Unable to compare different packages")
-            if not all((self.version, other.version)):
+            if not all((self._version, other._version)):
                 raise TypeError("Unable to compare packages without version")
-            return self.version > other.version
+            return self._version.sort_key > other._version.sort_key
         raise TypeError("Unable to make comparison")
 
     def __lt__(self, other):
         if isinstance(other, PackageReference):
             if not self.is_same_package(other):
                 raise TypeError("Unable to compare different packages")
-            if not all((self.version, other.version)):
+            if not all((self._version, other._version)):
                 raise TypeError("Unable to compare packages without version")
-            return self.version < other.version
+            return self._version.sort_key < other._version.sort_key
         raise TypeError("Unable to make comparison")
 
     def __hash__(self):
-        return hash(str(self))
+        return self._hash
 
     @classmethod
     def parse(cls, unparsed: Union[PackageReference, str]) -> PackageReference:
@@ -135,25 +226,10 @@ class PackageReference:
         if unparsed is None:
             raise ValueError("Unable to parse NoneType")
 
-        version_string = unparsed.split("-")[-1]
-        version = None
-        if version_string.count(".") > 0:
-            if version_string.count(".") != 2:
-                raise ValueError(f"Invalid package reference string: {unparsed}")
-            if unparsed.count("-") < 2:
-                raise ValueError(f"Invalid package reference string: {unparsed}")
-            version = StrictVersion(version_string)
-            unparsed = unparsed[: -(len(version_string) + 1)]
-
-        name = unparsed.split("-")[-1]
-        namespace = "-".join(unparsed.split("-")[:-1])
-
-        if not (namespace and name):
-            raise ValueError(f"Invalid package reference string: {unparsed}")
-
+        namespace, name, version = parse_reference(unparsed)
         return PackageReference(namespace=namespace, name=name, version=version)
 
-    @cached_property
+    @property
     def without_version(self) -> PackageReference:
         """
         Return this same package reference with version information removed
@@ -161,8 +237,8 @@ class PackageReference:
         :return: Versionless reference to the same package
         :rtype: PackageReference
         """
-        if self.version:
-            return PackageReference(namespace=self.namespace, name=self.name)
+        if self._version:
+            return PackageReference(namespace=self._namespace, name=self._name)
         return self
 
     def with_version(
@@ -187,7 +263,7 @@ class PackageReference:
         :return: A PackageVersion or Package queryset filtering for this package
         :rtype: QuerySet of PackageVersion or Package
         """
-        if self.version:
+        if self._version:
             return PackageVersion.objects.filter(
                 package__owner__name=self.namespace,
                 package__name=self.name,
@@ -199,7 +275,7 @@ class PackageReference:
                 name=self.name,
             )
 
-    @cached_property
+    @property
     def package_version(self) -> Optional[PackageVersion]:
         """
         Resolve and return the PackageVersion model instance for this reference
@@ -207,13 +283,13 @@ class PackageReference:
         :return: A PackageVersion model instance matching this reference
         :rtype: PackageVersion or None
         """
-        if not self.version:
+        if not self._version:
             raise TypeError(
                 "Unable to resolve package version from a versionless reference"
             )
-        return self.queryset.first()
+        return self.instance
 
-    @cached_property
+    @property
     def package(self) -> Optional[Package]:
         """
         Resolve and return the Package model instance for this reference
@@ -221,9 +297,11 @@ class PackageReference:
         :return: A Package model instance matching this reference
         :rtype: Package or None
         """
-        return self.without_version.instance
+        if self._package is _UNRESOLVED:
+            self._package = self.without_version.instance
+        return self._package
 
-    @cached_property
+    @property
     def instance(self) -> Optional[Union[Package, PackageVersion]]:
         """
         Resolve and return the PackageVersion or Package model instance for
@@ -233,9 +311,11 @@ class PackageReference:
         :return: This reference's closest matching model instance
         :rtype: Package or PackageVersion or None
         """
-        return self.queryset.first()
+        if self._instance is _UNRESOLVED:
+            self._instance = self.queryset.first()
+        return self._instance
 
-    @cached_property
+    @property
     def exists(self) -> bool:
         """
         Check if the package this reference is pointing to exists in the db
@@ -243,4 +323,66 @@ class PackageReference:
         :return: True if the package exists, False otherwise
         :rtype: bool
         """
-        return self.queryset.exists()
+        return self.instance is not None
+
+
+def resolve_package_references(
+    references: Iterable[PackageReference],
+) -> Dict[PackageReference, Optional[Union[Package, PackageVersion]]]:
+    """
+    Resolve the model instances of multiple package references at once.
+    Versioned references are resolved with a single PackageVersion query and
+    versionless references with a single Package query, regardless of the
+    amount of references.
+
+    The resolved instances are also cached on the references themselves, so
+    accessing their `instance` property afterwards doesn't cause a query.
+
+    :param references: The package references to resolve
+    :return: A mapping of the references to their closest matching model
+        instance, or None if no matching instance exists
+    :rtype: dict of PackageReference to Package or PackageVersion or None
+    """
+    references = list(references)
+    versioned = [x for x in references if x.version_tuple]
+    versionless = [x for x in references if not x.version_tuple]
+    instances = {}
+
+    if versioned:
+        condition = reduce(
+            or_,
+            (
+                Q(
+                    package__owner__name=x.namespace,
+                    package__name=x.name,
+                    version_number=x.version_str,
+                )
+                for x in set(versioned)
+            ),
+        )
+        for version in PackageVersion.objects.filter(condition).select_related(
+            "package", "package__owner"
+        ):
+            key = (
+                version.package.owner.name,
+                version.package.name,
+                version.version_number,
+            )
+            instances[key] = version
+
+    if versionless:
+        condition = reduce(
+            or_,
+            (Q(owner__name=x.namespace, name=x.name) for x in set(versionless)),
+        )
+        for package in Package.objects.filter(condition).select_related("owner"):
+            instances[(package.owner.name, package.name, "")] = package
+
+    result = {}
+    for reference in references:
+        instance = instances.get(
+            (reference.namespace, reference.name, reference.version_str)
+        )
+        reference._instance = instance
+        result[reference] = instance
+    return result
@@ -226,6 +226,8 @@ class PackageUploadForm(forms.ModelForm):
 
         self.instance.icon.save("icon.png", self.icon)
         instance = super().save()
-        for reference in self.manifest["dependencies"]:
-            instance.dependencies.add(reference.instance)
+        # The references have been resolved in bulk during manifest validation
+        instance.dependencies.add(
+            *(reference.instance for reference in self.manifest["dependencies"])
+        )
         return instance
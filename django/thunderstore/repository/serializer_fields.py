@@ -39,10 +39,10 @@ class ModelChoiceField(serializers.Field):
 
 
 class DependencyField(serializers.Field):
-    def __init__(self, **kwargs):
+    def __init__(self, resolve: bool = True, **kwargs):
         super().__init__(**kwargs)
         self.validators.append(
-            PackageReferenceValidator(require_version=True, resolve=True)
+            PackageReferenceValidator(require_version=True, resolve=resolve)
         )
 
     def to_internal_value(self, data):
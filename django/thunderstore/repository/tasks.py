@@ -1,12 +1,117 @@
-from celery import shared_task
+from datetime import timedelta
 
-from thunderstore.repository.api.experimental.tasks import (
-    update_api_experimental_caches,
+from celery import group, shared_task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core.cache import cache
+
+from thunderstore.cache.models import DatabaseCache
+from thunderstore.community.models import CommunitySite
+from thunderstore.core.locks import get_lock_backend
+from thunderstore.repository.api.experimental.tasks import update_api_experimental_cache
+from thunderstore.repository.api.v1.tasks import update_api_v1_index
+from thunderstore.repository.cache import get_community_listings_fingerprint
+from thunderstore.repository.dependency_graph import update_dependency_graph_fingerprint
+from thunderstore.repository.downloads import (
+    DOWNLOAD_FLUSH_TIME_LIMIT,
+    flush_buffered_downloads,
 )
-from thunderstore.repository.api.v1.tasks import update_api_v1_caches
+from thunderstore.repository.models import PackageVersionDownloadEvent
+
+logger = get_task_logger(__name__)
+
+API_CACHE_UPDATERS = {
+    "v1": update_api_v1_index,
+    "experimental": update_api_experimental_cache,
+}
+# Caches of unchanged communities are still regenerated this often, so that
+# the parts of them stored with an expiry are kept warm
+API_CACHE_MAX_AGE = 60 * 30
+API_CACHE_TIME_LIMIT = 60 * 10
+
+
+def get_api_cache_fingerprint_key(community_site_id: int, api_version: str) -> str:
+    return f"api_cache.fingerprint.{api_version}.{community_site_id}"
 
 
 @shared_task
 def update_api_caches():
-    update_api_v1_caches()
-    update_api_experimental_caches()
+    """
+    Regenerates the API caches of every community site. Each community and
+    API version is updated by a separate task, so that they can be spread
+    across workers and a slow community doesn't delay the others.
+    """
+    group(
+        update_community_api_cache.si(community_site_id, api_version)
+        for community_site_id in CommunitySite.objects.values_list("pk", flat=True)
+        for api_version in API_CACHE_UPDATERS
+    ).delay()
+    # Not chained to the updates, which would skip it if any of them failed
+    cleanup_api_caches.delay()
+
+
+@shared_task(
+    soft_time_limit=API_CACHE_TIME_LIMIT,
+    time_limit=API_CACHE_TIME_LIMIT + 60,
+)
+def update_community_api_cache(community_site_id: int, api_version: str):
+    community_site = (
+        CommunitySite.objects.select_related("site", "community")
+        .filter(pk=community_site_id)
+        .first()
+    )
+    if community_site is None:
+        return
+
+    fingerprint_key = get_api_cache_fingerprint_key(community_site_id, api_version)
+    fingerprint = get_community_listings_fingerprint(community_site.community)
+    if cache.get(fingerprint_key) == fingerprint:
+        return
+
+    with get_lock_backend().lock(
+        f"update_api_cache.{api_version}.{community_site_id}",
+        timeout=API_CACHE_TIME_LIMIT + 60,
+    ) as lock:
+        if not lock.acquired:
+            # An update of the same cache is already in progress
+            return
+        API_CACHE_UPDATERS[api_version](community_site)
+        cache.set(fingerprint_key, fingerprint, API_CACHE_MAX_AGE)
+
+
+@shared_task
+def cleanup_api_caches():
+    DatabaseCache.delete_expired()
+
+
+@shared_task(
+    soft_time_limit=DOWNLOAD_FLUSH_TIME_LIMIT,
+    time_limit=DOWNLOAD_FLUSH_TIME_LIMIT + 60,
+)
+def flush_download_counters():
+    flush_buffered_downloads()
+
+
+@shared_task(soft_time_limit=60 * 10, time_limit=60 * 11)
+def prune_download_events():
+    """
+    Deletes download events which no longer affect download deduplication.
+    The amount of deleted events is logged and stored as the task result.
+    """
+    # Bounded so that a large backlog is worked through over several runs
+    deleted = PackageVersionDownloadEvent.prune(
+        timedelta(hours=settings.DOWNLOAD_EVENT_RETENTION_HOURS),
+        max_batches=100,
+    )
+    logger.info("Pruned %d download events", deleted)
+    return deleted
+
+
+@shared_task
+def update_dependency_graph():
+    """
+    Stores the fingerprint of the versions and dependencies in the cache,
+    which makes the processes serving the dependency graph rebuild their
+    graphs once it changes.
+    """
+    update_dependency_graph_fingerprint()
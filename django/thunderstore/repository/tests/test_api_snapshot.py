@@ -0,0 +1,113 @@
+import gzip
+import json
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from thunderstore.repository.api.experimental.tasks import (
+    update_api_experimental_caches,
+)
+from thunderstore.repository.api.v1.tasks import update_api_v1_caches
+from thunderstore.repository.models import ApiSnapshot, api_snapshot
+
+
+@pytest.fixture(autouse=True)
+def snapshot_settings(settings, tmp_path, community, mocker):
+    cache.clear()
+    # The file system storage is only used as a stand-in for object storage
+    mocker.patch.object(
+        api_snapshot,
+        "GZIP_ENCODING_STORAGES",
+        ("django.core.files.storage.FileSystemStorage",),
+    )
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.API_SNAPSHOT_COMMUNITIES = [community.identifier]
+    yield settings
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_api_snapshot_published(api_client, active_package_listing, community_site):
+    update_api_v1_caches()
+    update_api_experimental_caches()
+
+    snapshot = ApiSnapshot.get_latest(community_site, "v1")
+    assert snapshot.file.name.endswith(".json.gz")
+    with snapshot.file.open("rb") as f:
+        content = json.loads(gzip.decompress(f.read()))
+    assert content[0]["name"] == active_package_listing.package.name
+
+    response = api_client.get("/api/v1/package/")
+    assert response.status_code == 302
+    assert response["Location"] == snapshot.file.url
+
+    response = api_client.get("/api/experimental/package/")
+    assert response.status_code == 302
+    assert response["Location"] == (
+        ApiSnapshot.get_latest(community_site, "experimental").file.url
+    )
+
+
+@pytest.mark.django_db
+def test_api_snapshot_not_published_when_disabled(
+    api_client, active_package_listing, snapshot_settings
+):
+    snapshot_settings.API_SNAPSHOT_COMMUNITIES = []
+    update_api_v1_caches()
+    assert ApiSnapshot.objects.count() == 0
+    assert api_client.get("/api/v1/package/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_api_snapshot_not_published_without_gzip_encoding(
+    api_client, active_package_listing, mocker
+):
+    mocker.patch.object(
+        api_snapshot,
+        "GZIP_ENCODING_STORAGES",
+        ("storages.backends.s3boto3.S3Boto3Storage",),
+    )
+    update_api_v1_caches()
+    assert ApiSnapshot.objects.count() == 0
+    assert api_client.get("/api/v1/package/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_api_snapshot_not_used_for_other_queries(api_client, active_package_listing):
+    update_api_v1_caches()
+    assert api_client.get("/api/v1/package/?cursor=").status_code == 200
+    assert api_client.get("/api/v1/package/?since=0").status_code == 200
+
+
+@pytest.mark.django_db
+def test_api_snapshot_only_published_on_change(active_package_listing, community_site):
+    update_api_v1_caches()
+    update_api_v1_caches()
+    assert ApiSnapshot.objects.count() == 1
+
+    active_package_listing.package.is_pinned = True
+    active_package_listing.package.save()
+    update_api_v1_caches()
+    assert ApiSnapshot.objects.count() == 2
+    latest = ApiSnapshot.get_latest(community_site, "v1")
+    assert ApiSnapshot.get_latest_url(community_site, "v1") == latest.file.url
+
+
+@pytest.mark.django_db
+def test_api_snapshot_prune(community_site, tmp_path):
+    snapshots = [
+        ApiSnapshot.publish(community_site, "v1", gzip.compress(b"[]"), f"{i:064d}")
+        for i in range(4)
+    ]
+    ApiSnapshot.publish(community_site, "experimental", gzip.compress(b"[]"), "a")
+
+    call_command("prune_api_snapshots", keep=2)
+
+    remaining = set(ApiSnapshot.objects.values_list("pk", flat=True))
+    assert len(remaining) == 3
+    assert {x.pk for x in snapshots[2:]} <= remaining
+    for snapshot in snapshots[:2]:
+        assert not (tmp_path / snapshot.file.name).exists()
+    for snapshot in snapshots[2:]:
+        assert (tmp_path / snapshot.file.name).exists()
@@ -0,0 +1,171 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from thunderstore.repository.dependency_graph import (
+    clear_dependency_graph,
+    get_dependency_graph,
+)
+from thunderstore.repository.factories import PackageFactory, PackageVersionFactory
+from thunderstore.repository.models import PackageChange, PackageVersion
+from thunderstore.repository.package_reference import PackageReference
+from thunderstore.repository.tasks import update_dependency_graph
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    clear_dependency_graph()
+    yield
+    cache.clear()
+    clear_dependency_graph()
+
+
+def create_version(package=None, version_number="1.0.0", dependencies=()):
+    package = package or PackageFactory.create(is_active=True)
+    version = PackageVersionFactory.create(
+        package=package,
+        name=package.name,
+        version_number=version_number,
+        is_active=True,
+    )
+    for dependency in dependencies:
+        version.dependencies.add(dependency)
+    return version
+
+
+def resolve(*references):
+    update_dependency_graph()
+    graph = get_dependency_graph()
+    resolved, unresolved = graph.resolve(
+        [PackageReference.parse(reference) for reference in references]
+    )
+    return [graph.versions[x].full_name for x in resolved], unresolved
+
+
+@pytest.mark.django_db
+def test_dependency_graph_resolve():
+    core = create_version()
+    core_new = create_version(core.package, version_number="2.0.0")
+    api = create_version(dependencies=[core])
+    mod = create_version(dependencies=[api, core_new])
+    other = create_version(dependencies=[core_new])
+
+    assert resolve(mod.full_version_name) == (
+        [core.full_version_name, api.full_version_name, core_new.full_version_name]
+        + [mod.full_version_name],
+        [],
+    )
+    assert resolve(
+        other.package.full_package_name,
+        "Missing-Package",
+        "Missing-Package-1.0.0",
+        api.full_version_name,
+    ) == (
+        [
+            core_new.full_version_name,
+            other.full_version_name,
+            core.full_version_name,
+            api.full_version_name,
+        ],
+        ["Missing-Package", "Missing-Package-1.0.0"],
+    )
+
+
+@pytest.mark.django_db
+def test_dependency_graph_handles_cycles():
+    first = create_version()
+    second = create_version(dependencies=[first])
+    first.dependencies.add(second)
+    assert resolve(first.full_version_name) == (
+        [second.full_version_name, first.full_version_name],
+        [],
+    )
+
+
+@pytest.mark.django_db
+def test_dependency_graph_rebuilt_on_change():
+    core = create_version()
+    graph = get_dependency_graph()
+    with CaptureQueriesContext(connection) as queries:
+        assert get_dependency_graph() is graph
+    assert len(queries) == 0
+
+    # Only the task looks for changes
+    mod = create_version(dependencies=[core])
+    assert get_dependency_graph() is graph
+    assert resolve(mod.package.full_package_name)[0] == [
+        core.full_version_name,
+        mod.full_version_name,
+    ]
+
+    core.package.is_active = False
+    core.package.save()
+    assert resolve(core.full_version_name) == ([], [core.full_version_name])
+    assert resolve(mod.full_version_name)[0] == [mod.full_version_name]
+
+
+@pytest.mark.django_db
+def test_dependency_graph_excludes_inactive_versions():
+    core = create_version()
+    mod = create_version(dependencies=[core])
+    core.is_active = False
+    core.save()
+    assert resolve(core.full_version_name) == ([], [core.full_version_name])
+    assert resolve(mod.full_version_name) == (
+        [mod.full_version_name],
+        [core.full_version_name],
+    )
+
+    mod.is_active = False
+    mod.save()
+    assert resolve(mod.full_version_name) == ([], [mod.full_version_name])
+
+
+@pytest.mark.django_db
+def test_dependency_graph_not_rebuilt_on_unrelated_change():
+    version = create_version()
+    update_dependency_graph()
+    graph = get_dependency_graph()
+    version.package.is_pinned = True
+    version.package.save()
+    assert PackageChange.objects.filter(package=version.package).exists()
+    update_dependency_graph()
+    assert get_dependency_graph() is graph
+
+
+@pytest.mark.django_db
+def test_dependency_graph_rebuilt_on_swapped_versions():
+    first = create_version()
+    second = create_version(first.package, version_number="2.0.0")
+    create_version(first.package, version_number="3.0.0")
+    second.is_active = False
+    second.save()
+    assert resolve(first.full_version_name) == ([first.full_version_name], [])
+
+    first.is_active = False
+    first.save()
+    second.is_active = True
+    second.save()
+    assert resolve(first.full_version_name) == ([], [first.full_version_name])
+    assert resolve(second.full_version_name) == ([second.full_version_name], [])
+
+
+@pytest.mark.django_db
+def test_dependency_graph_rebuilt_on_swapped_dependency():
+    core = create_version()
+    other = create_version()
+    mod = create_version(dependencies=[core])
+    assert resolve(mod.full_version_name)[0] == [
+        core.full_version_name,
+        mod.full_version_name,
+    ]
+
+    PackageVersion.dependencies.through.objects.filter(from_packageversion=mod).update(
+        to_packageversion=other
+    )
+    assert resolve(mod.full_version_name)[0] == [
+        other.full_version_name,
+        mod.full_version_name,
+    ]
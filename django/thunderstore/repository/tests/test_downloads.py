@@ -0,0 +1,247 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from redis.exceptions import ConnectionError
+
+from thunderstore.community.models import Community
+from thunderstore.repository.downloads import (
+    CacheDownloadCounter,
+    DownloadKey,
+    RedisDownloadCounter,
+    apply_download_deltas,
+    flush_buffered_downloads,
+)
+from thunderstore.repository.factories import PackageVersionFactory
+from thunderstore.repository.models import (
+    PackageVersionDownloadEvent,
+    PackageVersionDownloadStat,
+)
+from thunderstore.repository.tasks import flush_download_counters, prune_download_events
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture()
+def buffered_counter(settings):
+    settings.DOWNLOAD_COUNTER_BACKEND = (
+        "thunderstore.repository.downloads.CacheDownloadCounter"
+    )
+
+
+def download(version, community, ip="127.0.0.1"):
+    request = RequestFactory().get("/", REMOTE_ADDR=ip)
+    request.community = community
+    version.maybe_increase_download_counter(request)
+
+
+def get_downloads(version):
+    version.refresh_from_db()
+    version.package.refresh_from_db()
+    return version.downloads, version.package.total_downloads
+
+
+def get_stats(version):
+    return dict(
+        PackageVersionDownloadStat.objects.filter(version=version).values_list(
+            "community_id", "downloads"
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_download_counted_synchronously(package_version, community):
+    download(package_version, community)
+    download(package_version, community)
+    download(package_version, community, ip="127.0.0.2")
+    assert get_downloads(package_version) == (2, 2)
+    assert PackageVersionDownloadEvent.objects.count() == 2
+    assert get_stats(package_version) == {community.pk: 2}
+
+
+@pytest.mark.django_db
+def test_download_counted_buffered(package_version, community, buffered_counter):
+    other = PackageVersionFactory.create(
+        package=package_version.package,
+        name=package_version.name,
+        version_number="2.0.0",
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        download(package_version, community)
+    assert not [
+        query
+        for query in queries.captured_queries
+        if not query["sql"].startswith("SELECT")
+    ]
+
+    download(package_version, community)
+    download(package_version, community, ip="127.0.0.2")
+    download(other, community)
+    assert PackageVersionDownloadEvent.objects.count() == 0
+    assert get_downloads(package_version) == (0, 0)
+
+    # Downloads are flushed one epoch behind, see CacheDownloadCounter
+    flush_download_counters()
+    assert get_downloads(package_version) == (0, 0)
+    download(other, community, ip="127.0.0.2")
+    flush_download_counters()
+    assert get_downloads(package_version) == (2, 3)
+    assert get_downloads(other) == (1, 3)
+
+    flush_download_counters()
+    assert get_downloads(other) == (2, 4)
+    assert flush_buffered_downloads() == 0
+    assert get_stats(package_version) == {community.pk: 2}
+    assert get_stats(other) == {community.pk: 2}
+
+
+@pytest.mark.django_db
+def test_download_buffer_kept_on_failed_flush(
+    package_version, community, buffered_counter, mocker
+):
+    download(package_version, community)
+    flush_download_counters()
+    mocker.patch(
+        "thunderstore.repository.downloads.apply_download_deltas",
+        side_effect=RuntimeError(),
+    )
+    with pytest.raises(RuntimeError):
+        flush_buffered_downloads()
+    download(package_version, community, ip="127.0.0.2")
+    with pytest.raises(RuntimeError):
+        flush_buffered_downloads()
+    assert get_downloads(package_version) == (0, 0)
+
+    mocker.stopall()
+    assert flush_buffered_downloads() == 1
+    assert get_downloads(package_version) == (2, 2)
+    assert flush_buffered_downloads() == 0
+    assert get_downloads(package_version) == (2, 2)
+
+
+@pytest.mark.django_db
+def test_download_buffer_flushed_after_epoch_eviction(
+    package_version, community, buffered_counter
+):
+    counter = CacheDownloadCounter()
+    for _ in range(3):
+        flush_download_counters()
+    cache.delete(counter.get_epoch_key())
+    download(package_version, community)
+    flush_download_counters()
+    flush_download_counters()
+    assert get_downloads(package_version) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_download_buffer_counter_evicted_before_incr(
+    package_version, community, buffered_counter, mocker
+):
+    incr = cache.incr
+
+    def evicting_incr(key, *args, **kwargs):
+        if ".count." in key and not evicted:
+            evicted.append(key)
+            cache.delete(key)
+        return incr(key, *args, **kwargs)
+
+    evicted = []
+    mocker.patch.object(cache, "incr", side_effect=evicting_incr)
+    download(package_version, community)
+    assert evicted
+    flush_download_counters()
+    flush_download_counters()
+    assert get_downloads(package_version) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_download_counted_directly_when_redis_unavailable(
+    package_version, community, settings, mocker
+):
+    settings.DOWNLOAD_COUNTER_BACKEND = (
+        "thunderstore.repository.downloads.RedisDownloadCounter"
+    )
+    client = mocker.Mock()
+    client.hincrby.side_effect = ConnectionError()
+    mocker.patch.object(RedisDownloadCounter, "get_client", return_value=client)
+    download(package_version, community)
+    download(package_version, community)
+    assert get_downloads(package_version) == (1, 1)
+    assert get_stats(package_version) == {community.pk: 1}
+
+
+@pytest.mark.django_db
+def test_apply_download_deltas(package_version, community):
+    versions = [package_version] + [
+        PackageVersionFactory.create(
+            package=package_version.package,
+            name=package_version.name,
+            version_number=f"1.{i}.0",
+        )
+        for i in range(1, 4)
+    ]
+    other_community = Community.objects.create(name="Other", identifier="other")
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    PackageVersionDownloadStat.objects.create(
+        package=package_version.package,
+        version=versions[0],
+        community=community,
+        date=today,
+        downloads=10,
+    )
+    deltas = {
+        DownloadKey(versions[0].pk, community.pk, today): 1,
+        DownloadKey(versions[1].pk, community.pk, today): 1,
+        DownloadKey(versions[2].pk, community.pk, today): 3,
+        DownloadKey(versions[2].pk, other_community.pk, yesterday): 2,
+    }
+
+    with CaptureQueriesContext(connection) as queries:
+        apply_download_deltas(deltas)
+    updates = [
+        query for query in queries.captured_queries if query["sql"].startswith("UPDATE")
+    ]
+    # Versions, the package and the existing statistics row
+    assert len(updates) == 4
+
+    assert [get_downloads(version)[0] for version in versions] == [1, 1, 5, 0]
+    assert get_downloads(versions[3]) == (0, 7)
+    assert get_stats(versions[0]) == {community.pk: 11}
+    assert get_stats(versions[1]) == {community.pk: 1}
+    assert get_stats(versions[2]) == {community.pk: 3, other_community.pk: 2}
+
+
+@pytest.mark.django_db
+def test_prune_download_events(package_version, settings):
+    now = timezone.now()
+    ages = [timedelta(minutes=5), timedelta(hours=2), timedelta(days=2)]
+    for i, age in enumerate(ages * 3):
+        event = PackageVersionDownloadEvent.objects.create(
+            version=package_version, source_ip=f"127.0.0.{i}"
+        )
+        PackageVersionDownloadEvent.objects.filter(pk=event.pk).update(
+            last_download=now - age
+        )
+
+    settings.DOWNLOAD_EVENT_RETENTION_HOURS = 24
+    assert prune_download_events() == 3
+    assert PackageVersionDownloadEvent.prune(timedelta(hours=1), batch_size=2) == 3
+    # The dedup window is always retained
+    assert PackageVersionDownloadEvent.prune(timedelta(0)) == 0
+    assert PackageVersionDownloadEvent.objects.count() == 3
+
+    PackageVersionDownloadEvent.objects.update(last_download=now - timedelta(days=3))
+    call_command("prune_download_events", batch_size=1)
+    assert PackageVersionDownloadEvent.objects.count() == 0
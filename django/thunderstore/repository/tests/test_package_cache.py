@@ -1,6 +1,6 @@
 import pytest
 
-from thunderstore.core.cache import CacheBustCondition
+from thunderstore.core.cache import CacheBustCondition, CacheTagType, get_cache_tag
 
 
 @pytest.mark.django_db
@@ -21,7 +21,10 @@ def test_package_cache_is_invalidated_on_version_hidden(package_version, mocker)
     )
     package_version.is_active = False
     package_version.save()
-    mocked_invalidate_cache.assert_called_with(CacheBustCondition.any_package_updated)
+    mocked_invalidate_cache.assert_called_with(
+        CacheBustCondition.any_package_updated,
+        tags=package_version.package.get_cache_tags(),
+    )
 
 
 @pytest.mark.django_db
@@ -30,4 +33,33 @@ def test_package_cache_is_invalidated_on_listing_delete(active_package_listing,
         "thunderstore.community.models.package_listing.invalidate_cache"
     )
     active_package_listing.delete()
-    mocked_invalidate_cache.assert_called_with(CacheBustCondition.any_package_updated)
+    mocked_invalidate_cache.assert_called_with(
+        CacheBustCondition.any_package_updated,
+        tags=[
+            get_cache_tag(CacheTagType.package, active_package_listing.package_id),
+            get_cache_tag(CacheTagType.community, active_package_listing.community_id),
+        ],
+    )
+
+
+@pytest.mark.django_db
+def test_package_cache_tags_include_listed_communities(active_package_listing):
+    package = active_package_listing.package
+    tags = package.get_cache_tags()
+    assert package.cache_tag in tags
+    assert get_cache_tag(CacheTagType.owner, package.owner_id) in tags
+    assert active_package_listing.community.cache_tag in tags
+
+
+@pytest.mark.django_db
+def test_package_cache_is_invalidated_for_dependency_on_dependency_added(
+    package_version, active_version, mocker
+):
+    mocked_invalidate_cache = mocker.patch(
+        "thunderstore.repository.models.package_version.invalidate_cache"
+    )
+    package_version.dependencies.add(active_version)
+    mocked_invalidate_cache.assert_called_with(
+        CacheBustCondition.any_package_updated,
+        tags=[active_version.package.cache_tag],
+    )
@@ -0,0 +1,83 @@
+import pytest
+from django.core.management import call_command
+
+from thunderstore.core.factories import UserFactory
+from thunderstore.repository.factories import PackageFactory, PackageVersionFactory
+from thunderstore.repository.models import Package, PackageRating
+
+
+def get_counters(package):
+    package.refresh_from_db()
+    return package.total_downloads, package.rating_count
+
+
+@pytest.mark.django_db
+def test_package_counters_follow_versions():
+    package = PackageFactory.create()
+    first = PackageVersionFactory.create(
+        package=package, name=package.name, version_number="1.0.0", downloads=5
+    )
+    PackageVersionFactory.create(
+        package=package, name=package.name, version_number="1.1.0", downloads=3
+    )
+    assert get_counters(package) == (8, 0)
+
+    first.delete()
+    assert get_counters(package) == (3, 0)
+
+
+@pytest.mark.django_db
+def test_package_counters_updated_incrementally(package, mocker):
+    update_counters = mocker.spy(Package, "update_counters")
+    version = PackageVersionFactory.create(
+        package=package, name=package.name, downloads=4
+    )
+    version.is_active = False
+    version.save()
+    version.is_active = True
+    version.save()
+    assert get_counters(package) == (4, 0)
+    update_counters.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_package_counters_follow_downloads(package_version):
+    package_version._increase_download_counter()
+    package_version._increase_download_counter()
+    assert get_counters(package_version.package) == (2, 0)
+    assert package_version.package.downloads == 2
+
+
+@pytest.mark.django_db
+def test_package_counters_follow_ratings(package):
+    rating = PackageRating.objects.create(rater=UserFactory.create(), package=package)
+    PackageRating.objects.create(rater=UserFactory.create(), package=package)
+    assert get_counters(package) == (0, 2)
+    assert package.rating_score == 2
+
+    rating.delete()
+    assert get_counters(package) == (0, 1)
+
+
+@pytest.mark.django_db
+def test_package_counters_not_reverted_by_stale_instance(package_version):
+    stale = Package.objects.get(pk=package_version.package_id)
+    package_version._increase_download_counter()
+    stale.is_pinned = True
+    stale.save()
+
+    package = Package.objects.get(pk=package_version.package_id)
+    assert package.is_pinned is True
+    assert package.total_downloads == 1
+
+
+@pytest.mark.django_db
+def test_repair_package_counters(package_version):
+    PackageRating.objects.create(
+        rater=UserFactory.create(), package=package_version.package
+    )
+    package_version._increase_download_counter()
+    Package.objects.update(total_downloads=100, rating_count=100)
+
+    call_command("repair_package_counters")
+    assert get_counters(package_version.package) == (1, 1)
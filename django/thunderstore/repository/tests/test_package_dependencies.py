@@ -0,0 +1,151 @@
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
+
+from thunderstore.community.models import PackageListing
+from thunderstore.repository.factories import PackageFactory, PackageVersionFactory
+from thunderstore.repository.models import Package, PackageChange, PackageDependencyEdge
+
+
+def create_version(package=None, version_number="1.0.0", **kwargs):
+    package = package or PackageFactory.create(is_active=True)
+    return PackageVersionFactory.create(
+        package=package,
+        name=package.name,
+        version_number=version_number,
+        is_active=True,
+        **kwargs,
+    )
+
+
+def get_edges():
+    return set(PackageDependencyEdge.objects.values_list("package_id", "dependency_id"))
+
+
+def get_dependant_count(package):
+    return Package.objects.get(pk=package.pk).dependant_count
+
+
+@pytest.mark.django_db
+def test_dependency_edges_follow_versions():
+    library = create_version()
+    first = create_version()
+    second = create_version()
+    first.dependencies.add(library)
+    second.dependencies.set([library, first])
+
+    assert get_edges() == {
+        (first.package_id, library.package_id),
+        (second.package_id, library.package_id),
+        (second.package_id, first.package_id),
+    }
+    assert get_dependant_count(library.package) == 2
+    assert set(library.package.dependants) == {first.package, second.package}
+
+    # Dependencies of any active version count
+    newer = create_version(second.package, version_number="2.0.0")
+    second.is_active = False
+    second.save()
+    assert get_dependant_count(library.package) == 1
+    newer.dependencies.add(library)
+    assert get_dependant_count(library.package) == 2
+    assert get_dependant_count(first.package) == 0
+
+    newer.package.is_active = False
+    newer.package.save()
+    assert get_edges() == {(first.package_id, library.package_id)}
+    assert get_dependant_count(library.package) == 1
+
+    first.dependencies.clear()
+    assert get_edges() == set()
+    assert get_dependant_count(library.package) == 0
+
+
+@pytest.mark.django_db
+def test_dependency_edges_reverse_and_delete():
+    library = create_version()
+    dependant = create_version()
+    library.dependants.add(dependant)
+    assert get_edges() == {(dependant.package_id, library.package_id)}
+
+    dependant.delete()
+    assert get_edges() == set()
+    assert get_dependant_count(library.package) == 0
+
+
+@pytest.mark.django_db
+def test_dependency_edges_package_delete():
+    library = create_version()
+    dependant = create_version()
+    dependant.dependencies.add(library)
+    assert get_dependant_count(library.package) == 1
+
+    dependant.package.delete()
+    assert get_edges() == set()
+    assert get_dependant_count(library.package) == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dependency_edges_rebuilt_once_per_transaction(mocker):
+    library = create_version()
+    rebuild = mocker.spy(PackageDependencyEdge, "rebuild")
+    record = mocker.spy(PackageChange, "record")
+    with transaction.atomic():
+        package = PackageFactory.create(is_active=True)
+        version = create_version(package)
+        version.dependencies.add(library)
+        assert rebuild.call_count == 0
+    assert rebuild.call_count == 1
+    assert record.call_count == 1
+    assert get_edges() == {(package.pk, library.package_id)}
+    assert get_dependant_count(library.package) == 1
+
+
+@pytest.mark.django_db
+def test_dependency_edges_ignore_own_versions():
+    first = create_version()
+    second = create_version(first.package, version_number="2.0.0")
+    second.dependencies.add(first)
+    assert get_edges() == set()
+
+
+@pytest.mark.django_db
+def test_package_dependants_views(client, community_site):
+    library = create_version()
+    dependants = [create_version() for _ in range(2)]
+    for version in (library, *dependants):
+        PackageListing.objects.create(
+            package=version.package, community=community_site.community
+        )
+        if version != library:
+            version.dependencies.add(library)
+    owner, name = library.package.owner.name, library.package.name
+
+    response = client.get(
+        reverse("packages.detail", kwargs={"owner": owner, "name": name}),
+        HTTP_HOST=community_site.site.domain,
+    )
+    assert response.context["dependants_string"] == "2 other mods depend on this mod"
+
+    response = client.get(
+        reverse("packages.list_by_dependency", kwargs={"owner": owner, "name": name}),
+        HTTP_HOST=community_site.site.domain,
+    )
+    assert {listing.package for listing in response.context["object_list"]} == {
+        version.package for version in dependants
+    }
+
+
+@pytest.mark.django_db
+def test_repair_package_dependency_edges():
+    library = create_version()
+    dependant = create_version()
+    dependant.dependencies.add(library)
+    PackageDependencyEdge.objects.all().delete()
+    Package.objects.update(dependant_count=5)
+
+    call_command("repair_package_counters")
+    assert get_edges() == {(dependant.package_id, library.package_id)}
+    assert get_dependant_count(library.package) == 1
+    assert get_dependant_count(dependant.package) == 0
@@ -145,6 +145,27 @@ def test_manifest_v1_serializer_unresolved_dependency(
     )
 
 
+@pytest.mark.django_db
+def test_manifest_v1_serializer_dependency_query_count(
+    user, manifest_v1_data, django_assert_max_num_queries
+):
+    identity = UploaderIdentity.get_or_create_for_user(user)
+    manifest_v1_data["dependencies"] = [
+        str(PackageVersionFactory.create().reference) for _ in range(20)
+    ]
+    serializer = ManifestV1Serializer(
+        user=user,
+        uploader=identity,
+        data=manifest_v1_data,
+    )
+    with django_assert_max_num_queries(5):
+        assert serializer.is_valid() is True
+        assert all(
+            reference.instance is not None
+            for reference in serializer.validated_data["dependencies"]
+        )
+
+
 @pytest.mark.django_db
 def test_manifest_v1_serializer_too_many_dependencies(user, manifest_v1_data):
     identity = UploaderIdentity.get_or_create_for_user(user)
@@ -1,11 +1,18 @@
+import pickle
 from distutils.version import StrictVersion
 from typing import Union
 
 import pytest
 
+from thunderstore.repository.factories import PackageVersionFactory
 from thunderstore.repository.models import Package, PackageVersion
+from thunderstore.repository.utils import has_duplicate_packages
 
-from ..package_reference import PackageReference
+from ..package_reference import (
+    PackageReference,
+    parse_reference,
+    resolve_package_references,
+)
 
 
 @pytest.mark.parametrize(
@@ -261,6 +268,68 @@ def test_lesser_than(a: str, b: str, expected: Union[bool, str]):
         assert expected in str(exception.value)
 
 
+@pytest.mark.parametrize(
+    "version_number, version_tuple",
+    [
+        ["1.0.2", (1, 0, 2)],
+        ["1.0", (1, 0, 0)],
+        [StrictVersion("3.2.1"), (3, 2, 1)],
+        [(4, 5, 6), (4, 5, 6)],
+        [None, None],
+    ],
+)
+def test_version_tuple(version_number, version_tuple):
+    reference = PackageReference("User", "package", version_number)
+    assert reference.version_tuple == version_tuple
+    if version_tuple is None:
+        assert reference.version is None
+    else:
+        assert reference.version == StrictVersion(".".join(map(str, version_tuple)))
+
+
+@pytest.mark.parametrize(
+    "a_str, b_str",
+    [
+        ["user-package-1.0.0a1", "user-package-1.0.0"],
+        ["user-package-1.0.0a1", "user-package-1.0.0b1"],
+        ["user-package-1.0.0a1", "user-package-1.0.0a2"],
+        ["user-package-1.0.0b2", "user-package-1.0.1"],
+    ],
+)
+def test_prerelease_versions(a_str, b_str):
+    a = PackageReference.parse(a_str)
+    b = PackageReference.parse(b_str)
+    assert a != b
+    assert hash(a) != hash(b)
+    assert a < b
+    assert b > a
+    assert (a.version < b.version) is True
+    assert a == PackageReference.parse(a_str)
+    assert a.version == StrictVersion(a_str.split("-")[-1])
+    assert has_duplicate_packages([a, b])
+    assert not has_duplicate_packages([a, PackageReference.parse(a_str)])
+
+
+def test_parse_cache():
+    parse_reference.cache_clear()
+    a = PackageReference.parse("user-package-1.0.0")
+    b = PackageReference.parse("user-package-1.0.0")
+    assert parse_reference.cache_info().hits == 1
+    assert a == b
+    assert a.namespace is b.namespace
+    # Resolved instances must not be shared between parsed references
+    assert a is not b
+
+
+def test_pickle():
+    reference = PackageReference.parse("user-package-1.0.0")
+    reference._instance = None
+    unpickled = pickle.loads(pickle.dumps(reference))
+    assert unpickled == reference
+    assert hash(unpickled) == hash(reference)
+    assert unpickled._instance is not None
+
+
 @pytest.mark.parametrize(
     "reference, correct",
     [
@@ -346,3 +415,34 @@ def test_exists(package_version: PackageVersion):
     invalid = PackageReference("user", "name", "1.0.0")
     assert not invalid.exists
     assert not invalid.without_version.exists
+
+
+@pytest.mark.django_db
+def test_resolve_package_references(
+    package_version: PackageVersion, django_assert_num_queries
+):
+    other = PackageVersionFactory.create(
+        package=package_version.package,
+        name=package_version.name,
+        version_number="2.0.0",
+    )
+    references = [
+        package_version.reference,
+        PackageReference.parse(str(other.reference)),
+        package_version.reference.without_version,
+        PackageReference("user", "name", "1.0.0"),
+        PackageReference("user", "name"),
+    ]
+    with django_assert_num_queries(2):
+        resolved = resolve_package_references(references)
+        assert [x.instance for x in references] == [
+            package_version,
+            other,
+            package_version.package,
+            None,
+            None,
+        ]
+    assert resolved == {x: x.instance for x in references}
+
+    with django_assert_num_queries(0):
+        assert resolve_package_references([]) == {}
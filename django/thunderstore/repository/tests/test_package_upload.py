@@ -7,7 +7,11 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 
 from thunderstore.community.models import PackageCategory, PackageListing
-from thunderstore.repository.models import UploaderIdentity
+from thunderstore.repository.models import (
+    PackageChange,
+    PackageDependencyEdge,
+    UploaderIdentity,
+)
 from thunderstore.repository.package_upload import PackageUploadForm
 
 
@@ -97,3 +101,39 @@ def test_package_upload_with_extra_data(user, community, manifest_v1_data):
     assert listing.categories.count() == 1
     assert listing.categories.first() == category
     assert listing.has_nsfw_content is True
+
+
+@pytest.mark.django_db(transaction=True)
+def test_package_upload_updates_package_once(
+    user, manifest_v1_data, community, package_version, mocker
+):
+    icon_raw = io.BytesIO()
+    icon = Image.new("RGB", (256, 256), "#FF0000")
+    icon.save(icon_raw, format="PNG")
+    manifest_v1_data["dependencies"] = [package_version.full_version_name]
+
+    zip_raw = io.BytesIO()
+    with ZipFile(zip_raw, "a", ZIP_DEFLATED, False) as zip_file:
+        zip_file.writestr("README.md", "# Test readme".encode("utf-8"))
+        zip_file.writestr("icon.png", icon_raw.getvalue())
+        zip_file.writestr("manifest.json", json.dumps(manifest_v1_data))
+
+    identity = UploaderIdentity.get_or_create_for_user(user)
+    form = PackageUploadForm(
+        user=user,
+        files={"file": SimpleUploadedFile("mod.zip", zip_raw.getvalue())},
+        community=community,
+        data={
+            "team": identity.name,
+            "communities": [community.identifier],
+        },
+    )
+    assert form.is_valid()
+    rebuild = mocker.spy(PackageDependencyEdge, "rebuild")
+    record = mocker.spy(PackageChange, "record")
+    version = form.save()
+    rebuild.assert_called_once()
+    record.assert_called_once()
+    assert list(
+        version.package.dependency_edges.values_list("dependency", flat=True)
+    ) == [package_version.package_id]
@@ -11,3 +11,55 @@ def test_get_total_used_disk_space():
     assert PackageVersion.get_total_used_disk_space() == p1.file_size
     p2 = PackageVersionFactory.create(file_size=212312412)
     assert PackageVersion.get_total_used_disk_space() == p1.file_size + p2.file_size
+
+
+@pytest.mark.django_db
+def test_package_version_number_parts(package):
+    version = PackageVersionFactory.create(
+        package=package, name=package.name, version_number="12.3.45"
+    )
+    version.refresh_from_db()
+    assert (version.version_major, version.version_minor, version.version_patch) == (
+        12,
+        3,
+        45,
+    )
+
+    version.version_number = "12.4.0"
+    version.save(update_fields=("version_number",))
+    version.refresh_from_db()
+    assert (version.version_major, version.version_minor, version.version_patch) == (
+        12,
+        4,
+        0,
+    )
+
+
+@pytest.mark.django_db
+def test_package_available_versions_ordering(package):
+    for version_number, is_active in (
+        ("1.9.0", True),
+        ("1.10.0", True),
+        ("10.0.0", False),
+        ("1.10.2", True),
+        ("1.2.10", True),
+    ):
+        PackageVersionFactory.create(
+            package=package,
+            name=package.name,
+            version_number=version_number,
+            is_active=is_active,
+        )
+    package.refresh_from_db()
+
+    assert [x.version_number for x in package.available_versions] == [
+        "1.10.2",
+        "1.10.0",
+        "1.9.0",
+        "1.2.10",
+    ]
+    assert package.latest.version_number == "1.10.2"
+
+    package.versions.filter(version_number="1.10.2").update(is_active=False)
+    package.recache_latest()
+    assert package.latest.version_number == "1.10.0"
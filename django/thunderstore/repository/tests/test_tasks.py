@@ -0,0 +1,91 @@
+import pytest
+from django.core.cache import cache
+
+from thunderstore.core.locks import get_lock_backend
+from thunderstore.repository import tasks
+from thunderstore.repository.models import PackageVersion
+from thunderstore.repository.tasks import update_api_caches, update_community_api_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture()
+def updaters(mocker):
+    mocks = {
+        api_version: mocker.Mock(wraps=updater)
+        for api_version, updater in tasks.API_CACHE_UPDATERS.items()
+    }
+    mocker.patch.dict(tasks.API_CACHE_UPDATERS, mocks)
+    return mocks
+
+
+@pytest.mark.django_db
+def test_update_api_caches(api_client, active_package_listing, community_site):
+    assert api_client.get("/api/v1/package/").status_code == 503
+    update_api_caches.delay()
+    assert api_client.get("/api/v1/package/").status_code == 200
+    assert api_client.get("/api/experimental/package/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_update_api_caches_per_community(community_site, updaters):
+    update_api_caches.delay()
+    for updater in updaters.values():
+        updater.assert_called_once_with(community_site)
+
+
+@pytest.mark.django_db
+def test_update_api_caches_cleanup_independent_of_updates(community_site, mocker):
+    # Updates which never finish or fail must not prevent the cleanup
+    group = mocker.patch.object(tasks, "group")
+    delete_expired = mocker.patch.object(tasks.DatabaseCache, "delete_expired")
+    update_api_caches.delay()
+    group.return_value.delay.assert_called_once()
+    delete_expired.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_update_community_api_cache_skips_unchanged(
+    active_package_listing, community_site, updaters
+):
+    update_community_api_cache(community_site.pk, "v1")
+    update_community_api_cache(community_site.pk, "v1")
+    assert updaters["v1"].call_count == 1
+
+    active_package_listing.package.save()
+    update_community_api_cache(community_site.pk, "v1")
+    assert updaters["v1"].call_count == 2
+
+    # Downloads are refreshed once the cache reaches its maximum age
+    PackageVersion.objects.get(
+        package=active_package_listing.package
+    )._increase_download_counter()
+    update_community_api_cache(community_site.pk, "v1")
+    assert updaters["v1"].call_count == 2
+
+    active_package_listing.delete()
+    update_community_api_cache(community_site.pk, "v1")
+    assert updaters["v1"].call_count == 3
+
+
+@pytest.mark.django_db
+def test_update_community_api_cache_deduplicated(community_site, updaters):
+    lock_id = f"update_api_cache.v1.{community_site.pk}"
+    with get_lock_backend().lock(lock_id) as lock:
+        assert lock.acquired
+        update_community_api_cache(community_site.pk, "v1")
+    updaters["v1"].assert_not_called()
+
+    update_community_api_cache(community_site.pk, "v1")
+    updaters["v1"].assert_called_once()
+
+
+@pytest.mark.django_db
+def test_update_community_api_cache_missing_site(updaters):
+    update_community_api_cache(12345, "v1")
+    updaters["v1"].assert_not_called()
@@ -86,6 +86,21 @@ def test_utils_does_contain_package(collection, reference, expected):
             ],
             False,
         ],
+        [
+            [
+                "user1-package-1.0.0",
+                "user2-package-1.0.0",
+                "user1-package-1.0.0",
+            ],
+            False,
+        ],
+        [
+            [
+                "user1-package",
+                "user1-package",
+            ],
+            False,
+        ],
     ],
 )
 def test_utils_has_duplicate_packages(collection, expected):
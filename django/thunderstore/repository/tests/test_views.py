@@ -1,9 +1,10 @@
 import pytest
+from django.core.cache import cache
 from django.urls import reverse
 
 from thunderstore.core.factories import UserFactory
 
-from ...community.models import PackageListing
+from ...community.models import Community, PackageListing
 from ..factories import PackageFactory, PackageVersionFactory, UploaderIdentityFactory
 
 
@@ -41,6 +42,90 @@ def test_package_list_view(client, community_site, ordering):
         assert f"test_{i}".encode("utf-8") in response.content
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", ("relevance", "last-updated"))
+def test_package_list_view_search(client, community_site, ordering):
+    cache.clear()
+    for i, description in enumerate(("Adds a Big Gun", "Bigger guns", "Boring")):
+        package = PackageFactory.create(
+            owner=UploaderIdentityFactory.create(name=f"Tester_{i}"),
+            name=f"test_{i}",
+            is_active=True,
+        )
+        PackageVersionFactory.create(
+            name=package.name,
+            package=package,
+            is_active=True,
+            description=description,
+        )
+        PackageListing.objects.create(
+            package=package,
+            community=community_site.community,
+        )
+
+    def search(query):
+        response = client.get(
+            reverse("packages.list"),
+            {"q": query, "ordering": ordering},
+            HTTP_HOST=community_site.site.domain,
+        )
+        assert response.status_code == 200
+        return {listing.package.name for listing in response.context["object_list"]}
+
+    assert search("big GUN") == {"test_0", "test_1"}
+    assert search("tester_2") == {"test_2"}
+    assert search("gun  tester_1") == {"test_1"}
+    assert search("big boring") == set()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params, expected",
+    (
+        ({}, "last-updated"),
+        ({"q": ""}, "last-updated"),
+        ({"q": "gun"}, "relevance"),
+        ({"q": "gun", "ordering": "newest"}, "newest"),
+        ({"q": "gun", "ordering": "invalid"}, "relevance"),
+        ({"ordering": "relevance"}, "last-updated"),
+    ),
+)
+def test_package_list_view_default_ordering(client, community_site, params, expected):
+    cache.clear()
+    response = client.get(
+        reverse("packages.list"),
+        params,
+        HTTP_HOST=community_site.site.domain,
+    )
+    assert response.status_code == 200
+    assert response.context["active_ordering"] == expected
+
+
+@pytest.mark.django_db
+def test_package_listing_search_document_follows_latest(active_package_listing):
+    package = active_package_listing.package
+    PackageVersionFactory.create(
+        name=package.name,
+        package=package,
+        version_number="99.0.0",
+        is_active=True,
+        description="Completely rewritten",
+    )
+    listing = PackageListing.objects.get(pk=active_package_listing.pk)
+    assert listing.search_document == (
+        f"{package.name}\n{package.owner.name}\ncompletely rewritten".lower()
+    )
+    other = PackageListing.objects.create(
+        package=package,
+        community=Community.objects.create(name="Other", identifier="other"),
+    )
+    other.refresh_from_db()
+    assert other.search_document == listing.search_document
+    assert [
+        x.pk for x in PackageListing.objects.filter(pk=listing.pk).search("REWRITTEN")
+    ] == [listing.pk]
+
+
 @pytest.mark.django_db
 def test_package_detail_view(client, active_package, community_site):
     response = client.get(
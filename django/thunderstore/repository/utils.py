@@ -15,10 +15,7 @@ def does_contain_package(
     :return: True if the package is found, False otherwise
     :rtype: bool
     """
-    for reference in packages:
-        if reference.without_version == package.without_version:
-            return True
-    return False
+    return any(reference.is_same_package(package) for reference in packages)
 
 
 def has_duplicate_packages(packages: List[PackageReference]) -> bool:
@@ -31,10 +28,9 @@ def has_duplicate_packages(packages: List[PackageReference]) -> bool:
     :return: True if duplicate packages are found, False otherwise
     :rtype: bool
     """
-    for ref_a in packages:
-        for ref_b in packages:
-            if ref_a == ref_b:
-                continue
-            if ref_a.without_version == ref_b.without_version:
-                return True
+    seen = {}
+    for reference in packages:
+        key = (reference.namespace, reference.name)
+        if not seen.setdefault(key, reference).is_same_version(reference):
+            return True
     return False
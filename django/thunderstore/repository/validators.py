@@ -22,7 +22,7 @@ class PackageReferenceValidator:
             reference = PackageReference.parse(value)
         except ValueError as exc:
             raise ValidationError(str(exc))
-        if reference.version is None and self.require_version:
+        if reference.version_tuple is None and self.require_version:
             raise ValidationError(f"Package reference is missing version: {reference}")
         if self.resolve and reference.instance is None:
             raise ValidationError(
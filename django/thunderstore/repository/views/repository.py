@@ -1,5 +1,5 @@
 from django.db import transaction
-from django.db.models import Count, Q, Sum
+from django.db.models import Q
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
@@ -43,12 +43,15 @@ class PackageListSearchView(ListView):
         return cache_vary
 
     def get_ordering_choices(self):
-        return (
+        choices = (
             ("last-updated", "Last updated"),
             ("newest", "Newest"),
             ("most-downloaded", "Most downloaded"),
             ("top-rated", "Top rated"),
         )
+        if self.get_search_query():
+            return (("relevance", "Relevance"),) + choices
+        return choices
 
     def get_selected_categories(self):
         selections = self.request.GET.getlist("categories", [])
@@ -73,8 +76,9 @@ class PackageListSearchView(ListView):
             return False
 
     def get_active_ordering(self):
-        ordering = self.request.GET.get("ordering", "last-updated")
+        # The first choice is the default, which is relevance when searching
         possibilities = [x[0] for x in self.get_ordering_choices()]
+        ordering = self.request.GET.get("ordering", possibilities[0])
         if ordering not in possibilities:
             return possibilities[0]
         return ordering
@@ -91,20 +95,23 @@ class PackageListSearchView(ListView):
                 "-package__date_created",
             )
         if active_ordering == "most-downloaded":
-            return queryset.annotate(
-                total_downloads=Sum("package__versions__downloads")
-            ).order_by(
+            return queryset.order_by(
+                "-package__is_pinned",
+                "package__is_deprecated",
+                "-package__total_downloads",
+            )
+        if active_ordering == "relevance":
+            return queryset.order_by(
                 "-package__is_pinned",
                 "package__is_deprecated",
-                "-total_downloads",
+                "-search_rank",
+                "-package__date_updated",
             )
         if active_ordering == "top-rated":
-            return queryset.annotate(
-                total_rating=Count("package__package_ratings")
-            ).order_by(
+            return queryset.order_by(
                 "-package__is_pinned",
                 "package__is_deprecated",
-                "-total_rating",
+                "-package__rating_count",
             )
         return queryset.order_by(
             "-package__is_pinned",
@@ -113,19 +120,7 @@ class PackageListSearchView(ListView):
         )
 
     def perform_search(self, queryset, search_query):
-        search_fields = (
-            "package__name",
-            "package__owner__name",
-            "package__latest__description",
-        )
-
-        icontains_query = Q()
-        parts = search_query.split(" ")
-        for part in parts:
-            for field in search_fields:
-                icontains_query &= ~Q(**{f"{field}__icontains": part})
-
-        return queryset.exclude(icontains_query).distinct()
+        return queryset.search(search_query)
 
     def get_queryset(self):
         queryset = (
@@ -239,8 +234,8 @@ class PackageListByDependencyView(PackageListSearchView):
         return super().dispatch(*args, **kwargs)
 
     def get_base_queryset(self):
-        return PackageListing.objects.exclude(
-            ~Q(package__in=self.package_listing.package.dependants)
+        return PackageListing.objects.filter(
+            package__dependency_edges__dependency=self.package_listing.package
         )
 
     def get_page_title(self):
@@ -274,7 +269,7 @@ class PackageDetailView(DetailView):
         context = super().get_context_data(*args, **kwargs)
 
         package_listing = context["object"]
-        dependant_count = package_listing.package.dependants.active().count()
+        dependant_count = package_listing.package.dependant_count
 
         if dependant_count == 1:
             dependants_string = f"{dependant_count} other mod depends on this mod"